@@ -0,0 +1,334 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from employees.models import ContractualEmployee, WorkRecord
+from expenses.models import Expense
+from ledger.archive import archived_rows
+from ledger.columnar import (
+    EXPENSE_CATEGORIES,
+    PAYMENT_TYPES,
+    day_number,
+    group_count,
+    group_sum,
+    load,
+    month_number,
+    month_of,
+    percentiles,
+    rolling_sum,
+)
+from payments.models import Payment
+
+ANALYTICS_MONTHS = 12  # months shown; one more is read for the first change
+ROLLING_DAYS = 14  # days of rolling pay-out sums shown
+ROLLING_WINDOWS = (7, 30)
+PERCENTILES = (50, 90, 99)
+TOP_EMPLOYEES = 20
+
+CENT = Decimal("0.01")
+CATEGORY_LABELS = dict(Expense.Category.choices)
+OTHER_LABEL = "Other"  # expenses whose category is not among the choices
+
+
+def money(pence):
+    """An int of pence as a Decimal of pounds."""
+    return Decimal(int(pence)).scaleb(-2)
+
+
+def month_start(number):
+    """First day of a month_number()."""
+    return date(1970 + number // 12, number % 12 + 1, 1)
+
+
+def ratio(numerator, denominator):
+    return (Decimal(int(numerator)) / int(denominator)).quantize(CENT) if denominator else Decimal("0.00")
+
+
+def analytics_report(today, months=ANALYTICS_MONTHS):
+    """
+    Expense category trends, monthly cash flow with month-over-month
+    changes, rolling pay-out sums, expense percentiles and per-employee
+    piece-work productivity up to ``today``, computed over the column
+    snapshot (archived rows included) as refresh_analytics last left it.
+    None when the snapshot has not been built yet.
+    """
+    expenses, payments, work = load(Expense), load(Payment), load(WorkRecord)
+    if not (expenses and payments and work):
+        return None
+    span = months + 1
+    first = month_number(today) - months
+    last_day = day_number(today)
+
+    def window(columns):
+        # Row positions dated in the span up to today, and their month index in it
+        month = month_of(columns["date"]) - first
+        rows = np.flatnonzero((month >= 0) & (columns["date"] <= last_day))
+        return rows, month[rows]
+
+    # --- Expenses: category x month totals, percentiles of single amounts ---
+    rows, month = window(expenses)
+    category = expenses["category"][rows].astype(np.int64)
+    amount = expenses["amount"][rows]
+    size = len(EXPENSE_CATEGORIES) + 1  # and the "other" bucket
+    grid = group_sum(category * span + month, amount, size * span).reshape(size, span)
+    shown = month > 0
+    categories = []
+    for code, totals in enumerate(grid):
+        if code == len(EXPENSE_CATEGORIES) and not (category == code).any():
+            continue
+        p50, p90, p99 = percentiles(amount[shown & (category == code)], PERCENTILES)
+        categories.append({
+            "label": CATEGORY_LABELS[EXPENSE_CATEGORIES[code]] if code < len(EXPENSE_CATEGORIES) else OTHER_LABEL,
+            "months": [money(total) for total in totals[1:]],
+            "total": money(totals[1:].sum()),
+            "change": money(totals[-1] - totals[-2]),
+            "p50": money(p50), "p90": money(p90), "p99": money(p99),
+        })
+    expense_months = grid.sum(axis=0)
+
+    # --- Cash flow per month: pay-ins, pay-outs, expenses, net and its change ---
+    rows, month = window(payments)
+    kind = payments["type"][rows].astype(np.int64)
+    flows = group_sum(kind * span + month, payments["amount"][rows], (len(PAYMENT_TYPES) + 1) * span)
+    payin = flows.reshape(-1, span)[PAYMENT_TYPES.index("IN")]
+    payout = flows.reshape(-1, span)[PAYMENT_TYPES.index("OUT")]
+    net = payin - payout - expense_months
+    change = np.diff(net)
+    cash = [
+        {
+            "month": month_start(first + index),
+            "payin": money(payin[index]),
+            "payout": money(payout[index]),
+            "expenses": money(expense_months[index]),
+            "net": money(net[index]),
+            "change": money(change[index - 1]),
+        }
+        for index in range(1, span)
+    ]
+
+    # --- Rolling pay-outs (payments out plus expenses) per day ---
+    longest = max(ROLLING_WINDOWS)
+    start = last_day - ROLLING_DAYS - longest + 2
+    daily = np.zeros(last_day - start + 1, dtype=np.int64)
+    for columns, paid_out in (
+        (payments, payments["type"] == PAYMENT_TYPES.index("OUT")),
+        (expenses, np.ones(len(expenses["id"]), dtype=bool)),
+    ):
+        dates = columns["date"]
+        rows = np.flatnonzero(paid_out & (dates >= start) & (dates <= last_day))
+        daily += group_sum(dates[rows] - start, columns["amount"][rows], len(daily))
+    sums = {days: rolling_sum(daily, days) for days in ROLLING_WINDOWS}
+    rolling = [
+        {
+            "date": today - timedelta(days=last_day - start - index),
+            "payout": money(daily[index]),
+            **{f"last_{days}": money(sums[days][index]) for days in ROLLING_WINDOWS},
+        }
+        for index in range(len(daily) - ROLLING_DAYS, len(daily))
+    ]
+
+    # --- Piece-work productivity per employee over the shown months ---
+    rows, month = window(work)
+    rows = rows[month > 0]
+    employee_ids, employee = np.unique(work["employee"][rows], return_inverse=True)
+    quantity, earned_rows, dates = work["quantity"][rows], work["amount"][rows], work["date"][rows]
+    count = len(employee_ids)
+    items = group_sum(employee, quantity, count)
+    earned = group_sum(employee, earned_rows, count)
+    # One key per employee and day worked
+    day_keys, worked = np.unique(employee.astype(np.int64) * (last_day + 1) + dates, return_inverse=True)
+    days_worked = group_count(day_keys // (last_day + 1), count)
+    per_day = group_sum(worked, quantity, len(day_keys))
+    daily_p50, daily_p90 = percentiles(per_day, (50, 90))
+
+    top = np.argsort(-earned, kind="stable")[:TOP_EMPLOYEES]
+    names = dict(
+        ContractualEmployee.objects.filter(pk__in=[int(pk) for pk in employee_ids[top]]).values_list("pk", "name")
+    )
+    employees = [
+        {
+            "id": int(employee_ids[index]),
+            "name": names.get(int(employee_ids[index]), f"#{employee_ids[index]}"),
+            "items": int(items[index]),
+            "earned": money(earned[index]),
+            "days": int(days_worked[index]),
+            "items_per_day": ratio(items[index], days_worked[index]),
+            "average_price": money(earned[index] // items[index]) if items[index] else Decimal("0.00"),
+        }
+        for index in top
+    ]
+
+    return {
+        "months": [month_start(first + index) for index in range(1, span)],
+        "categories": categories,
+        "cash": cash,
+        "rolling": rolling,
+        "rolling_windows": ROLLING_WINDOWS,
+        "employees": employees,
+        "daily_items_p50": int(daily_p50),
+        "daily_items_p90": int(daily_p90),
+        "percentiles": PERCENTILES,
+    }
+
+
+# --- The same report through the ORM: the baseline `refresh_analytics --benchmark` times ---
+
+def _pounds(value):
+    # SQLite sums come back as floats
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def _category(code):
+    """An expense category code, or None (the "other" bucket) for one not among the choices."""
+    return code if code in CATEGORY_LABELS else None
+
+
+def _rank(values, q):
+    return values[(len(values) - 1) * q // 100] if values else Decimal("0.00")
+
+
+def analytics_report_orm(today, months=ANALYTICS_MONTHS):
+    """analytics_report() from grouped ORM queries plus the archived rows, Decimals throughout."""
+    first = month_number(today) - months
+    span_start = month_start(first)
+    shown_start = month_start(first + 1)
+    zero = Decimal("0.00")
+
+    def index(day):
+        return month_number(day) - first
+
+    # --- Expenses ---
+    grid = defaultdict(lambda: zero)
+    amounts = defaultdict(list)
+    grouped = (
+        Expense.objects.filter(date__range=(span_start, today)).annotate(month=TruncMonth("date"))
+        .order_by().values("category", "month").annotate(total=Sum("amount"))
+    )
+    for row in grouped:
+        grid[_category(row["category"]), index(row["month"])] += _pounds(row["total"])
+    for category, amount in Expense.objects.filter(date__range=(shown_start, today)).values_list("category", "amount"):
+        amounts[_category(category)].append(amount)
+    for obj in archived_rows(Expense, span_start, today):
+        grid[_category(obj.category), index(obj.date)] += obj.amount
+        if obj.date >= shown_start:
+            amounts[_category(obj.category)].append(obj.amount)
+    codes = list(EXPENSE_CATEGORIES)
+    if any((None, i) in grid for i in range(months + 1)):
+        codes.append(None)
+    categories = []
+    for code in codes:
+        totals = [grid[code, i] for i in range(months + 1)]
+        ranked = sorted(amounts[code])
+        categories.append({
+            "label": CATEGORY_LABELS.get(code, OTHER_LABEL),
+            "months": totals[1:],
+            "total": sum(totals[1:], zero),
+            "change": totals[-1] - totals[-2],
+            **{f"p{q}": _rank(ranked, q) for q in PERCENTILES},
+        })
+
+    # --- Cash flow per month ---
+    flows = defaultdict(lambda: zero)
+    grouped = (
+        Payment.objects.filter(date__range=(span_start, today)).annotate(month=TruncMonth("date"))
+        .order_by().values("type", "month").annotate(total=Sum("amount"))
+    )
+    for row in grouped:
+        flows[row["type"], index(row["month"])] += _pounds(row["total"])
+    for obj in archived_rows(Payment, span_start, today):
+        flows[obj.type, index(obj.date)] += obj.amount
+    cash = []
+    previous = None
+    for i in range(months + 1):
+        spent = sum((grid[code, i] for code in codes), zero)
+        net = flows["IN", i] - flows["OUT", i] - spent
+        if previous is not None:
+            cash.append({
+                "month": month_start(first + i),
+                "payin": flows["IN", i],
+                "payout": flows["OUT", i],
+                "expenses": spent,
+                "net": net,
+                "change": net - previous,
+            })
+        previous = net
+
+    # --- Rolling pay-outs ---
+    longest = max(ROLLING_WINDOWS)
+    start = today - timedelta(days=ROLLING_DAYS + longest - 2)
+    daily = defaultdict(lambda: zero)
+    for queryset in (Payment.objects.filter(type="OUT"), Expense.objects.all()):
+        for day, total in (
+            queryset.filter(date__range=(start, today)).order_by().values("date")
+            .annotate(total=Sum("amount")).values_list("date", "total")
+        ):
+            daily[day] += _pounds(total)
+    for obj in archived_rows(Payment, start, today, type="OUT"):
+        daily[obj.date] += obj.amount
+    for obj in archived_rows(Expense, start, today):
+        daily[obj.date] += obj.amount
+    rolling = []
+    for offset in range(ROLLING_DAYS):
+        day = today - timedelta(days=ROLLING_DAYS - 1 - offset)
+        rolling.append({
+            "date": day,
+            "payout": daily[day],
+            **{
+                f"last_{days}": sum((daily[day - timedelta(days=back)] for back in range(days)), zero)
+                for days in ROLLING_WINDOWS
+            },
+        })
+
+    # --- Productivity ---
+    per_employee = defaultdict(lambda: [0, zero, 0])  # items, earned, days worked
+    per_day = defaultdict(int)
+    work = WorkRecord.objects.filter(date__range=(shown_start, today)).order_by()
+    for row in work.values("employee_id").annotate(
+        items=Sum("quantity"), earned=Sum(F("quantity") * F("item_price")), days=Count("date", distinct=True),
+    ):
+        per_employee[row["employee_id"]] = [row["items"], _pounds(row["earned"]), row["days"]]
+    for employee_id, day, items in work.values("employee_id", "date").annotate(items=Sum("quantity")).values_list(
+        "employee_id", "date", "items"
+    ):
+        per_day[employee_id, day] += items
+    # Archived months are closed, so their days never overlap the live rows'
+    archived_days = set()
+    for obj in archived_rows(WorkRecord, shown_start, today):
+        totals = per_employee[obj.employee_id]
+        totals[0] += obj.quantity
+        totals[1] += obj.quantity * obj.item_price
+        if (obj.employee_id, obj.date) not in archived_days:
+            archived_days.add((obj.employee_id, obj.date))
+            totals[2] += 1
+        per_day[obj.employee_id, obj.date] += obj.quantity
+    top = sorted(per_employee.items(), key=lambda item: (-item[1][1], item[0]))[:TOP_EMPLOYEES]
+    names = dict(ContractualEmployee.objects.filter(pk__in=[pk for pk, _ in top]).values_list("pk", "name"))
+    employees = [
+        {
+            "id": pk,
+            "name": names.get(pk, f"#{pk}"),
+            "items": items,
+            "earned": earned,
+            "days": days,
+            "items_per_day": ratio(items, days),
+            "average_price": money(int(earned * 100) // items) if items else zero,
+        }
+        for pk, (items, earned, days) in top
+    ]
+    ranked = sorted(per_day.values())
+
+    return {
+        "months": [month_start(first + i) for i in range(1, months + 1)],
+        "categories": categories,
+        "cash": cash,
+        "rolling": rolling,
+        "rolling_windows": ROLLING_WINDOWS,
+        "employees": employees,
+        "daily_items_p50": _rank(ranked, 50) if ranked else 0,
+        "daily_items_p90": _rank(ranked, 90) if ranked else 0,
+        "percentiles": PERCENTILES,
+    }
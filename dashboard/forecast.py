@@ -0,0 +1,130 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from expenses.models import Expense
+from ledger.models import DailyLedgerRollup
+
+Source = DailyLedgerRollup.Source
+
+HISTORY_WEEKS = 5 * 52  # daily history read for a fit
+FORECAST_WEEKS = (4, 12)  # shortest and longest horizon offered
+DEFAULT_FORECAST_WEEKS = 8
+TREND_WEEKS = 26  # weeks the trend line is fitted through
+SEASON_HALF_WEEKS = 26  # a past week is compared with the year centred on it
+
+# Forecast series: (label, pays out?, [(rollup source, key)]); salaries are
+# contractual and fixed together.
+FORECAST_SERIES = [
+    ("Pay-in", False, [(Source.PAYMENT, "IN")]),
+    ("Pay-out", True, [(Source.PAYMENT, "OUT")]),
+    *[(label, True, [(Source.EXPENSE, code)]) for code, label in Expense.Category.choices],
+    ("Salaries", True, [(Source.SALARY, ""), (Source.FIXED_SALARY, "")]),
+]
+SERIES_INDEX = {cell: index for index, (_, _, cells) in enumerate(FORECAST_SERIES) for cell in cells}
+
+
+def daily_series(today, days=HISTORY_WEEKS * 7):
+    """
+    (series x day) int64 pence matrix of the FORECAST_SERIES over the
+    ``days`` up to and including ``today``, from one query over the daily
+    rollups (which keep counting archived rows).
+    """
+    start = today - timedelta(days=days - 1)
+    rows = DailyLedgerRollup.objects.filter(date__range=(start, today)).values_list("date", "source", "key", "total")
+    series, offsets, amounts = [], [], []
+    for day, source, key, total in rows:
+        index = SERIES_INDEX.get((source, key))
+        if index is not None:
+            series.append(index)
+            offsets.append((day - start).days)
+            amounts.append(int(total * 100))
+    daily = np.zeros((len(FORECAST_SERIES), days), dtype=np.int64)
+    np.add.at(daily, (np.array(series, dtype=np.intp), np.array(offsets, dtype=np.intp)), amounts)
+    return daily
+
+
+def _seasonal(weekly, positions):
+    """
+    (series x positions) seasonal deviation of each week position: how the
+    weeks 52, 104, ... before it differed from the mean of the year centred
+    on them (so a trend is not counted as season), averaged over the years
+    the history covers; zero where it covers none.
+    """
+    count, history = weekly.shape
+    if history < 2 * SEASON_HALF_WEEKS + 1:
+        return np.zeros((count, len(positions)))
+    sums = np.concatenate([np.zeros((count, 1)), weekly.cumsum(axis=1)], axis=1)
+    past = positions[None, :] - 52 * np.arange(1, history // 52 + 1)[:, None]  # (years x positions)
+    valid = (past >= SEASON_HALF_WEEKS) & (past + SEASON_HALF_WEEKS <= history)
+    past = np.where(valid, past, SEASON_HALF_WEEKS)  # any index in range; masked out below
+    centred = (sums[:, past + SEASON_HALF_WEEKS] - sums[:, past - SEASON_HALF_WEEKS]) / (2 * SEASON_HALF_WEEKS)
+    deviation = np.where(valid, weekly[:, past] - centred, 0).sum(axis=1)
+    return deviation / np.maximum(valid.sum(axis=0), 1)
+
+
+def fit_weekly(daily, weeks):
+    """
+    Forecast the next ``weeks`` weekly totals of every row of ``daily``
+    (the last column being the most recent day), all series at once:
+
+    - history starts at the first day with any data, cut to whole weeks
+      ending on the last day;
+    - season: _seasonal() of every week, from the same weeks of earlier
+      years;
+    - trend: a least-squares line through the last TREND_WEEKS weeks less
+      their season, continued from its value at the latest week.
+
+    Returns a (series x weeks) float array of pence, never negative.
+    """
+    active = np.flatnonzero(daily.any(axis=0))
+    count = len(daily)
+    if not len(active):
+        return np.zeros((count, weeks))
+    history = (daily.shape[1] - active[0]) // 7
+    if not history:
+        return np.zeros((count, weeks))
+    weekly = daily[:, daily.shape[1] - history * 7:].reshape(count, history, 7).sum(axis=2).astype(float)
+    ahead = np.arange(1, weeks + 1)
+
+    span = min(TREND_WEEKS, history)
+    recent = weekly[:, -span:] - _seasonal(weekly, np.arange(history - span, history))
+    x = np.arange(span) - (span - 1) / 2
+    spread = (x * x).sum()
+    slope = (recent * x).sum(axis=1) / spread if spread else np.zeros(count)
+    latest = recent.mean(axis=1) + slope * x[-1]
+    forecast = latest[:, None] + slope[:, None] * ahead + _seasonal(weekly, history - 1 + ahead)
+    return np.clip(forecast, 0, None)
+
+
+def _money(pence):
+    return Decimal(int(pence)).scaleb(-2)
+
+
+def cashflow_forecast(today, weeks=DEFAULT_FORECAST_WEEKS):
+    """
+    Pay-in, pay-out, per-category expense and salary projections for the
+    ``weeks`` weeks after ``today``, with the projected net and the last
+    eight weeks' actual weekly average of each series for comparison.
+    """
+    daily = daily_series(today)
+    projected = np.rint(fit_weekly(daily, weeks)).astype(np.int64)
+    actual = daily[:, -8 * 7:].sum(axis=1) // 8
+    signs = np.array([-1 if pays_out else 1 for _, pays_out, _ in FORECAST_SERIES])
+    net = (projected * signs[:, None]).sum(axis=0)
+    return {
+        "weeks": [today + timedelta(days=1 + 7 * week) for week in range(weeks)],
+        "series": [
+            {
+                "label": label,
+                "pays_out": pays_out,
+                "weekly": [_money(value) for value in values],
+                "total": _money(values.sum()),
+                "recent_average": _money(average),
+            }
+            for (label, pays_out, _), values, average in zip(FORECAST_SERIES, projected, actual)
+        ],
+        "net": [_money(value) for value in net],
+        "net_total": _money(net.sum()),
+    }
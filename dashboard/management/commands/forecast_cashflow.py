@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from dashboard.forecast import DEFAULT_FORECAST_WEEKS, FORECAST_SERIES, FORECAST_WEEKS, daily_series, fit_weekly
+
+
+class Command(BaseCommand):
+    help = "Print the dashboard's weekly cash-flow forecast and how long reading the history and fitting took."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--weeks", type=int, default=DEFAULT_FORECAST_WEEKS,
+            help=f"Weeks ahead ({FORECAST_WEEKS[0]}-{FORECAST_WEEKS[1]}, default {DEFAULT_FORECAST_WEEKS}).",
+        )
+
+    def handle(self, *args, **options):
+        weeks = options["weeks"]
+        if not FORECAST_WEEKS[0] <= weeks <= FORECAST_WEEKS[1]:
+            raise CommandError(f"--weeks must be between {FORECAST_WEEKS[0]} and {FORECAST_WEEKS[1]}.")
+        today = timezone.now().date()
+
+        started = time.perf_counter()
+        daily = daily_series(today)
+        read = time.perf_counter() - started
+        started = time.perf_counter()
+        projected = fit_weekly(daily, weeks)
+        fitted = time.perf_counter() - started
+
+        self.stdout.write(f"{'series':<22}" + "".join(f"{'week ' + str(w + 1):>12}" for w in range(weeks)))
+        for (label, _, _), values in zip(FORECAST_SERIES, projected):
+            self.stdout.write(f"{label:<22}" + "".join(f"{value / 100:>12,.2f}" for value in values))
+        self.stdout.write(self.style.SUCCESS(
+            f"Read {daily.shape[1]} days x {len(daily)} series in {read * 1000:.1f} ms, "
+            f"fitted in {fitted * 1000:.2f} ms."
+        ))
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from dashboard.analytics import analytics_report, analytics_report_orm
+from ledger.columnar import refresh
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the NumPy column snapshot of the expense, payment and work-record tables (the analytics "
+        "page's only source) up to date, once or every --interval seconds. "
+        "--benchmark times the analytics page's figures from the snapshot against the ORM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Re-read every row instead of only the changes.")
+        parser.add_argument(
+            "--interval", type=float, metavar="SECONDS", default=0,
+            help="Keep running, refreshing every SECONDS (run it alongside the web server).",
+        )
+        parser.add_argument(
+            "--benchmark", type=int, metavar="RUNS", default=0,
+            help="Compute the analytics report RUNS times each way, check they agree and print the timings.",
+        )
+
+    def handle(self, *args, **options):
+        if options["interval"] > 0 and options["benchmark"]:
+            raise CommandError("--interval keeps running, so it cannot be combined with --benchmark.")
+        self.refresh_once(options["rebuild"])
+        if options["interval"] > 0:
+            while True:
+                time.sleep(options["interval"])
+                close_old_connections()
+                self.refresh_once(rebuild=False)
+
+        runs = options["benchmark"]
+        if not runs:
+            return
+        today = timezone.now().date()
+        timings = {}
+        reports = {}
+        for name, report in (("orm", analytics_report_orm), ("numpy", analytics_report)):
+            started = time.perf_counter()
+            for _ in range(runs):
+                reports[name] = report(today)
+            timings[name] = (time.perf_counter() - started) / runs
+        if reports["orm"] != reports["numpy"]:
+            differ = ", ".join(key for key in reports["orm"] if reports["orm"][key] != reports["numpy"][key])
+            raise CommandError(f"The snapshot and the ORM disagree on: {differ}")
+
+        self.stdout.write(f"{'path':>6} {'ms/report':>10}")
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name:>6} {seconds * 1000:>10.1f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Same figures both ways; the snapshot is {timings['orm'] / timings['numpy']:.1f}x faster."
+        ))
+
+    def refresh_once(self, rebuild):
+        started = time.perf_counter()
+        result = refresh(rebuild=rebuild)
+        elapsed = time.perf_counter() - started
+        for label, outcome in result.items():
+            self.stdout.write(f"- {label}: {outcome if isinstance(outcome, str) else f'{outcome} row(s) merged'}")
+        self.stdout.write(self.style.SUCCESS(f"Refreshed the column snapshot in {elapsed:.2f}s."))
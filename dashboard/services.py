@@ -0,0 +1,162 @@
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q, Sum, Value, DecimalField
+from django.db.models.functions import Coalesce
+
+from ledger.entries import balance_as_of
+from ledger.periods import carried_totals
+from ledger.models import DailyLedgerRollup
+
+Source = DailyLedgerRollup.Source
+
+ZERO = Decimal("0")
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+SERIES_PERIODS = ("day", "week", "month")
+PAYIN = Q(source=Source.PAYMENT, key="IN")
+CENT = Decimal("0.01")
+NO_FLOW = Decimal("0.00")
+
+
+def window_totals(queryset, windows, field="amount"):
+    """
+    Sum ``field`` over several windows of ``queryset`` in a single query.
+
+    ``windows`` maps a result key to a ``Q`` filter, or to ``None`` for the
+    whole table. Every key comes back as a Decimal (never None). When no
+    window is a lifetime total the query is narrowed to the union of the
+    windows so it only touches the rows it needs.
+    """
+    filters = list(windows.values())
+    if filters and all(q is not None for q in filters):
+        queryset = queryset.filter(reduce(or_, filters))
+
+    return queryset.aggregate(**{
+        key: Coalesce(Sum(field, filter=q), Value(ZERO), output_field=MONEY)
+        for key, q in windows.items()
+    })
+
+
+def ledger_summary(month_start, today, start_date=None, end_date=None):
+    """
+    Every money card on the dashboard: this month, the optional custom range
+    and lifetime salary totals (the last period close plus the days since).
+    Read from the daily rollups in one filtered aggregate, so the cost
+    follows the number of days, not transactions.
+    """
+    month = Q(date__range=[month_start, today])
+    has_range = bool(start_date and end_date)
+
+    def sources(window, suffix):
+        return {
+            f"payins_{suffix}": window & Q(source=Source.PAYMENT, key="IN"),
+            f"payment_out_{suffix}": window & Q(source=Source.PAYMENT, key="OUT"),
+            # Daily expenses (all categories count as pay-out)
+            f"expenses_{suffix}": window & Q(source=Source.EXPENSE),
+            f"salary_paid_{suffix}": window & Q(source=Source.SALARY),
+            f"fixed_salary_paid_{suffix}": window & Q(source=Source.FIXED_SALARY),
+        }
+
+    # Lifetime totals: the last period close plus the days after it
+    closed, carried = carried_totals()
+    since_close = Q(date__gt=closed) if closed is not None else Q()
+    windows = {
+        **sources(month, "month"),
+        "temp_salary_total": since_close & Q(source=Source.SALARY),
+        "fixed_salary_total": since_close & Q(source=Source.FIXED_SALARY),
+    }
+    if has_range:
+        windows.update(sources(Q(date__range=[start_date, end_date]), "range"))
+
+    summary = window_totals(DailyLedgerRollup.objects.all(), windows, field="total")
+    summary["temp_salary_total"] += carried.get((Source.SALARY, ""), (ZERO, 0))[0]
+    summary["fixed_salary_total"] += carried.get((Source.FIXED_SALARY, ""), (ZERO, 0))[0]
+
+    summary["payouts_month"] = (
+        summary["payment_out_month"]
+        + summary["expenses_month"]
+        + summary["salary_paid_month"]
+        + summary["fixed_salary_paid_month"]
+    )
+    summary["balance_month"] = summary["payins_month"] - summary["payouts_month"]
+    summary["salary_total_month"] = summary["salary_paid_month"] + summary["fixed_salary_paid_month"]
+    summary["salary_total_all"] = summary["temp_salary_total"] + summary["fixed_salary_total"]
+
+    if has_range:
+        summary["payouts_range"] = (
+            summary["payment_out_range"]
+            + summary["expenses_range"]
+            + summary["salary_paid_range"]
+            + summary["fixed_salary_paid_range"]
+        )
+        summary["balance_range"] = summary["payins_range"] - summary["payouts_range"]
+
+    return summary
+
+
+def period_start(day, period):
+    """First day of the day, week (Monday) or month holding ``day``."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(start, period):
+    if period == "week":
+        return start + timedelta(days=7)
+    if period == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def cashflow_series(start, end, period="day"):
+    """
+    Pay-in, pay-out and closing cash balance for every day, week or month
+    from ``start`` to ``end`` (quiet periods included, at zero). One grouped
+    query over the daily rollups gives the flows and one ledger lookup the
+    opening balance; the balances are a running sum from there.
+    """
+    daily = (
+        DailyLedgerRollup.objects.filter(date__range=[start, end])
+        .values("date")
+        .annotate(
+            payin=Coalesce(Sum("total", filter=PAYIN), Value(ZERO), output_field=MONEY),
+            payout=Coalesce(Sum("total", filter=~PAYIN), Value(ZERO), output_field=MONEY),
+        )
+        .order_by("date")
+    )
+    flows = {}
+    for row in daily:
+        bucket = flows.setdefault(period_start(row["date"], period), [NO_FLOW, NO_FLOW])
+        # SQLite sums come back as floats; round them as the columns store them
+        bucket[0] += row["payin"].quantize(CENT)
+        bucket[1] += row["payout"].quantize(CENT)
+
+    opening = balance_as_of(start - timedelta(days=1))
+    balance = opening
+    points = []
+    bucket = period_start(start, period)
+    while bucket <= end:
+        payin, payout = flows.get(bucket, (NO_FLOW, NO_FLOW))
+        balance += payin - payout
+        points.append({
+            "date": bucket,
+            "payin": payin,
+            "payout": payout,
+            "net": payin - payout,
+            "balance": balance,
+        })
+        bucket = _next_period(bucket, period)
+
+    return {
+        "period": period,
+        "start": start,
+        "end": end,
+        "opening_balance": opening,
+        "series": points,
+    }
@@ -0,0 +1,136 @@
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from employees.models import (
+    AdvancePayment,
+    ContractualEmployee,
+    FixedEmployee,
+    FixedSalaryPayment,
+    SalaryPayment,
+    WorkRecord,
+)
+from expenses.models import Expense
+from ledger.columnar import refresh
+from payments.models import Payment
+from .analytics import analytics_report, analytics_report_orm
+
+# Queries for an uncached dashboard load, whatever the number of rows:
+# session and user, the last period close, the money cards over the rollups,
+# two employee counts, the contractual and fixed employee totals, the cash
+# balance and the forecast's rollup history.
+HOME_QUERY_BUDGET = 10
+
+
+class HomeViewQueryBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(get_user_model().objects.create_user("owner", password="x"))
+        self.today = timezone.now().date()
+
+    def seed(self, days):
+        """Movements of every kind on each of the last ``days`` days."""
+        worker = ContractualEmployee.objects.create(name=f"Worker {days}")
+        clerk = FixedEmployee.objects.create(name=f"Clerk {days}", monthly_salary=Decimal("1500.00"))
+        for offset in range(days):
+            day = self.today - timedelta(days=offset)
+            Payment.objects.create(date=day, description="sale", amount=Decimal("120.00"), type="IN")
+            Payment.objects.create(date=day, description="supplier", amount=Decimal("40.00"), type="OUT")
+            for category in Expense.Category.values:
+                Expense.objects.create(date=day, category=category, description="", amount=Decimal("5.00"))
+            WorkRecord.objects.create(employee=worker, date=day, description="hem", quantity=3, item_price=Decimal("2.50"))
+            SalaryPayment.objects.create(employee=worker, date=day, amount=Decimal("5.00"))
+            AdvancePayment.objects.create(employee=worker, date=day, amount=Decimal("1.00"))
+            FixedSalaryPayment.objects.create(employee=clerk, date=day, amount=Decimal("50.00"))
+
+    def assert_home_budget(self, params=None):
+        cache.clear()
+        with self.assertNumQueries(HOME_QUERY_BUDGET):
+            response = self.client.get(reverse("dashboard:home"), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_cold_load_stays_within_budget_as_rows_grow(self):
+        self.seed(3)
+        small = self.assert_home_budget()
+        self.seed(12)
+        large = self.assert_home_budget()
+        self.assertGreater(large.context["payins_month"], small.context["payins_month"])
+
+    def test_custom_range_costs_no_extra_queries(self):
+        self.seed(10)
+        start = self.today - timedelta(days=4)
+        response = self.assert_home_budget({"start_date": start.isoformat(), "end_date": self.today.isoformat()})
+        self.assertEqual(response.context["start_date"], start)
+
+    def test_cached_load_reads_only_the_session(self):
+        self.seed(3)
+        self.assert_home_budget()
+        # Both cached blocks are hits: only the session and user are read
+        with self.assertNumQueries(2):
+            self.client.get(reverse("dashboard:home"))
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        snapshot_settings = override_settings(LEDGER_ANALYTICS_DIR=directory.name)
+        snapshot_settings.enable()
+        self.addCleanup(snapshot_settings.disable)
+
+    def test_snapshot_and_orm_agree(self):
+        today = date(2024, 6, 15)
+        worker = ContractualEmployee.objects.create(name="Worker")
+        other = ContractualEmployee.objects.create(name="Other")
+        categories = Expense.Category.values
+        days = [today - timedelta(days=i) for i in range(400)]
+        Expense.objects.bulk_create(
+            Expense(date=day, category=categories[i % len(categories)], description="", amount=Decimal(i % 97) + Decimal("0.35"))
+            for i, day in enumerate(days)
+        )
+        Payment.objects.bulk_create(
+            Payment(date=day, description="", amount=Decimal(i % 41) * 3 + Decimal("0.10"), type="IN" if i % 3 else "OUT")
+            for i, day in enumerate(days)
+        )
+        WorkRecord.objects.bulk_create(
+            WorkRecord(employee=worker if i % 2 else other, date=day, description="", quantity=i % 7 + 1, item_price=Decimal("1.25"))
+            for i, day in enumerate(days)
+        )
+        # A movement after ``today`` is in neither report
+        Payment.objects.create(date=today + timedelta(days=1), description="", amount=Decimal("500.00"), type="IN")
+        # Codes outside the choices land in the "other" bucket on both paths
+        Expense.objects.bulk_create([Expense(date=today, category="RETIRED", description="", amount=Decimal("7.00"))])
+        Payment.objects.bulk_create([Payment(date=today, description="", amount=Decimal("3.00"), type="XX")])
+
+        refresh(rebuild=True)
+        report = analytics_report(today)
+        self.assertEqual(report, analytics_report_orm(today))
+        self.assertTrue(any(month["payin"] for month in report["cash"]))
+        self.assertEqual(report["categories"][-1]["label"], "Other")
+
+    def test_page_reads_the_snapshot_without_refreshing_it(self):
+        self.client.force_login(get_user_model().objects.create_user("owner", password="x"))
+        Payment.objects.create(date=timezone.now().date(), description="", amount=Decimal("10.00"), type="IN")
+        response = self.client.get(reverse("dashboard:analytics"))
+        self.assertContains(response, "has not been built yet")
+        self.assertIsNone(analytics_report(timezone.now().date()))
+
+        refresh()
+        response = self.client.get(reverse("dashboard:analytics"))
+        self.assertEqual(response.context["cash"][-1]["payin"], Decimal("10.00"))
+
+        # A later write shows once the snapshot is refreshed, not before
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(date=timezone.now().date(), description="", amount=Decimal("5.00"), type="IN")
+        response = self.client.get(reverse("dashboard:analytics"))
+        self.assertEqual(response.context["cash"][-1]["payin"], Decimal("10.00"))
+        refresh()
+        response = self.client.get(reverse("dashboard:analytics"))
+        self.assertEqual(response.context["cash"][-1]["payin"], Decimal("15.00"))
@@ -1,4 +1,9 @@
 from django.urls import path
-from .views import HomeView
+from .views import HomeView, analytics_view, cache_stats_view, cashflow_series_view
 app_name = 'dashboard'
-urlpatterns = [ path('', HomeView.as_view(), name='home') ]
+urlpatterns = [
+    path('', HomeView.as_view(), name='home'),
+    path('analytics/', analytics_view, name='analytics'),
+    path('cache-stats/', cache_stats_view, name='cache_stats'),
+    path('api/cashflow/series/', cashflow_series_view, name='cashflow_series'),
+]
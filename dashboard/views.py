@@ -1,19 +1,55 @@
-from django.db.models import Sum, Value, DecimalField
-from django.db.models.functions import Coalesce
+import hashlib
+import json
+
 from django.views.generic import TemplateView
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.shortcuts import render
 from django.utils import timezone
-from datetime import datetime
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+from datetime import datetime, timedelta
 from decimal import Decimal
 
-from expenses.models import Expense
-from payments.models import Payment
 from employees.models import (
+    AdvancePayment,
     ContractualEmployee,
     FixedEmployee,
-    SalaryPayment,
     FixedSalaryPayment,
+    SalaryPayment,
+    WorkRecord,
 )
+from expenses.models import Expense
+from ledger.cache import cache_stats, cached_result
+from ledger.columnar import snapshot_generations
+from ledger.entries import balance_as_of
+from ledger.rollups import ROLLUP_SOURCES
+from ledger.versions import data_versions
+from payments.models import Payment
+from .analytics import analytics_report
+from .forecast import DEFAULT_FORECAST_WEEKS, FORECAST_WEEKS, cashflow_forecast
+from .services import SERIES_PERIODS, cashflow_series, ledger_summary
+
+# Tables whose writes invalidate the cached dashboard cards.
+HOME_MODELS = [
+    Payment,
+    Expense,
+    SalaryPayment,
+    FixedSalaryPayment,
+    ContractualEmployee,
+    FixedEmployee,
+    WorkRecord,
+    AdvancePayment,
+]
+
+# Tables whose column snapshot the analytics page is computed from.
+ANALYTICS_MODELS = [Expense, Payment, WorkRecord]
+
+SERIES_DEFAULT_DAYS = 90  # range when no start date is given
+SERIES_MAX_POINTS = 1000  # longer series must use a coarser period
 
 
 class HomeView(LoginRequiredMixin, TemplateView):
@@ -27,182 +63,110 @@ class HomeView(LoginRequiredMixin, TemplateView):
         today = timezone.now().date()
         month_start = today.replace(day=1)
 
-        # === Pay-ins (this month) ===
-        payins_month = Payment.objects.filter(
-            date__range=[month_start, today], type='IN'
-        ).aggregate(total=Sum('amount'))['total'] or Decimal("0")
+        # === Date Range Filters (also include fixed salaries in payout range) ===
+        start_date_str = self.request.GET.get("start_date")
+        end_date_str = self.request.GET.get("end_date")
 
-        # === Salaries (this month) ===
-        temp_salary_paid_month = (
-            SalaryPayment.objects.filter(date__range=[month_start, today])
-            .aggregate(total=Sum("amount"))["total"] or Decimal("0")
-        )
-        fixed_salary_paid_month = (
-            FixedSalaryPayment.objects.filter(date__range=[month_start, today])
-            .aggregate(total=Sum("amount"))["total"] or Decimal("0")
+        start_date = end_date = None
+        if start_date_str and end_date_str:
+            try:
+                start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+                end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+            except ValueError:
+                start_date = end_date = None  # ignore invalid dates
+
+        # === All cards, cached until one of the underlying tables changes ===
+        cards = cached_result(
+            "dashboard:home",
+            HOME_MODELS,
+            (today, start_date, end_date),
+            lambda: self.compute_cards(today, month_start, start_date, end_date),
         )
 
-        # === Payouts (this month) — include expenses + both types of salaries ===
-        payouts_month = (
-            (Payment.objects.filter(date__range=[month_start, today], type='OUT')
-             .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-            + (Expense.objects.filter(date__range=[month_start, today], category=Expense.Category.MATERIAL)
-               .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-            + (Expense.objects.filter(date__range=[month_start, today], category=Expense.Category.RBG)
-               .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-            + (Expense.objects.filter(date__range=[month_start, today], category=Expense.Category.SETUP)
-               .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-            + (Expense.objects.filter(date__range=[month_start, today], category=Expense.Category.LOGISTICS)
-               .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-            + (Expense.objects.filter(date__range=[month_start, today], category=Expense.Category.OUTSOURCE)
-               .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-            + temp_salary_paid_month
-            + fixed_salary_paid_month
+        # === Cash-flow forecast, cached until the rolled-up tables change ===
+        try:
+            weeks = int(self.request.GET.get("forecast_weeks", DEFAULT_FORECAST_WEEKS))
+        except ValueError:
+            weeks = DEFAULT_FORECAST_WEEKS
+        weeks = min(max(weeks, FORECAST_WEEKS[0]), FORECAST_WEEKS[1])
+        forecast = cached_result(
+            "dashboard:forecast",
+            list(ROLLUP_SOURCES),
+            (today, weeks),
+            lambda: cashflow_forecast(today, weeks),
         )
 
-        balance_month = payins_month - payouts_month
+        context.update(cards)
+        context.update({
+            "start_date": start_date,
+            "end_date": end_date,
+            "forecast": forecast,
+            "forecast_weeks": weeks,
+            "forecast_week_choices": range(FORECAST_WEEKS[0], FORECAST_WEEKS[1] + 1),
+        })
+        return context
+
+    def compute_cards(self, today, month_start, start_date, end_date):
+        # === Month, range and lifetime money cards (one query over the rollups) ===
+        summary = ledger_summary(month_start, today, start_date, end_date)
 
         # === Employee Counts ===
         total_contractual = ContractualEmployee.objects.count()
         total_fixed = FixedEmployee.objects.count()
         total_employees = total_contractual + total_fixed
 
-        # === Salaries (Lifetime Totals) ===
-        temp_salary_total = (
-            SalaryPayment.objects.aggregate(
-                total=Coalesce(
-                    Sum("amount"),
-                    Value(0, output_field=DecimalField(max_digits=12, decimal_places=2)),
-                )
-            )["total"] or Decimal("0")
-        )
-
-        fixed_salary_total = (
-            FixedSalaryPayment.objects.aggregate(
-                total=Coalesce(
-                    Sum("amount"),
-                    Value(0, output_field=DecimalField(max_digits=12, decimal_places=2)),
-                )
-            )["total"] or Decimal("0")
-        )
-
-        salary_total_all = temp_salary_total + fixed_salary_total
-
-        # === Contractual Employee Totals (using existing model methods) ===
-        total_contractual_salary_paid = sum(
-            (emp.total_salary_paid or Decimal("0")) for emp in ContractualEmployee.objects.all()
-        )
-        total_contractual_balance = sum(
-            (emp.balance or Decimal("0")) for emp in ContractualEmployee.objects.all()
-        )
-        total_contractual_advances = sum(
-            (emp.total_advances or Decimal("0")) for emp in ContractualEmployee.objects.all()
-        )
-
-        # === Fixed Employee "Advances" Logic (treated as overpayment beyond monthly salary) ===
-        fixed_paid_by_emp = dict(
-            FixedSalaryPayment.objects.values('employee')
-            .annotate(
-                total=Coalesce(
-                    Sum('amount'),
-                    Value(0, output_field=DecimalField(max_digits=12, decimal_places=2)),
-                )
-            )
-            .values_list('employee', 'total')
-        )
+        # === Contractual Employee Totals (stored running totals, one query) ===
+        total_contractual_salary_paid = Decimal("0")
+        total_contractual_balance = Decimal("0")
+        total_contractual_advances = Decimal("0")
+        for emp in ContractualEmployee.objects.with_totals():
+            total_contractual_salary_paid += emp.total_salary_paid
+            total_contractual_balance += emp.balance
+            total_contractual_advances += emp.total_advances
 
+        # === Salary Pending (combined balances) ===
+        # Fixed balance = monthly_salary - total_paid; overpayment counts as an
+        # advance ("Advances" logic: overpayment beyond monthly salary).
         fixed_advances_total = Decimal('0')
-        for fe in FixedEmployee.objects.all():
-            paid = fixed_paid_by_emp.get(fe.id, Decimal('0'))
-            due = fe.monthly_salary or Decimal('0')
+        total_fixed_balance = Decimal('0')
+        for monthly_salary, paid in FixedEmployee.objects.values_list('monthly_salary', 'paid_total'):
+            due = monthly_salary or Decimal('0')
             overpay = paid - due
             if overpay > 0:
                 fixed_advances_total += overpay
+            total_fixed_balance += (due - paid)
 
         # === Combined Advances ===
         total_advances_all = total_contractual_advances + fixed_advances_total
 
-        # === Salary Pending (combined balances) ===
-        # NOTE: If your FixedEmployee has a balance property, this will work.
-        # If not, we assume balance = monthly_salary - total_paid
-        total_fixed_balance = Decimal('0')
-        for fe in FixedEmployee.objects.all():
-            total_paid = fixed_paid_by_emp.get(fe.id, Decimal('0'))
-            due = fe.monthly_salary or Decimal('0')
-            total_fixed_balance += (due - total_paid)
-
         salary_pending = total_contractual_balance + total_fixed_balance
 
-        # === Date Range Filters (also include fixed salaries in payout range) ===
-        start_date_str = self.request.GET.get("start_date")
-        end_date_str = self.request.GET.get("end_date")
-
-        start_date = end_date = None
-        payins_range = payouts_range = balance_range = None
-        salary_paid_range = fixed_salary_paid_range = None
+        # === Cash Balance (one indexed ledger lookup) ===
+        cash_balance = balance_as_of(today)
 
-        if start_date_str and end_date_str:
-            try:
-                start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-                end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
-
-                payins_range = Payment.objects.filter(
-                    date__range=[start_date, end_date], type='IN'
-                ).aggregate(total=Sum('amount'))['total'] or Decimal("0")
-
-                payouts_range = (
-                    (Payment.objects.filter(date__range=[start_date, end_date], type='OUT')
-                     .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-                    + (Expense.objects.filter(date__range=[start_date, end_date], category=Expense.Category.MATERIAL)
-                       .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-                    + (Expense.objects.filter(date__range=[start_date, end_date], category=Expense.Category.RBG)
-                       .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-                    + (Expense.objects.filter(date__range=[start_date, end_date], category=Expense.Category.SETUP)
-                       .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-                    +(Expense.objects.filter(date__range=[start_date, end_date], category=Expense.Category.OUTSOURCE)
-                       .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-                    +(Expense.objects.filter(date__range=[start_date, end_date], category=Expense.Category.LOGISTICS)
-                       .aggregate(total=Sum('amount'))['total'] or Decimal("0"))
-                )
-
-                salary_paid_range = SalaryPayment.objects.filter(
-                    date__range=[start_date, end_date]
-                ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-
-                fixed_salary_paid_range = FixedSalaryPayment.objects.filter(
-                    date__range=[start_date, end_date]
-                ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-
-                payouts_range += (salary_paid_range + fixed_salary_paid_range)
-                balance_range = payins_range - payouts_range
-
-            except ValueError:
-                pass  # ignore invalid dates
-
-        # === Context ===
-        context.update({
+        # === Cards ===
+        return {
             # Monthly overview
-            "payins_month": payins_month,
-            "payouts_month": payouts_month,
-            "balance_month": balance_month,
-            "salary_paid_month": temp_salary_paid_month,
-            "fixed_salary_paid_month": fixed_salary_paid_month,
-            "salary_total_month": temp_salary_paid_month + fixed_salary_paid_month,
+            "payins_month": summary["payins_month"],
+            "payouts_month": summary["payouts_month"],
+            "balance_month": summary["balance_month"],
+            "salary_paid_month": summary["salary_paid_month"],
+            "fixed_salary_paid_month": summary["fixed_salary_paid_month"],
+            "salary_total_month": summary["salary_total_month"],
 
             # Date range metrics
-            "start_date": start_date,
-            "end_date": end_date,
-            "payins_range": payins_range,
-            "payouts_range": payouts_range,
-            "balance_range": balance_range,
-            "salary_paid_range": salary_paid_range,
-            "fixed_salary_paid_range": fixed_salary_paid_range,
+            "payins_range": summary.get("payins_range"),
+            "payouts_range": summary.get("payouts_range"),
+            "balance_range": summary.get("balance_range"),
+            "salary_paid_range": summary.get("salary_paid_range"),
+            "fixed_salary_paid_range": summary.get("fixed_salary_paid_range"),
 
             # Summary cards
-            "temp_salary_total": temp_salary_total,
-            "fixed_salary_total": fixed_salary_total,
-            "salary_total_all": salary_total_all,
+            "temp_salary_total": summary["temp_salary_total"],
+            "fixed_salary_total": summary["fixed_salary_total"],
+            "salary_total_all": summary["salary_total_all"],
             "total_advances": total_advances_all,  # <-- Combined advances
+            "cash_balance": cash_balance,
 
             # Employee stats
             "total_salary_paid": total_contractual_salary_paid,
@@ -210,6 +174,76 @@ class HomeView(LoginRequiredMixin, TemplateView):
             "total_fixed": total_fixed,
             "total_employees": total_employees,
             "salary_pending": salary_pending,
-        })
+        }
 
-        return context
+
+@staff_member_required
+def cache_stats_view(request):
+    """Hit/miss/recompute timings of the cached dashboard and list results (this process)."""
+    return JsonResponse(cache_stats())
+
+
+def _series_params(request):
+    """(start, end, period) from the query string, or None when they are invalid."""
+    period = request.GET.get("period", "day")
+    try:
+        end_str = request.GET.get("end")
+        end = datetime.strptime(end_str, "%Y-%m-%d").date() if end_str else timezone.now().date()
+        start_str = request.GET.get("start")
+        start = (
+            datetime.strptime(start_str, "%Y-%m-%d").date() if start_str
+            else end - timedelta(days=SERIES_DEFAULT_DAYS - 1)
+        )
+    except ValueError:
+        return None
+    if period not in SERIES_PERIODS or start > end:
+        return None
+    return start, end, period
+
+
+def _series_etag(request):
+    # The tables' data versions change on every committed write, so the
+    # ETag can be checked with one small query and no series computed.
+    params = _series_params(request)
+    if params is None:
+        return None
+    raw = json.dumps([params, data_versions(list(ROLLUP_SOURCES))], cls=DjangoJSONEncoder)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+@login_required(login_url="/accounts/login/")
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_series_etag)
+def cashflow_series_view(request):
+    """
+    Daily, weekly or monthly pay-in, pay-out and running cash balance as
+    JSON (?start=&end=&period=day|week|month). Polls with If-None-Match get
+    a 304 while none of the money tables has changed.
+    """
+    params = _series_params(request)
+    if params is None:
+        return JsonResponse(
+            {"error": "start and end must be YYYY-MM-DD dates, start <= end, period one of day, week, month"},
+            status=400,
+        )
+    start, end, period = params
+    points = {"day": 1, "week": 7, "month": 30}[period]
+    if (end - start).days // points + 1 > SERIES_MAX_POINTS:
+        return JsonResponse({"error": f"at most {SERIES_MAX_POINTS} points; use a coarser period"}, status=400)
+    return JsonResponse(cashflow_series(start, end, period))
+
+
+@login_required(login_url="/accounts/login/")
+def analytics_view(request):
+    """
+    Category trends, monthly cash flow, rolling pay-outs and productivity
+    from the column snapshot. The page never refreshes the snapshot (that is
+    refresh_analytics' job), so results are cached by snapshot generation.
+    """
+    today = timezone.now().date()
+    generations = snapshot_generations(ANALYTICS_MODELS)
+    if None in generations:
+        return render(request, "dashboard/analytics.html", {"snapshot_missing": True})
+    report = cached_result("dashboard:analytics", [], (today, generations), lambda: analytics_report(today))
+    return render(request, "dashboard/analytics.html", report or {"snapshot_missing": True})
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class EmployeesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "employees"
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the balance receivers)
@@ -1,4 +1,5 @@
 from django import forms
+from ledger.forms import OpenPeriodFormMixin
 from .models import ContractualEmployee, WorkRecord, FixedEmployee, FixedSalaryPayment, FixedWorkRecord
 
 class ContractualEmployeeForm(forms.ModelForm):
@@ -6,7 +7,7 @@ class ContractualEmployeeForm(forms.ModelForm):
         model = ContractualEmployee
         fields = ["name", "phone", "role"]
 
-class WorkRecordForm(forms.ModelForm):
+class WorkRecordForm(OpenPeriodFormMixin, forms.ModelForm):
     class Meta:
         model = WorkRecord
         fields = ["date", "quantity", "item_price", "description"]  # ✅ new fields here
@@ -16,7 +17,7 @@ class FixedEmployeeForm(forms.ModelForm):
         model = FixedEmployee
         fields = ["name", "phone", "role", "monthly_salary"]
 
-class FixedSalaryPaymentForm(forms.ModelForm):
+class FixedSalaryPaymentForm(OpenPeriodFormMixin, forms.ModelForm):
     class Meta:
         model = FixedSalaryPayment
         fields = ["date", "amount", "description"]
@@ -44,7 +45,7 @@ class FixedSalaryPaymentForm(forms.ModelForm):
                          "focus:ring-2 focus:ring-green-500 focus:border-green-500"
             }),
         }
-class FixedWorkRecordForm(forms.ModelForm):
+class FixedWorkRecordForm(OpenPeriodFormMixin, forms.ModelForm):
     class Meta:
         model = FixedWorkRecord
         fields = ["date", "hours", "rate", "amount", "description"]
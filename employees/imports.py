@@ -0,0 +1,135 @@
+import csv
+
+from django.db import transaction
+
+from ledger.imports import ImportResult, parse_day, parse_money
+from ledger.periods import check_open, closed_through
+from .models import ContractualEmployee, WorkRecord
+
+WORK_BATCH_SIZE = 2000
+
+PRICE_FIELD = WorkRecord._meta.get_field("item_price")
+
+# CSV columns (headers are lower-cased with spaces as underscores, so "Item Price" works)
+WORK_COLUMNS = {"employee", "date", "description", "quantity", "item_price"}
+
+
+def normalise_work_row(date_str, desc_raw, qty_raw, price_raw, default_date):
+    """
+    WorkRecord field values (without the employee) for one row, or None when
+    the row has no description, quantity or price. Prices are parsed as
+    Decimal, never float. Raises ValueError(reason) for a row that cannot be saved.
+    """
+    date_str = (date_str or "").strip()
+    description = (desc_raw or "").strip()
+    qty_str = (qty_raw or "").strip()
+    price_str = (price_raw or "").strip()
+
+    # The form pre-fills the date, so a row is blank without the other three
+    if not any([description, qty_str, price_str]):
+        return None
+
+    try:
+        quantity = int(qty_str)
+    except ValueError:
+        raise ValueError(f"invalid quantity {qty_raw!r}") from None
+    if quantity < 0:
+        raise ValueError(f"invalid quantity {qty_raw!r}")
+
+    item_price = parse_money(price_str, PRICE_FIELD, "item price")
+    if item_price < 0:
+        raise ValueError(f"invalid item price {price_raw!r}")
+
+    try:
+        day = parse_day(date_str) if date_str else default_date
+    except ValueError:
+        raise ValueError(f"invalid date {date_str!r} (expected YYYY-MM-DD)") from None
+
+    return {"date": day, "description": description, "quantity": quantity, "item_price": item_price}
+
+
+def employee_resolver():
+    """
+    A function mapping a sheet's employee cell (id, or exact name in any
+    case) to a ContractualEmployee pk; raises ValueError. One query up front.
+    """
+    by_id, by_name, ambiguous = {}, {}, set()
+    for pk, name in ContractualEmployee.objects.values_list("pk", "name"):
+        by_id[str(pk)] = pk
+        key = name.strip().lower()
+        if key in by_name:
+            ambiguous.add(key)
+        by_name[key] = pk
+
+    def resolve(raw):
+        value = (raw or "").strip()
+        if not value:
+            raise ValueError("missing employee")
+        if value in by_id:
+            return by_id[value]
+        key = value.lower()
+        if key in ambiguous:
+            raise ValueError(f"several employees are called {value!r}; use the id")
+        if key not in by_name:
+            raise ValueError(f"unknown employee {value!r}")
+        return by_name[key]
+
+    return resolve
+
+
+def import_work_rows(rows, resolve, default_date, batch_size=WORK_BATCH_SIZE):
+    """
+    Save ``(line, employee, date, description, quantity, item_price)`` rows as
+    WorkRecords. Every row is validated first; if any is invalid nothing is
+    written and the errors come back in the ImportResult. Otherwise one
+    bulk_create per batch, all inside one transaction.
+    """
+    result = ImportResult()
+    records = []
+    closed = closed_through()
+    for line, employee_raw, date_str, desc_raw, qty_raw, price_raw in rows:
+        try:
+            values = normalise_work_row(date_str, desc_raw, qty_raw, price_raw, default_date)
+            if values is None:
+                continue
+            check_open(values["date"], closed, "Work")
+            records.append(WorkRecord(employee_id=resolve(employee_raw), **values))
+        except ValueError as exc:
+            result.add_error(line, str(exc))
+        result.rows += 1
+
+    if result.error_count:
+        result.rolled_back = True
+        return result
+    with transaction.atomic():
+        for start in range(0, len(records), batch_size):
+            WorkRecord.objects.bulk_create(records[start:start + batch_size])
+    result.created = len(records)
+    return result
+
+
+def read_work_csv(textfile):
+    """
+    Rows for import_work_rows() from a CSV with Employee, Date, Description,
+    Quantity and Item Price columns (case-insensitive header).
+    """
+    reader = csv.reader(textfile)
+    header = [h.strip().lower().replace(" ", "_") for h in next(reader, [])]
+    missing = {"employee", "quantity", "item_price"} - set(header)
+    if missing:
+        raise ValueError(f"CSV is missing the {', '.join(sorted(missing))} column(s).")
+    index = {name: header.index(name) for name in WORK_COLUMNS if name in header}
+
+    def cell(row, name):
+        i = index.get(name)
+        return row[i] if i is not None and i < len(row) else ""
+
+    for row in reader:
+        yield (
+            reader.line_num,
+            cell(row, "employee"),
+            cell(row, "date"),
+            cell(row, "description"),
+            cell(row, "quantity"),
+            cell(row, "item_price"),
+        )
@@ -0,0 +1,52 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from employees.payroll import outstanding_balances, run_payroll
+
+
+class Command(BaseCommand):
+    help = (
+        "Pay every contractual employee their outstanding balance in one transaction "
+        "and record a PayrollRun. Prints the query count and time taken."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Pay date, YYYY-MM-DD (default today).")
+        parser.add_argument("--description", default="", help="Stored on the run and every salary payment.")
+        parser.add_argument("--dry-run", action="store_true", help="List who would be paid without paying.")
+
+    def handle(self, *args, **options):
+        try:
+            pay_date = datetime.strptime(options["date"], "%Y-%m-%d").date() if options["date"] else None
+        except ValueError:
+            raise CommandError(f"Invalid --date: {options['date']}") from None
+
+        if options["dry_run"]:
+            total = 0
+            for employee in outstanding_balances():
+                self.stdout.write(f"{employee.pk:>6}  {employee.name:<30} {employee.balance:>12}")
+                total += employee.balance
+            self.stdout.write(f"Total: {total}")
+            return
+
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count):
+                run = run_payroll(pay_date=pay_date, description=options["description"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Payroll run #{run.pk}: paid {run.employee_count} employee(s) {run.total_paid} "
+            f"(advances {run.total_advances}) in {len(queries)} queries, {elapsed:.2f}s"
+        ))
@@ -0,0 +1,57 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from employees.models import ContractualEmployee, FixedEmployee
+
+CENT = Decimal("0.01")
+
+# employee model -> {stored column: recomputed annotation}
+CHECKS = {
+    ContractualEmployee: {"earned_total": "earned_calc", "paid_total": "paid_calc", "advance_total": "advance_calc"},
+    FixedEmployee: {"earned_total": "earned_calc", "paid_total": "paid_calc"},
+}
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored employee balance totals and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without repairing it.")
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        repaired = 0
+
+        for model, columns in CHECKS.items():
+            drifted = []
+            rows = (
+                model.objects.with_recomputed_totals()
+                .only("id", "name", *columns)
+                .order_by("pk")
+                .iterator(chunk_size=chunk_size)
+            )
+            for employee in rows:
+                changed = False
+                for column, calc in columns.items():
+                    expected = getattr(employee, calc).quantize(CENT, rounding=ROUND_HALF_UP)
+                    stored = getattr(employee, column)
+                    if stored != expected:
+                        self.stdout.write(
+                            f"{model.__name__} #{employee.pk} {employee.name}: "
+                            f"{column} {stored} -> {expected}"
+                        )
+                        setattr(employee, column, expected)
+                        changed = True
+                if changed:
+                    drifted.append(employee)
+
+            if drifted and not options["dry_run"]:
+                with transaction.atomic():
+                    model.objects.bulk_update(drifted, list(columns), batch_size=chunk_size)
+            repaired += len(drifted)
+
+        verb = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {repaired} employee(s) with drifted totals."))
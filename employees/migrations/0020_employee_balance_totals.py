@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:13
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+# (employee model, stored column, record model, summed expression)
+TOTALS = [
+    ("ContractualEmployee", "earned_total", "WorkRecord", F("quantity") * F("item_price")),
+    ("ContractualEmployee", "paid_total", "SalaryPayment", F("amount")),
+    ("ContractualEmployee", "advance_total", "AdvancePayment", F("amount")),
+    ("FixedEmployee", "earned_total", "FixedWorkRecord", F("amount")),
+    ("FixedEmployee", "paid_total", "FixedSalaryPayment", F("amount")),
+]
+
+
+def backfill_totals(apps, schema_editor):
+    for employee_name, column, record_name, expression in TOTALS:
+        Employee = apps.get_model("employees", employee_name)
+        Record = apps.get_model("employees", record_name)
+        sums = (
+            Record.objects.order_by()
+            .values("employee")
+            .annotate(total=Sum(expression, output_field=models.DecimalField(max_digits=12, decimal_places=2)))
+        )
+        for row in sums:
+            Employee.objects.filter(pk=row["employee"]).update(**{column: row["total"] or 0})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0019_fixedworkrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractualemployee',
+            name='advance_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='contractualemployee',
+            name='earned_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='contractualemployee',
+            name='paid_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='fixedemployee',
+            name='earned_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='fixedemployee',
+            name='paid_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0020_employee_balance_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='advancepayment',
+            index=models.Index(fields=['employee', '-date', '-id'], name='advance_emp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixedsalarypayment',
+            index=models.Index(fields=['employee', '-date', '-id'], name='fixedpay_emp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixedworkrecord',
+            index=models.Index(fields=['employee', '-date', '-id'], name='fixedwork_emp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salarypayment',
+            index=models.Index(fields=['employee', '-date', '-id'], name='salarypay_emp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workrecord',
+            index=models.Index(fields=['employee', '-date', '-id'], name='workrecord_emp_date_idx'),
+        ),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:01
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+MODELS = [
+    ("ContractualEmployee", "employees_contractualemployee"),
+    ("FixedEmployee", "employees_fixedemployee"),
+    ("TemporaryWorker", "employees_temporaryworker"),
+]
+
+
+# Frozen copies of employees.typeahead.normalise_name / phone_digits
+def normalise_name(value):
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    plain = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"[\W_]+", " ", plain.casefold()).strip()
+
+
+def phone_digits(value):
+    return re.sub(r"\D+", "", value or "")
+
+
+def backfill_keys(apps, schema_editor):
+    for model_name, _ in MODELS:
+        model = apps.get_model("employees", model_name)
+        name_length = model._meta.get_field("search_name").max_length
+        phone_length = model._meta.get_field("phone_digits").max_length
+        rows = list(model.objects.only("pk", "name", "phone"))
+        for row in rows:
+            row.search_name = normalise_name(row.name)[:name_length]
+            row.phone_digits = phone_digits(row.phone)[:phone_length]
+        model.objects.bulk_update(rows, ["search_name", "phone_digits"], batch_size=500)
+
+
+def add_trigram_indexes(apps, schema_editor):
+    # PostgreSQL matches substrings through pg_trgm; other backends match
+    # prefixes with the B-tree indexes above.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for _, table in MODELS:
+        for column in ("search_name", "phone_digits"):
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for _, table in MODELS:
+        for column in ("search_name", "phone_digits"):
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0022_payroll_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contractualemployee',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='contractualemployee',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='fixedemployee',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='fixedemployee',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='temporaryworker',
+            name='phone_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=15),
+        ),
+        migrations.AddField(
+            model_name='temporaryworker',
+            name='search_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='contractualemployee',
+            index=models.Index(fields=['search_name'], name='contractual_search_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contractualemployee',
+            index=models.Index(fields=['phone_digits'], name='contractual_phone_digits_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixedemployee',
+            index=models.Index(fields=['search_name'], name='fixed_search_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fixedemployee',
+            index=models.Index(fields=['phone_digits'], name='fixed_phone_digits_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='temporaryworker',
+            index=models.Index(fields=['search_name'], name='temp_search_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='temporaryworker',
+            index=models.Index(fields=['phone_digits'], name='temp_phone_digits_idx'),
+        ),
+        migrations.RunPython(backfill_keys, migrations.RunPython.noop),
+        migrations.RunPython(add_trigram_indexes, drop_trigram_indexes),
+    ]
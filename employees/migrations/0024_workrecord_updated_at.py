@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0023_typeahead_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workrecord',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='workrecord',
+            index=models.Index(fields=['updated_at'], name='workrecord_updated_idx'),
+        ),
+    ]
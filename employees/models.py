@@ -1,31 +1,107 @@
+from decimal import Decimal
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from ledger.bulk import BulkSignalQuerySet
+from ledger.models import ArchivedMonth
+
+MONEY = models.DecimalField(max_digits=12, decimal_places=2)
+
+
+def _employee_sum(model, expression):
+    """Correlated subquery: SUM(expression) over ``model`` rows for the outer employee."""
+    totals = (
+        model.objects.filter(employee=OuterRef("pk"))
+        .order_by()
+        .values("employee")
+        .annotate(total=Sum(expression, output_field=MONEY))
+        .values("total")
+    )
+    return Coalesce(Subquery(totals, output_field=MONEY), Value(Decimal("0")), output_field=MONEY)
+
+
+def _archived_sum(model):
+    """Correlated subquery: the total of the outer employee's ``model`` rows moved out by archive_ledger."""
+    totals = (
+        ArchivedMonth.objects.filter(label=model._meta.label_lower, employee_id=OuterRef("pk"))
+        .order_by()
+        .values("employee_id")
+        .annotate(total=Sum("total", output_field=MONEY))
+        .values("total")
+    )
+    return Coalesce(Subquery(totals, output_field=MONEY), Value(Decimal("0")), output_field=MONEY)
+
+
+class ContractualEmployeeQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Annotate balance/advances from the stored totals so list pages can
+        filter and sort on them without touching the record tables.
+        """
+        return self.annotate(
+            balance_calc=F("earned_total") - F("paid_total"),
+            advances_calc=Case(
+                When(paid_total__gt=F("earned_total"), then=F("paid_total") - F("earned_total")),
+                default=Value(Decimal("0")),
+                output_field=MONEY,
+            ),
+        )
+
+    def with_recomputed_totals(self):
+        """Annotate the totals recomputed from the record tables (for verify_balances)."""
+        return self.annotate(
+            earned_calc=_employee_sum(WorkRecord, F("quantity") * F("item_price")) + _archived_sum(WorkRecord),
+            paid_calc=_employee_sum(SalaryPayment, F("amount")),
+            advance_calc=_employee_sum(AdvancePayment, F("amount")),
+        )
+
 
 class ContractualEmployee(models.Model):
     name = models.CharField(max_length=100)
     phone = models.CharField(max_length=15, blank=True, null=True)
     role = models.CharField(max_length=100, blank=True, null=True)
+
+    # Running totals, kept in step by employees.signals (see verify_balances)
+    earned_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    paid_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    advance_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+
+    # Typeahead keys, kept in step with name/phone by employees.signals
+    search_name = models.CharField(max_length=100, blank=True, default="", editable=False)
+    phone_digits = models.CharField(max_length=15, blank=True, default="", editable=False)
+
+    objects = ContractualEmployeeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["search_name"], name="contractual_search_name_idx"),
+            models.Index(fields=["phone_digits"], name="contractual_phone_digits_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
     # --- Salary/Payment Calculations ---
     @property
     def total_earned(self):
-        return sum(wr.quantity * wr.item_price for wr in self.work_records.all())
+        return self.earned_total
 
     @property
     def total_salary_paid(self):
-        return sum(p.amount for p in self.salary_payments.all())
+        return self.paid_total
 
     @property
     def balance(self):
-        return self.total_earned - self.total_salary_paid
+        return self.earned_total - self.paid_total
 
     @property
     def total_advances(self):
-        extra = self.total_salary_paid - self.total_earned
-        return extra if extra > 0 else 0
+        extra = self.paid_total - self.earned_total
+        return extra if extra > 0 else Decimal("0")
     @property
     def balance_abs(self):
         return abs(self.balance)
@@ -47,7 +123,15 @@ class WorkRecord(models.Model):
     # New fields
     item_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # ✅ safe default
     description = models.TextField(blank=True, null=True)  # ✅ optional
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BulkSignalQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["employee", "-date", "-id"], name="workrecord_emp_date_idx"),
+            models.Index(fields=["updated_at"], name="workrecord_updated_idx"),
+        ]
 
     def total_price(self):
         return self.quantity * self.item_price
@@ -60,6 +144,26 @@ class WorkRecord(models.Model):
         return self.quantity * self.item_price
 
 
+class PayrollRun(models.Model):
+    """Audit header for one payroll run: who paid how many contractual employees, when, and how much."""
+
+    date = models.DateField(default=timezone.now)  # pay date on every payment of the run
+    description = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    employee_count = models.PositiveIntegerField(default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_advances = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return f"Payroll {self.date} ({self.employee_count} employees, {self.total_paid})"
+
+
 class SalaryPayment(models.Model):
     employee = models.ForeignKey(
         "employees.ContractualEmployee",
@@ -69,10 +173,23 @@ class SalaryPayment(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     date = models.DateField(default=timezone.now)
     description = models.TextField(blank=True, null=True)  # ✅ new field
+    payroll_run = models.ForeignKey(
+        PayrollRun, null=True, blank=True, editable=False, on_delete=models.SET_NULL, related_name="salary_payments"
+    )
+
+    objects = BulkSignalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["employee", "-date", "-id"], name="salarypay_emp_date_idx")]
 
     def save(self, *args, **kwargs):
-        # Check balance before saving
-        available_balance = self.employee.total_earned - self.employee.total_salary_paid
+        # Check balance before saving (stored totals, not a scan of the history)
+        earned, paid = (
+            ContractualEmployee.objects.filter(pk=self.employee_id)
+            .values_list("earned_total", "paid_total")
+            .get()
+        )
+        available_balance = earned - paid
 
         super().save(*args, **kwargs)  # Save salary first
 
@@ -93,19 +210,43 @@ class SalaryPayment(models.Model):
 # ---------------------- OTHER MODELS ----------------------
 
 
+class FixedEmployeeQuerySet(models.QuerySet):
+    def with_recomputed_totals(self):
+        """Annotate the totals recomputed from the record tables (for verify_balances)."""
+        return self.annotate(
+            earned_calc=_employee_sum(FixedWorkRecord, F("amount")),
+            paid_calc=_employee_sum(FixedSalaryPayment, F("amount")),
+        )
+
+
 class FixedEmployee(models.Model):
     name = models.CharField(max_length=255)
     phone = models.CharField(max_length=20, blank=True, null=True)
     role = models.CharField(max_length=100, blank=True, null=True)
     monthly_salary = models.DecimalField(max_digits=10, decimal_places=2)
 
+    # Running totals (overtime credited / salary paid), kept by employees.signals
+    earned_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    paid_total = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+
+    # Typeahead keys, kept in step with name/phone by employees.signals
+    search_name = models.CharField(max_length=255, blank=True, default="", editable=False)
+    phone_digits = models.CharField(max_length=20, blank=True, default="", editable=False)
+
+    objects = FixedEmployeeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["search_name"], name="fixed_search_name_idx"),
+            models.Index(fields=["phone_digits"], name="fixed_phone_digits_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
     @property
     def paid_amount(self):
-        total = self.fixed_payments.aggregate(models.Sum("amount"))["amount__sum"] or 0
-        return total
+        return self.paid_total
 
     @property
     def balance(self):
@@ -121,6 +262,16 @@ class TemporaryWorker(models.Model):
     role = models.CharField(max_length=100, blank=True, null=True)
     item_price = models.DecimalField(max_digits=10, decimal_places=2)
 
+    # Typeahead keys, kept in step with name/phone by employees.signals
+    search_name = models.CharField(max_length=100, blank=True, default="", editable=False)
+    phone_digits = models.CharField(max_length=15, blank=True, default="", editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["search_name"], name="temp_search_name_idx"),
+            models.Index(fields=["phone_digits"], name="temp_phone_digits_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -144,6 +295,11 @@ class AdvancePayment(models.Model):
     note = models.TextField(blank=True, null=True)
     date = models.DateField(default=timezone.now)
 
+    objects = BulkSignalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["employee", "-date", "-id"], name="advance_emp_date_idx")]
+
     def __str__(self):
         return f"Advance {self.amount} for {self.employee.name} on {self.date}"
 
@@ -159,6 +315,11 @@ class FixedSalaryPayment(models.Model):
     date = models.DateField(default=timezone.now)
     description = models.TextField(blank=True, default="")  # ← NEW
 
+    objects = BulkSignalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["employee", "-date", "-id"], name="fixedpay_emp_date_idx")]
+
     def __str__(self):
         return f"{self.employee.name} - {self.amount} on {self.date}"
 
@@ -175,6 +336,11 @@ class FixedWorkRecord(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)  # computed if 0
     description = models.TextField(blank=True, null=True)
 
+    objects = BulkSignalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["employee", "-date", "-id"], name="fixedwork_emp_date_idx")]
+
     def save(self, *args, **kwargs):
         # If amount not provided, compute it from hours * rate
         if not self.amount or self.amount == 0:
@@ -0,0 +1,77 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Round
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from .models import AdvancePayment, ContractualEmployee, PayrollRun, SalaryPayment
+
+
+# Owed money once the balance is rounded to pence: SQLite keeps the running
+# totals as REAL, so equal totals can differ by float dust.
+OWED = GreaterThan(Round(F("earned_total") - F("paid_total"), 2), 0)
+
+
+def outstanding_balances():
+    """Contractual employees who are owed money (see ``.balance``), in one query."""
+    return ContractualEmployee.objects.filter(OWED).order_by("name", "id")
+
+
+def run_payroll(amounts=None, pay_date=None, description="", user=None):
+    """
+    Pay many contractual employees in one transaction and return the PayrollRun.
+
+    ``amounts`` maps employee id -> Decimal; None pays everyone their full
+    outstanding balance. As in SalaryPayment.save(), whatever a payment goes
+    over the employee's balance is also recorded as an AdvancePayment. The
+    balances are read in one query and every row is written with bulk_create,
+    so the query count does not grow with the number of employees.
+    Raises ValueError when there is nobody to pay or an amount is not positive.
+    """
+    pay_date = pay_date or timezone.now().date()
+    with transaction.atomic():
+        employees = ContractualEmployee.objects.select_for_update()
+        if amounts is None:
+            employees = employees.filter(OWED)
+        else:
+            employees = employees.filter(pk__in=list(amounts))
+        balances = {pk: earned - paid for pk, earned, paid in employees.values_list("pk", "earned_total", "paid_total")}
+
+        if amounts is None:
+            amounts = balances
+        else:
+            unknown = set(amounts) - set(balances)
+            if unknown:
+                raise ValueError(f"Unknown employee id(s): {', '.join(map(str, sorted(unknown)))}")
+            if any(amount <= 0 for amount in amounts.values()):
+                raise ValueError("Payroll amounts must be positive.")
+        if not amounts:
+            raise ValueError("Nobody to pay.")
+
+        overpaid = {pk: amount - balances[pk] for pk, amount in amounts.items() if amount > balances[pk]}
+        run = PayrollRun.objects.create(
+            date=pay_date,
+            description=description,
+            created_by=user if user is not None and user.is_authenticated else None,
+            employee_count=len(amounts),
+            total_paid=sum(amounts.values(), Decimal("0")),
+            total_advances=sum(overpaid.values(), Decimal("0")),
+        )
+
+        salaries = SalaryPayment.objects.bulk_create([
+            SalaryPayment(employee_id=pk, amount=amount, date=pay_date, description=description, payroll_run=run)
+            for pk, amount in amounts.items()
+        ])
+        AdvancePayment.objects.bulk_create([
+            AdvancePayment(
+                employee_id=salary.employee_id,
+                amount=overpaid[salary.employee_id],
+                date=pay_date,
+                note=f"Auto-created from salary ID {salary.pk} (payroll run {run.pk})",
+            )
+            for salary in salaries
+            if salary.employee_id in overpaid
+        ])
+    return run
@@ -0,0 +1,183 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils.timezone import now
+
+from ledger.archive import archived_rows
+from .models import FixedSalaryPayment, FixedWorkRecord, WorkRecord
+
+# Context builders shared by the HTML views and the queued PDF reports (reports app).
+# Record tables stay lazy querysets: the views page them, the PDFs stream them.
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+WORK_VALUE = F("quantity") * F("item_price")
+
+PERIODS = {"week": TruncWeek, "month": TruncMonth}
+PERIOD_START = {
+    "week": lambda day: day - timedelta(days=day.weekday()),
+    "month": lambda day: day.replace(day=1),
+}
+
+
+def _total(queryset, expression="amount"):
+    """SUM(expression) in the database, rounded to cents (SQLite hands back raw floats)."""
+    value = queryset.order_by().aggregate(total=Sum(expression, output_field=MONEY))["total"]
+    return (value or ZERO).quantize(CENT)
+
+
+def period_summary(period, sources):
+    """
+    Per-week or per-month totals, newest first: [{"period": date, name: total, ...}].
+    ``sources`` maps a name to (queryset, expression); each is one grouped query.
+    """
+    trunc = PERIODS[period]
+    rows = defaultdict(lambda: dict.fromkeys(sources, ZERO))
+    for name, (queryset, expression) in sources.items():
+        grouped = (
+            queryset.order_by()
+            .annotate(period=trunc("date"))
+            .values("period")
+            .annotate(total=Sum(expression, output_field=MONEY))
+        )
+        for row in grouped:
+            rows[row["period"]][name] = (row["total"] or ZERO).quantize(CENT)
+    return [{"period": day, **totals} for day, totals in sorted(rows.items(), reverse=True)]
+
+
+def payslip_context(employee, today):
+    return {
+        "employee": employee,
+        "today": today,
+    }
+
+
+def employee_report_context(employee, start_date=None, end_date=None, period=None):
+    """
+    Work, salary and advance rows (all, or within start_date..end_date) with
+    their totals, summed in the database; archived work records in the
+    range (``archived_work_records``) count too. ``period`` ("week"/"month")
+    adds ``period_rows``, a per-period summary for long histories.
+    """
+    work_records = employee.work_records.order_by("-date", "-id")
+    salary_payments = employee.salary_payments.order_by("-date", "-id")
+    advance_payments = employee.advance_payments.order_by("-date", "-id")
+    if start_date and end_date:
+        work_records = work_records.filter(date__range=[start_date, end_date])
+        salary_payments = salary_payments.filter(date__range=[start_date, end_date])
+        advance_payments = advance_payments.filter(date__range=[start_date, end_date])
+
+    # Work moved out by archive_ledger (always older than the live rows)
+    archived_work = list(archived_rows(WorkRecord, start_date, end_date, employee_id=employee.pk))
+
+    # Totals
+    total_work = _total(work_records, WORK_VALUE) + sum((w.total for w in archived_work), ZERO)
+    total_salary = _total(salary_payments)
+    total_advances = _total(advance_payments)
+    balance = total_work - (total_salary + total_advances)
+
+    context = {
+        "employee": employee,
+        "start_date": start_date,
+        "end_date": end_date,
+        "work_records": work_records,
+        "archived_work_records": archived_work,
+        "salary_payments": salary_payments,
+        "advance_payments": advance_payments,
+        "total_work": total_work,
+        "total_salary": total_salary,
+        "total_advances": total_advances,
+        "balance": balance,
+        "today": now().date(),
+        "period": period,
+    }
+    if period in PERIODS:
+        context["period_rows"] = period_summary(period, {
+            "work": (work_records, WORK_VALUE),
+            "salary": (salary_payments, "amount"),
+            "advances": (advance_payments, "amount"),
+        })
+        if archived_work:
+            rows = {row["period"]: row for row in context["period_rows"]}
+            for w in archived_work:
+                start = PERIOD_START[period](w.date)
+                row = rows.setdefault(start, {"period": start, "work": ZERO, "salary": ZERO, "advances": ZERO})
+                row["work"] += w.total
+            context["period_rows"] = sorted(rows.values(), key=lambda row: row["period"], reverse=True)
+        for row in context["period_rows"]:
+            row["balance"] = row["work"] - (row["salary"] + row["advances"])
+    return context
+
+
+def parse_date_range(start_date, end_date):
+    """Parsed (start, end) when both YYYY-MM-DD strings are valid, else None."""
+    if not (start_date and end_date):
+        return None
+    try:
+        return (
+            datetime.strptime(start_date, "%Y-%m-%d").date(),
+            datetime.strptime(end_date, "%Y-%m-%d").date(),
+        )
+    except ValueError:
+        return None
+
+
+def fixed_payslip_context(employee, start_date=None, end_date=None):
+    payments = employee.fixed_payments.all()
+    window = parse_date_range(start_date, end_date)
+    if window:
+        payments = payments.filter(date__range=window)
+
+    total_paid = _total(payments)
+    total_salary = employee.monthly_salary
+    balance = total_salary - total_paid
+
+    return {
+        "employee": employee,
+        "payments": payments,
+        "total_paid": total_paid,
+        "total_salary": total_salary,
+        "balance": balance,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+
+
+def fixed_report_context(employee, start_date=None, end_date=None, period=None):
+    payments = FixedSalaryPayment.objects.filter(employee=employee).order_by("-date", "-id")
+    work_records = FixedWorkRecord.objects.filter(employee=employee).order_by("-date", "-id")
+
+    window = parse_date_range(start_date, end_date)
+    if window:
+        payments = payments.filter(date__range=window)
+        work_records = work_records.filter(date__range=window)
+
+    overtime_total = _total(work_records)
+    total_paid = _total(payments)
+
+    # Adjust total salary with overtime
+    total_salary = employee.monthly_salary + overtime_total
+    balance = total_salary - total_paid
+
+    context = {
+        "employee": employee,
+        "payments": payments,
+        "work_records": work_records,
+        "overtime_total": overtime_total,
+        "total_paid": total_paid,
+        "total_salary": total_salary,          # monthly + overtime
+        "balance": balance,
+        "start_date": start_date,
+        "end_date": end_date,
+        "period": period,
+    }
+    if period in PERIODS:
+        context["period_rows"] = period_summary(period, {
+            "overtime": (work_records, "amount"),
+            "paid": (payments, "amount"),
+        })
+    return context
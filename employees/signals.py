@@ -0,0 +1,124 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from ledger.bulk import bulk_increment, post_bulk_create
+from ledger.cache import bump_generation
+from .models import (
+    AdvancePayment,
+    ContractualEmployee,
+    FixedEmployee,
+    FixedSalaryPayment,
+    FixedWorkRecord,
+    SalaryPayment,
+    WorkRecord,
+)
+from .typeahead import TYPEAHEAD_SOURCES, clear_typeahead_cache, normalise_name, phone_digits
+
+CENT = Decimal("0.01")
+
+
+def _money(value):
+    """Round like the DB column does (inputs may be floats or strings from forms)."""
+    return Decimal(str(value or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _work_value(quantity, item_price):
+    return int(quantity or 0) * _money(item_price)
+
+
+# record model -> (employee model, stored total column, value fields, value function)
+BALANCE_SOURCES = {
+    WorkRecord: (ContractualEmployee, "earned_total", ("quantity", "item_price"), _work_value),
+    SalaryPayment: (ContractualEmployee, "paid_total", ("amount",), _money),
+    AdvancePayment: (ContractualEmployee, "advance_total", ("amount",), _money),
+    FixedWorkRecord: (FixedEmployee, "earned_total", ("amount",), _money),
+    FixedSalaryPayment: (FixedEmployee, "paid_total", ("amount",), _money),
+}
+
+
+def _current(sender, instance):
+    """(employee_id, value) for an in-memory record."""
+    _, _, fields, value = BALANCE_SOURCES[sender]
+    return instance.employee_id, value(*(getattr(instance, f) for f in fields))
+
+
+def _bump(sender, employee_id, delta):
+    employee_model, column, _, _ = BALANCE_SOURCES[sender]
+    if employee_id is None or not delta:
+        return
+    employee_model.objects.filter(pk=employee_id).update(**{column: F(column) + delta})
+
+
+def remember_balance_row(sender, instance, raw=False, **kwargs):
+    instance._balance_previous = None
+    if raw or instance.pk is None or instance._state.adding:
+        return
+    _, _, fields, value = BALANCE_SOURCES[sender]
+    row = sender._base_manager.filter(pk=instance.pk).values_list("employee_id", *fields).first()
+    if row is not None:
+        instance._balance_previous = (row[0], value(*row[1:]))
+
+
+def update_balance_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_balance_previous", None)
+    employee_id, amount = _current(sender, instance)
+    with transaction.atomic():
+        if previous is not None:
+            old_employee_id, old_amount = previous
+            if old_employee_id == employee_id:
+                amount -= old_amount
+            else:
+                _bump(sender, old_employee_id, -old_amount)
+        _bump(sender, employee_id, amount)
+    instance._balance_previous = None
+
+
+def update_balance_on_delete(sender, instance, **kwargs):
+    employee_id, amount = _current(sender, instance)
+    _bump(sender, employee_id, -amount)
+
+
+def update_balance_on_bulk_create(sender, objs, **kwargs):
+    employee_model, column, _, _ = BALANCE_SOURCES[sender]
+    per_employee = {}
+    for obj in objs:
+        employee_id, amount = _current(sender, obj)
+        per_employee[employee_id] = per_employee.get(employee_id, Decimal("0")) + amount
+    # One UPDATE per chunk of employees (a payroll run touches all of them)
+    deltas = [(pk, amount) for pk, amount in per_employee.items() if pk is not None and amount]
+    bulk_increment(employee_model, [column], deltas)
+
+
+# Connected per record model so unrelated models keep Django's fast-delete path.
+for _model in BALANCE_SOURCES:
+    _uid = f"employee-balance-{_model._meta.label_lower}"
+    pre_save.connect(remember_balance_row, sender=_model, dispatch_uid=f"{_uid}-pre-save")
+    post_save.connect(update_balance_on_save, sender=_model, dispatch_uid=f"{_uid}-save")
+    post_delete.connect(update_balance_on_delete, sender=_model, dispatch_uid=f"{_uid}-delete")
+    post_bulk_create.connect(update_balance_on_bulk_create, sender=_model, dispatch_uid=f"{_uid}-bulk")
+
+
+def refresh_typeahead_keys(sender, instance, **kwargs):
+    instance.search_name = normalise_name(instance.name)[:sender._meta.get_field("search_name").max_length]
+    instance.phone_digits = phone_digits(instance.phone)[:sender._meta.get_field("phone_digits").max_length]
+
+
+def invalidate_typeahead(sender, **kwargs):
+    # After commit, like the ledger caches; the generation reaches other processes.
+    def clear():
+        clear_typeahead_cache()
+        bump_generation(sender)
+
+    transaction.on_commit(clear)
+
+
+for _model in TYPEAHEAD_SOURCES:
+    _uid = f"employee-typeahead-{_model._meta.label_lower}"
+    pre_save.connect(refresh_typeahead_keys, sender=_model, dispatch_uid=f"{_uid}-pre-save")
+    post_save.connect(invalidate_typeahead, sender=_model, dispatch_uid=f"{_uid}-save")
+    post_delete.connect(invalidate_typeahead, sender=_model, dispatch_uid=f"{_uid}-delete")
@@ -0,0 +1,97 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from .models import AdvancePayment, ContractualEmployee, FixedEmployee, FixedWorkRecord, SalaryPayment, WorkRecord
+from .payroll import outstanding_balances, run_payroll
+from .typeahead import clear_typeahead_cache, employee_matches
+
+
+class StoredTotalsTests(TestCase):
+    def verify(self):
+        out = StringIO()
+        call_command("verify_balances", "--dry-run", stdout=out)
+        return out.getvalue()
+
+    def test_totals_follow_edits_moves_and_deletes(self):
+        ali = ContractualEmployee.objects.create(name="Ali")
+        sara = ContractualEmployee.objects.create(name="Sara")
+        clerk = FixedEmployee.objects.create(name="Clerk", monthly_salary=Decimal("1500.00"))
+        record = WorkRecord.objects.create(employee=ali, date=date(2024, 3, 1), description="hem", quantity=4, item_price=Decimal("2.50"))
+        WorkRecord.objects.bulk_create([
+            WorkRecord(employee=sara, date=date(2024, 3, 1), description="cuff", quantity=3, item_price=Decimal("1.10")),
+        ])
+        SalaryPayment.objects.create(employee=ali, date=date(2024, 3, 2), amount=Decimal("8.00"))
+        overtime = FixedWorkRecord.objects.create(employee=clerk, date=date(2024, 3, 2), description="late", amount=Decimal("30.00"))
+
+        record.quantity = 5
+        record.save()
+        moved = WorkRecord.objects.get(employee=sara)
+        moved.employee = ali
+        moved.save()
+        overtime.delete()
+
+        ali.refresh_from_db()
+        sara.refresh_from_db()
+        clerk.refresh_from_db()
+        self.assertEqual((ali.earned_total, ali.paid_total, ali.advance_total), (Decimal("15.80"), Decimal("8.00"), Decimal("0.00")))
+        self.assertEqual((sara.earned_total, sara.paid_total), (Decimal("0.00"), Decimal("0.00")))
+        self.assertEqual(clerk.earned_total, Decimal("0.00"))
+        self.assertIn("Found 0 employee(s) with drifted totals.", self.verify())
+
+    def test_drift_is_reported(self):
+        ali = ContractualEmployee.objects.create(name="Ali")
+        WorkRecord.objects.create(employee=ali, date=date(2024, 3, 1), description="hem", quantity=2, item_price=Decimal("5.00"))
+        ContractualEmployee.objects.filter(pk=ali.pk).update(earned_total=Decimal("9.99"))
+        self.assertIn("earned_total 9.99 -> 10.00", self.verify())
+
+
+class TypeaheadTests(TestCase):
+    def setUp(self):
+        # Answers from other tests' rolled-back rows may be cached under the current generations
+        cache.clear()
+        clear_typeahead_cache()
+
+    def test_a_rename_is_found_straight_away(self):
+        worker = ContractualEmployee.objects.create(name="Émile O'Brien", phone="+44 (20) 7946-0018")
+        self.assertEqual([m["name"] for m in employee_matches("emile")], ["Émile O'Brien"])
+        self.assertEqual([m["id"] for m in employee_matches("4420")], [worker.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            worker.name = "Zoe Brown"
+            worker.save()
+        self.assertEqual(employee_matches("emile"), ())
+        self.assertEqual([m["id"] for m in employee_matches("zoe b")], [worker.pk])
+
+
+class PayrollRunTests(TestCase):
+    def test_a_second_run_pays_nobody(self):
+        owed = ContractualEmployee.objects.create(name="Ali")
+        settled = ContractualEmployee.objects.create(name="Sara")
+        WorkRecord.objects.create(employee=owed, date=date(2024, 3, 1), description="hem", quantity=3, item_price=Decimal("0.10"))
+        WorkRecord.objects.create(employee=settled, date=date(2024, 3, 1), description="cuff", quantity=1, item_price=Decimal("4.00"))
+        SalaryPayment.objects.create(employee=settled, date=date(2024, 3, 2), amount=Decimal("4.00"))
+
+        run = run_payroll(pay_date=date(2024, 3, 31))
+        self.assertEqual((run.employee_count, run.total_paid, run.total_advances), (1, Decimal("0.30"), Decimal("0.00")))
+        self.assertFalse(outstanding_balances().exists())
+
+        with self.assertRaisesMessage(ValueError, "Nobody to pay."):
+            run_payroll(pay_date=date(2024, 3, 31))
+        self.assertEqual(SalaryPayment.objects.filter(payroll_run__isnull=False).count(), 1)
+        self.assertFalse(AdvancePayment.objects.exists())
+
+    def test_float_dust_is_not_owed_but_a_penny_is(self):
+        dust = ContractualEmployee.objects.create(name="Dust")
+        penny = ContractualEmployee.objects.create(name="Penny")
+        table = ContractualEmployee._meta.db_table
+        with connection.cursor() as cursor:
+            # What REAL running totals can drift to on SQLite
+            cursor.execute(f"UPDATE {table} SET earned_total = 0.1 + 0.2, paid_total = 0.3 WHERE id = %s", [dust.pk])
+            cursor.execute(f"UPDATE {table} SET earned_total = 0.3, paid_total = 0.29 WHERE id = %s", [penny.pk])
+        self.assertEqual(list(outstanding_balances()), [penny])
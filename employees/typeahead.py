@@ -0,0 +1,91 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.db import connection
+from django.db.models import Q
+from django.urls import reverse
+
+from ledger.cache import generations
+from .models import ContractualEmployee, FixedEmployee, TemporaryWorker
+
+# model -> (result type, report url name or None)
+TYPEAHEAD_SOURCES = {
+    ContractualEmployee: ("contractual", "employees:report"),
+    FixedEmployee: ("fixed", "employees:fixed_employee_report"),
+    TemporaryWorker: ("temporary", None),
+}
+MAX_MATCHES = 10
+MIN_PHONE_DIGITS = 3  # shorter digit runs would match most phone numbers
+RECENT_QUERIES = 1024  # size of the per-process LRU of answered queries
+
+NON_WORD = re.compile(r"[\W_]+")
+NON_DIGIT = re.compile(r"\D+")
+LAST_CHAR = chr(0x10FFFF)
+
+
+def normalise_name(value):
+    """Lower-case, accent-free and single-spaced: "Émile  O'Brien" -> "emile o brien"."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    plain = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return NON_WORD.sub(" ", plain.casefold()).strip()
+
+
+def phone_digits(value):
+    """Only the digits of a phone number: "+92 (300) 123-4567" -> "923001234567"."""
+    return NON_DIGIT.sub("", value or "")
+
+
+def _matching(name, digits):
+    if connection.vendor == "postgresql":
+        # Substring matches, served by the trigram GIN indexes (migration 0023).
+        match = Q(search_name__contains=name)
+        if len(digits) >= MIN_PHONE_DIGITS:
+            match |= Q(phone_digits__contains=digits)
+        return match
+    # Elsewhere a prefix match as a range, so the plain B-tree indexes serve it.
+    match = Q(search_name__gte=name, search_name__lt=name + LAST_CHAR)
+    if len(digits) >= MIN_PHONE_DIGITS:
+        match |= Q(phone_digits__gte=digits, phone_digits__lt=digits + LAST_CHAR)
+    return match
+
+
+@lru_cache(maxsize=RECENT_QUERIES)
+def _matches(name, digits, limit, generation):
+    # ``generation`` only keys the cache: it changes whenever any process
+    # writes one of the employee tables, so stale answers are never read.
+    found = []
+    for model, (kind, url_name) in TYPEAHEAD_SOURCES.items():
+        rows = (
+            model.objects.filter(_matching(name, digits))
+            .order_by("search_name", "pk")
+            .values_list("pk", "name", "phone", "role", "search_name")[:limit]
+        )
+        for pk, full_name, phone, role, key in rows:
+            found.append((key, {
+                "type": kind,
+                "id": pk,
+                "name": full_name,
+                "phone": phone or "",
+                "role": role or "",
+                "url": reverse(url_name, args=[pk]) if url_name else None,
+            }))
+    found.sort(key=lambda item: item[0])
+    return tuple(match for _, match in found[:limit])
+
+
+def employee_matches(query, limit=MAX_MATCHES):
+    """
+    Up to ``limit`` contractual, fixed and temporary employees whose name (or
+    phone number, given MIN_PHONE_DIGITS digits) matches ``query``, by name.
+    Answers are kept in an in-process LRU; clear_typeahead_cache() and the
+    employee tables' cache generations keep it current.
+    """
+    name = normalise_name(query)
+    if not name:
+        return ()
+    return _matches(name, phone_digits(query), limit, tuple(generations(list(TYPEAHEAD_SOURCES))))
+
+
+def clear_typeahead_cache():
+    _matches.cache_clear()
@@ -7,9 +7,11 @@ urlpatterns = [
     # Employees
     path("", views.employee_list, name="list"),            # all employees
     path("new/", views.employee_create, name="create"),    # add new employee
+    path("typeahead/", views.employee_typeahead, name="typeahead"),  # JSON for the search box
 
     # Work records
     path("<int:employee_id>/work/", views.add_work, name="add_work"),
+    path("work/sheet/", views.work_sheet, name="work_sheet"),  # many employees / CSV upload
 
     # Advance payments
     # path("<int:employee_id>/advance/", views.add_advance, name="add_advance"),
@@ -20,6 +22,8 @@ urlpatterns = [
     #  path("<int:employee_id>/payslip/", views.employee_payslip, name="payslip"),
      path("<int:employee_id>/payslip/", views.payslip, name="payslip"),
      path("<int:emp_id>/add_salary/", views.add_salary, name="add_salary"),
+     path("payroll/", views.payroll, name="payroll"),  # pay everyone in one run
+     path("payroll/<int:pk>/", views.payroll_run, name="payroll_run"),
      path("<int:pk>/report/", views.employee_report, name="report"),
 
      path("<int:pk>/work/<int:record_id>/delete/", views.delete_work_record, name="delete_work_record"),
@@ -41,6 +45,9 @@ urlpatterns = [
     #  fixed amployee payslip
     path("fixed/<int:pk>/payslip/", views.fixed_employee_payslip, name="fixed_employee_payslip"),
 
+    # CSV / XLSX exports: work, salary, advances, fixed-salary, fixed-work
+    path("export/<slug:ledger>/<str:fmt>/", views.record_export, name="export"),
+
      
 
 
@@ -1,14 +1,18 @@
+import csv
+import io
+from itertools import zip_longest
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
-from django.db.models.functions import Coalesce
 from django.db.models import Q, Sum
-from django.db.models import Q, Sum, Value, DecimalField, F
+from django.db.models import Q, Sum, DecimalField, ExpressionWrapper, F
+from django.http import Http404, JsonResponse
 from django.db import models
 from decimal import Decimal
 from django.utils.timezone import now
 from django.urls import reverse
 from datetime import datetime
-from .models import ContractualEmployee, WorkRecord, SalaryPayment, FixedEmployee, FixedSalaryPayment, AdvancePayment,FixedWorkRecord
+from .models import ContractualEmployee, WorkRecord, SalaryPayment, FixedEmployee, FixedSalaryPayment, AdvancePayment,FixedWorkRecord, PayrollRun
 from django import forms
 from django.contrib import messages
 from .forms import (
@@ -18,17 +22,43 @@ from .forms import (
     FixedSalaryPaymentForm,
     FixedWorkRecordForm,
 )
+from .reports import (
+    employee_report_context,
+    fixed_payslip_context,
+    fixed_report_context,
+    parse_date_range,
+    payslip_context,
+)
+from ledger.archive import archived_export_rows
+from ledger.exports import export_response
+from ledger.forms import OpenPeriodFormMixin
+from ledger.pagination import KeysetPaginator
+from ledger.models import DailyLedgerRollup
+from ledger.periods import carried_totals, redirect_on_closed_period
+from ledger.imports import parse_day, parse_money
+from .imports import employee_resolver, import_work_rows, read_work_csv
+from .payroll import outstanding_balances, run_payroll
+from .typeahead import employee_matches
+from dashboard.services import window_totals
+
+RECORDS_PER_PAGE = 50  # rows per record table on the report pages
+Source = DailyLedgerRollup.Source
 
 # Show all employees with totals
 
 
 
+def employee_typeahead(request):
+    """Name/phone matches for the search box as JSON; no summary cards are computed."""
+    return JsonResponse({"results": list(employee_matches(request.GET.get("q", "")))})
+
+
 def employee_list(request):
     query = request.GET.get("q")  # search term
     type_filter = request.GET.get("type", "contractual")  # to control tab state
 
-    # --- Contractual employees (existing logic) ---
-    employees = ContractualEmployee.objects.all()
+    # --- Contractual employees (totals annotated in one query) ---
+    employees = ContractualEmployee.objects.with_totals()
     if query:
         employees = employees.filter(
             Q(name__icontains=query) | Q(phone__icontains=query)
@@ -42,40 +72,21 @@ def employee_list(request):
         )
 
     fixed_employees = fixed_qs.annotate(
-        total_paid_calc=Coalesce(
-            Sum('fixed_payments__amount'),
-            Value(0),
-            output_field=DecimalField(max_digits=12, decimal_places=2),
-        ),
-        balance_calc=F('monthly_salary') - Coalesce(
-            Sum('fixed_payments__amount'),
-            Value(0),
-            output_field=DecimalField(max_digits=12, decimal_places=2),
-        ),
+        total_paid_calc=F('paid_total'),
+        balance_calc=F('monthly_salary') - F('paid_total'),
     )
 
     # --- Summary cards ---
-    # Salary totals
-    temp_salary_total = (
-        SalaryPayment.objects.aggregate(
-            total=Coalesce(
-                Sum("amount"),
-                Value(0, output_field=DecimalField(max_digits=12, decimal_places=2)),
-            )
-        )["total"]
-        or Decimal("0")
-    )
-
-    fixed_salary_total = (
-        FixedSalaryPayment.objects.aggregate(
-            total=Coalesce(
-                Sum("amount"),
-                Value(0, output_field=DecimalField(max_digits=12, decimal_places=2)),
-            )
-        )["total"]
-        or Decimal("0")
-    )
-    contract_advances = sum(emp.total_advances for emp in ContractualEmployee.objects.all())
+    # Salary totals: the last period close plus the daily rollups after it
+    closed, carried = carried_totals()
+    since_close = Q(date__gt=closed) if closed is not None else Q()
+    salary_totals = window_totals(DailyLedgerRollup.objects.all(), {
+        "temp": since_close & Q(source=Source.SALARY),
+        "fixed": since_close & Q(source=Source.FIXED_SALARY),
+    }, field="total")
+    temp_salary_total = salary_totals["temp"] + carried.get((Source.SALARY, ""), (Decimal("0"), 0))[0]
+    fixed_salary_total = salary_totals["fixed"] + carried.get((Source.FIXED_SALARY, ""), (Decimal("0"), 0))[0]
+    contract_advances = sum(emp.total_advances for emp in ContractualEmployee.objects.with_totals())
     fixed_advances = sum(
         (emp.total_paid_calc - emp.monthly_salary)
         if (emp.total_paid_calc - emp.monthly_salary) > 0 else Decimal("0")
@@ -117,41 +128,85 @@ def employee_create(request):
 
 
 # Add daily work record
+@redirect_on_closed_period
 def add_work(request, employee_id):
     employee = get_object_or_404(ContractualEmployee, pk=employee_id)
 
     if request.method == "POST":
-        dates = request.POST.getlist("date")
-        descriptions = request.POST.getlist("description")
-        quantities = request.POST.getlist("quantity")
-        item_prices = request.POST.getlist("item_price")
-
-        for i in range(len(dates)):
-            if quantities[i] and item_prices[i]:  # only save valid rows
-                WorkRecord.objects.create(
-                    employee=employee,
-                    date=dates[i] or timezone.now().date(),
-                    description=descriptions[i],
-                    quantity=int(quantities[i]),
-                    item_price=float(item_prices[i]),
-                )
-        return redirect("employees:report", employee_id)
+        rows = zip_longest(
+            request.POST.getlist("date"),
+            request.POST.getlist("description"),
+            request.POST.getlist("quantity"),
+            request.POST.getlist("item_price"),
+            fillvalue="",
+        )
+        result = import_work_rows(
+            ((number, employee.pk, *row) for number, row in enumerate(rows, start=1)),
+            resolve=lambda pk: pk,
+            default_date=timezone.now().date(),
+        )
+        if result.error_count:
+            # Nothing was saved; say which rows need fixing
+            messages.error(request, "Nothing saved. " + "; ".join(f"row {n}: {e}" for n, e in result.errors))
+        else:
+            return redirect("employees:report", employee_id)
 
     return render(request, "employees/work_form.html", {"employee": employee, "today": timezone.now().date()})
 
 
+# Daily piece-work sheet: rows for many employees at once, typed in or uploaded as CSV
+@redirect_on_closed_period
+def work_sheet(request):
+    result = None
+    if request.method == "POST":
+        resolve = employee_resolver()
+        today = timezone.now().date()
+        upload = request.FILES.get("file")
+        if upload is not None:
+            textfile = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            try:
+                result = import_work_rows(read_work_csv(textfile), resolve, today)
+            except (ValueError, csv.Error) as exc:  # bad header or encoding
+                messages.error(request, f"Could not read {upload.name}: {exc}")
+                return redirect("employees:work_sheet")
+        else:
+            rows = zip_longest(
+                request.POST.getlist("employee"),
+                request.POST.getlist("date"),
+                request.POST.getlist("description"),
+                request.POST.getlist("quantity"),
+                request.POST.getlist("item_price"),
+                fillvalue="",
+            )
+            result = import_work_rows(((number, *row) for number, row in enumerate(rows, start=1)), resolve, today)
+
+        if result.error_count:
+            messages.error(request, f"Nothing saved: {result.error_count} invalid row(s).")
+        else:
+            messages.success(request, f"Saved {result.created} work record(s).")
+            return redirect("employees:list")
+
+    return render(request, "employees/work_sheet.html", {
+        "employees": ContractualEmployee.objects.order_by("name").only("id", "name"),
+        "today": timezone.now().date(),
+        "result": result,
+    })
+
+
 # Employee detail view
 def employee_detail(request, employee_id):
-    employee = get_object_or_404(ContractualEmployee, id=employee_id)
+    employee = get_object_or_404(ContractualEmployee.objects.with_totals(), id=employee_id)
     context = {
         "employee": employee,
         "work_records": employee.work_records.all(),
         "salary_payments": employee.salary_payments.all(),
         "advances": employee.advance_payments.all(),
     }
+    _page_tables(request, context, {"work_records": "work_cursor", "salary_payments": "salary_cursor"})
     return render(request, "employees/employee_detail.html", context)
 
 # Delete an employee
+@redirect_on_closed_period
 def employee_delete(request, employee_id):
     employee = get_object_or_404(ContractualEmployee, id=employee_id)
 
@@ -183,18 +238,15 @@ def employee_update(request, employee_id):
 from datetime import date
 
 def payslip(request, employee_id):
-    employee = get_object_or_404(ContractualEmployee, id=employee_id)
-    return render(request, "employees/payslip.html", {
-        "employee": employee,
-        "today": date.today(),
-    })
+    employee = get_object_or_404(ContractualEmployee.objects.with_totals(), id=employee_id)
+    return render(request, "employees/payslip.html", payslip_context(employee, date.today()))
 
 
 # --- Salary Payment Form ---
 from django import forms
 from .models import SalaryPayment
 
-class SalaryPaymentForm(forms.ModelForm):
+class SalaryPaymentForm(OpenPeriodFormMixin, forms.ModelForm):
     class Meta:
         model = SalaryPayment
         fields = ["amount", "date", "description"]
@@ -218,6 +270,7 @@ class SalaryPaymentForm(forms.ModelForm):
 
 
 # Add Salary (handles auto-advance if overpaid)
+@redirect_on_closed_period
 def add_salary(request, emp_id):
     employee = get_object_or_404(ContractualEmployee, id=emp_id)
 
@@ -237,47 +290,72 @@ def add_salary(request, emp_id):
         "employee": employee,
     })
 
-# ✅ employees/views.py
-def employee_report(request, pk):
-    employee = get_object_or_404(ContractualEmployee, pk=pk)
+# Payroll run: pay every selected contractual employee in one go
+def payroll(request):
+    if request.method == "POST":
+        errors = []
+        amounts = {}
+        for raw_id in request.POST.getlist("pay"):
+            raw = request.POST.get(f"amount_{raw_id}", "")
+            try:
+                amounts[int(raw_id)] = parse_money(raw, SalaryPayment._meta.get_field("amount"))
+            except ValueError as exc:
+                errors.append(f"employee {raw_id}: {exc}")
+        try:
+            pay_date = parse_day(request.POST.get("date", "")) if request.POST.get("date") else None
+        except ValueError:
+            errors.append("invalid pay date")
+
+        if not errors:
+            try:
+                run = run_payroll(amounts, pay_date, request.POST.get("description", "").strip(), request.user)
+            except ValueError as exc:
+                errors.append(str(exc))
+            else:
+                messages.success(request, f"Paid {run.employee_count} employee(s), total {run.total_paid}.")
+                return redirect("employees:payroll_run", run.pk)
+        messages.error(request, "Payroll not run: " + "; ".join(errors))
+        return redirect("employees:payroll")
+
+    return render(request, "employees/payroll.html", {
+        "employees": outstanding_balances(),
+        "runs": PayrollRun.objects.select_related("created_by")[:10],
+        "today": timezone.now().date(),
+    })
 
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
 
-    if start_date and end_date:
-        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+def payroll_run(request, pk):
+    run = get_object_or_404(PayrollRun.objects.select_related("created_by"), pk=pk)
+    payments = run.salary_payments.select_related("employee").order_by("employee__name", "id")
+    return render(request, "employees/payroll_run.html", {"run": run, "payments": payments})
 
-        work_records = employee.work_records.filter(date__range=[start_date, end_date])
-        salary_payments = employee.salary_payments.filter(date__range=[start_date, end_date])
-        advance_payments = employee.advance_payments.filter(date__range=[start_date, end_date])
-    else:
-        work_records = employee.work_records.all().order_by('-date')
-        
-        salary_payments = employee.salary_payments.all().order_by('-date')
-        advance_payments = employee.advance_payments.all().order_by('-date')
 
-    # Totals
-    total_work = sum([wr.quantity * wr.item_price for wr in work_records])
-    total_salary = sum([sp.amount for sp in salary_payments])
-    total_advances = sum([ap.amount for ap in advance_payments])
-    balance = total_work - (total_salary + total_advances)
+# ✅ employees/views.py
+def employee_report(request, pk):
+    employee = get_object_or_404(ContractualEmployee.objects.with_totals(), pk=pk)
 
-    context = {
-        "employee": employee,
-        "start_date": start_date,
-        "end_date": end_date,
-        "work_records": work_records,
-        "salary_payments": salary_payments,
-        "advance_payments": advance_payments,
-        "total_work": total_work,
-        "total_salary": total_salary,
-        "total_advances": total_advances,
-        "balance": balance,
-        "today": now().date(),
-    }
+    start_date, end_date = parse_date_range(request.GET.get("start_date"), request.GET.get("end_date")) or (None, None)
+    context = employee_report_context(employee, start_date, end_date, request.GET.get("period"))
+    if "period_rows" not in context:  # the summary replaces the record tables
+        _page_tables(request, context, {"work_records": "work_cursor", "salary_payments": "salary_cursor"})
     return render(request, "employees/employee_detail.html", context)
 
+
+def _page_tables(request, context, tables):
+    """
+    Replace each record queryset in ``context`` (key -> cursor GET param) by a
+    keyset page of RECORDS_PER_PAGE rows. ``<key>_query`` holds the other GET
+    params for that table's prev/next links.
+    """
+    for key, param in tables.items():
+        context[key] = KeysetPaginator(context[key], RECORDS_PER_PAGE).page(request.GET.get(param))
+        query = request.GET.copy()
+        query.pop(param, None)
+        context[f"{key}_query"] = query.urlencode()
+        context[f"{key}_param"] = param
+
+
+@redirect_on_closed_period
 def delete_work_record(request, pk, record_id):
     employee = get_object_or_404(ContractualEmployee, pk=pk)
     # Get by id only, then verify ownership to avoid false 404s
@@ -301,6 +379,7 @@ def delete_work_record(request, pk, record_id):
 
 
 # DELETE Salary Payment
+@redirect_on_closed_period
 def delete_salary_payment(request, pk, payment_id):
     employee = get_object_or_404(ContractualEmployee, pk=pk)
     payment = get_object_or_404(SalaryPayment, id=payment_id)
@@ -322,6 +401,7 @@ def delete_salary_payment(request, pk, payment_id):
 
 
 # DELETE Advance Payment
+@redirect_on_closed_period
 def delete_advance_payment(request, pk, advance_id):
     employee = get_object_or_404(ContractualEmployee, pk=pk)
     advance = get_object_or_404(AdvancePayment, id=advance_id, employee=employee)
@@ -348,6 +428,7 @@ from datetime import datetime
 
 
 
+@redirect_on_closed_period
 def fixed_employee_add_salary(request, employee_id):
     employee = get_object_or_404(FixedEmployee, id=employee_id)
 
@@ -366,6 +447,7 @@ def fixed_employee_add_salary(request, employee_id):
         "employee": employee,
     })
     
+@redirect_on_closed_period
 def fixed_employee_delete(request, pk):
     employee = get_object_or_404(FixedEmployee, pk=pk)
     if request.method == "POST":
@@ -390,32 +472,10 @@ def fixed_employee_update(request, pk):
 
 def fixed_employee_payslip(request, pk):
     employee = get_object_or_404(FixedEmployee, pk=pk)
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    payments = employee.fixed_payments.all()
-    if start_date and end_date:
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d").date()
-            end = datetime.strptime(end_date, "%Y-%m-%d").date()
-            payments = payments.filter(date__range=[start, end])
-        except ValueError:
-            pass
-
-    total_paid = sum(p.amount for p in payments)
-    total_salary = employee.monthly_salary
-    balance = total_salary - total_paid
-
-    return render(request, "employees/fixed_employee_payslip.html", {
-        "employee": employee,
-        "payments": payments,
-        "total_paid": total_paid,
-        "total_salary": total_salary,
-        "balance": balance,
-        "start_date": start_date,
-        "end_date": end_date,
-    })
+    context = fixed_payslip_context(employee, request.GET.get("start_date"), request.GET.get("end_date"))
+    return render(request, "employees/fixed_employee_payslip.html", context)
 # --- Add overtime work for a fixed employee ---
+@redirect_on_closed_period
 def fixed_employee_add_work(request, employee_id):
     employee = get_object_or_404(FixedEmployee, id=employee_id)
     if request.method == "POST":
@@ -433,42 +493,15 @@ def fixed_employee_add_work(request, employee_id):
 # --- Fixed employee report (now includes overtime + date filters) ---
 def fixed_employee_report(request, pk):
     employee = get_object_or_404(FixedEmployee, pk=pk)
-
-    start_date = request.GET.get("start_date")
-    end_date = request.GET.get("end_date")
-
-    payments = FixedSalaryPayment.objects.filter(employee=employee).order_by("-date")
-    work_records = FixedWorkRecord.objects.filter(employee=employee).order_by("-date")
-
-    if start_date and end_date:
-        try:
-            start = datetime.strptime(start_date, "%Y-%m-%d").date()
-            end = datetime.strptime(end_date, "%Y-%m-%d").date()
-            payments = payments.filter(date__range=[start, end])
-            work_records = work_records.filter(date__range=[start, end])
-        except ValueError:
-            pass
-
-    overtime_total = sum((w.amount for w in work_records), Decimal("0"))
-    total_paid = sum((p.amount for p in payments), Decimal("0"))
-
-    # Adjust total salary with overtime
-    total_salary = employee.monthly_salary + overtime_total
-    balance = total_salary - total_paid
-
-    return render(request, "employees/fixed_employee_report.html", {
-        "employee": employee,
-        "payments": payments,
-        "work_records": work_records,          # ← NEW
-        "overtime_total": overtime_total,      # ← NEW
-        "total_paid": total_paid,
-        "total_salary": total_salary,          # monthly + overtime
-        "balance": balance,
-        "start_date": start_date,
-        "end_date": end_date,
-    })
+    context = fixed_report_context(
+        employee, request.GET.get("start_date"), request.GET.get("end_date"), request.GET.get("period")
+    )
+    if "period_rows" not in context:  # the summary replaces the record tables
+        _page_tables(request, context, {"payments": "payment_cursor", "work_records": "work_cursor"})
+    return render(request, "employees/fixed_employee_report.html", context)
 
 # --- Delete actions from the fixed report tables (POST only) ---
+@redirect_on_closed_period
 def fixed_delete_work_record(request, pk, record_id):
     employee = get_object_or_404(FixedEmployee, pk=pk)
     rec = get_object_or_404(FixedWorkRecord, id=record_id)
@@ -480,6 +513,7 @@ def fixed_delete_work_record(request, pk, record_id):
         messages.success(request, "Work record deleted.")
     return redirect("employees:fixed_employee_report", pk=employee.id)
 
+@redirect_on_closed_period
 def fixed_delete_salary_payment(request, pk, payment_id):
     employee = get_object_or_404(FixedEmployee, pk=pk)
     pay = get_object_or_404(FixedSalaryPayment, id=payment_id)
@@ -489,4 +523,59 @@ def fixed_delete_salary_payment(request, pk, payment_id):
     if request.method == "POST":
         pay.delete()
         messages.success(request, "Salary payment deleted.")
-    return redirect("employees:fixed_employee_report", pk=employee.id)
\ No newline at end of file
+    return redirect("employees:fixed_employee_report", pk=employee.id)
+
+
+# --- CSV / XLSX exports of the record ledgers ---
+# ?employee=<id>&start_date=&end_date= (same date filter as the report pages)
+LINE_TOTAL = ExpressionWrapper(F("quantity") * F("item_price"), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+RECORD_EXPORTS = {
+    "work": (WorkRecord, [
+        ("Date", "date"), ("Employee", "employee__name"), ("Description", "description"),
+        ("Quantity", "quantity"), ("Item Price", "item_price"), ("Total", LINE_TOTAL),
+    ]),
+    "salary": (SalaryPayment, [
+        ("Date", "date"), ("Employee", "employee__name"), ("Description", "description"), ("Amount", "amount"),
+    ]),
+    "advances": (AdvancePayment, [
+        ("Date", "date"), ("Employee", "employee__name"), ("Note", "note"), ("Amount", "amount"),
+    ]),
+    "fixed-salary": (FixedSalaryPayment, [
+        ("Date", "date"), ("Employee", "employee__name"), ("Description", "description"), ("Amount", "amount"),
+    ]),
+    "fixed-work": (FixedWorkRecord, [
+        ("Date", "date"), ("Employee", "employee__name"), ("Description", "description"),
+        ("Hours", "hours"), ("Rate", "rate"), ("Amount", "amount"),
+    ]),
+}
+
+# The expression columns above, computed on archived rows
+ARCHIVED_COMPUTED = {
+    "work": {"Total": lambda record: record.quantity * record.item_price},
+}
+
+
+def record_export(request, ledger, fmt):
+    if ledger not in RECORD_EXPORTS:
+        raise Http404("Unknown ledger.")
+    model, columns = RECORD_EXPORTS[ledger]
+
+    qs = model.objects.order_by("-date", "-id")
+    match = {}
+    employee_id = request.GET.get("employee")
+    if employee_id:
+        if not employee_id.isdigit():
+            raise Http404("Unknown employee.")
+        match["employee_id"] = int(employee_id)
+        qs = qs.filter(**match)
+    window = parse_date_range(request.GET.get("start_date"), request.GET.get("end_date"))
+    if window:
+        qs = qs.filter(date__range=window)
+
+    # Archived rows (work records of closed months) are older than every live one
+    archived = archived_export_rows(
+        model, columns, *(window or (None, None)), computed=ARCHIVED_COMPUTED.get(ledger), **match,
+    )
+    filename = f"{ledger}-{employee_id}" if employee_id else ledger
+    return export_response(request, fmt, qs, columns, filename, more_rows=archived)
@@ -1,10 +1,21 @@
-
+from django import forms
 from django.contrib import admin
+
+from ledger.admin import OpenPeriodAdminMixin
+from ledger.forms import OpenPeriodFormMixin
+from search.admin import IndexedSearchMixin
 from .models import Expense
 
 
+class ExpenseAdminForm(OpenPeriodFormMixin, forms.ModelForm):
+    class Meta:
+        model = Expense
+        fields = "__all__"
+
+
 @admin.register(Expense)
-class ExpenseAdmin(admin.ModelAdmin):
+class ExpenseAdmin(OpenPeriodAdminMixin, IndexedSearchMixin, admin.ModelAdmin):
+    form = ExpenseAdminForm
     list_display = ("date", "category", "sub_type", "description", "amount")
     list_filter = ("category", "sub_type", "date")
     search_fields = ("description",)
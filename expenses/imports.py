@@ -0,0 +1,130 @@
+import csv
+
+from django.db import transaction
+
+from ledger.imports import ImportResult, parse_day, parse_money
+from ledger.periods import check_open, closed_through
+from ledger.rollups import deferred_rollups
+from .models import Expense
+
+IMPORT_BATCH_SIZE = 5000
+
+AMOUNT_FIELD = Expense._meta.get_field("amount")
+MAX_DESCRIPTION = Expense._meta.get_field("description").max_length
+
+# Accept codes ("MATERIAL") and labels ("Material Expense", as exported)
+CATEGORY_LOOKUP = {
+    **{code: code for code in Expense.Category.values},
+    **{label.upper(): code for code, label in Expense.Category.choices},
+}
+
+
+def normalise_row(date_str, cat_raw, amt_raw, desc_raw, invalid_date=None):
+    """
+    Expense field values for one input row, or None for a completely blank row.
+    Raises ValueError(reason) for a row that cannot be saved. A bad date falls
+    back to ``invalid_date`` when given (the bulk form uses today), otherwise
+    it is an error too. A blank date leaves the model default.
+    """
+    # Normalize inputs
+    date_str = (date_str or "").strip()
+    description = (desc_raw or "").strip()
+    category = (cat_raw or "").strip().upper()
+    amt_str = (amt_raw or "").strip()
+
+    # Skip completely empty row
+    if not any([date_str, category, description, amt_str]):
+        return None
+
+    # Validate category
+    if category not in CATEGORY_LOOKUP:
+        raise ValueError(f"unknown category {cat_raw!r}")
+
+    # Parse amount: strip currency symbols, commas
+    amount = parse_money(amt_str, AMOUNT_FIELD)
+
+    if len(description) > MAX_DESCRIPTION:
+        raise ValueError(f"description longer than {MAX_DESCRIPTION} characters")
+
+    # sub_type always None now (cleared if the model still has the field)
+    values = {
+        "description": description,
+        "category": CATEGORY_LOOKUP[category],
+        "amount": amount,
+        "sub_type": None,
+    }
+
+    if date_str:
+        try:
+            values["date"] = parse_day(date_str)
+        except ValueError:
+            if invalid_date is None:
+                raise ValueError(f"invalid date {date_str!r} (expected YYYY-MM-DD)") from None
+            values["date"] = invalid_date
+    return values
+
+
+class _RollBack(Exception):
+    """Abandons an all-or-nothing import that found an invalid row."""
+
+
+def import_expenses_csv(textfile, batch_size=IMPORT_BATCH_SIZE, all_or_nothing=False):
+    """
+    Import a CSV with Date, Category, Amount and optional Description columns
+    (header names are case-insensitive). Rows are read as a stream and saved
+    with bulk_create in batches, all inside one transaction. Invalid rows are
+    reported by line number; with ``all_or_nothing`` any error rolls the
+    whole file back.
+    """
+    result = ImportResult()
+    reader = csv.reader(textfile)
+    header = [h.strip().lower() for h in next(reader, [])]
+    missing = {"category", "amount"} - set(header)
+    if missing:
+        raise ValueError(f"CSV is missing the {', '.join(sorted(missing))} column(s).")
+    index = {name: header.index(name) for name in ("date", "category", "amount", "description") if name in header}
+
+    def cell(row, name):
+        i = index.get(name)
+        return row[i] if i is not None and i < len(row) else ""
+
+    batch = []
+    closed = closed_through()
+
+    def flush():
+        # Once an all-or-nothing import has failed, keep validating but stop writing.
+        if batch and not (all_or_nothing and result.error_count):
+            Expense.objects.bulk_create(batch, batch_size=batch_size)
+            result.created += len(batch)
+        batch.clear()
+
+    # Rollups are folded in once at the end rather than after every batch.
+    try:
+        with transaction.atomic(), deferred_rollups():
+            for row in reader:
+                line = reader.line_num  # physical line, right even with quoted newlines
+                try:
+                    values = normalise_row(cell(row, "date"), cell(row, "category"), cell(row, "amount"), cell(row, "description"))
+                    if values is not None:
+                        check_open(values.get("date"), closed, "Expense")
+                except ValueError as exc:  # includes PeriodClosedError
+                    result.rows += 1
+                    result.add_error(line, str(exc))
+                    continue
+                if values is None:
+                    continue
+                result.rows += 1
+                batch.append(Expense(**values))
+                if len(batch) >= batch_size:
+                    flush()
+            flush()
+
+            if all_or_nothing and result.error_count:
+                # Raised through deferred_rollups() so its pending rollup and
+                # ledger writes are dropped rather than flushed into a
+                # transaction marked for rollback.
+                raise _RollBack
+    except _RollBack:
+        result.rolled_back = True
+        result.created = 0
+    return result
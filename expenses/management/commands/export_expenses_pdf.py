@@ -0,0 +1,39 @@
+import resource
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from expenses.reports import PDF_CHUNK_SIZE, expense_rows, parse_report_filters, report_subtitle, write_expense_pdf
+
+
+class Command(BaseCommand):
+    help = "Write the streaming expense PDF to a file and report rows/second and peak memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Path of the PDF to write.")
+        parser.add_argument("--start-date", help="YYYY-MM-DD")
+        parser.add_argument("--end-date", help="YYYY-MM-DD")
+        parser.add_argument("--category", help="Expense category code, e.g. MATERIAL.")
+        parser.add_argument("--chunk-size", type=int, default=PDF_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        start, end, category = parse_report_filters({
+            "start_date": options["start_date"],
+            "end_date": options["end_date"],
+            "category": options["category"],
+        })
+
+        started = time.perf_counter()
+        with open(options["output"], "wb") as out:
+            rows = expense_rows(start, end, category, chunk_size=options["chunk_size"])
+            count, total = write_expense_pdf(out, rows, report_subtitle(start, end, category))
+        elapsed = time.perf_counter() - started
+
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_mb = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        self.stdout.write(
+            f"{count} expenses ({total:.2f}) in {elapsed:.2f}s: "
+            f"{count / elapsed if elapsed else 0:,.0f} rows/s, peak RSS {peak_mb:.1f} MB"
+        )
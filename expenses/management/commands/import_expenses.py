@@ -0,0 +1,44 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.imports import IMPORT_BATCH_SIZE, import_expenses_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Import expenses from a CSV (Date, Category, Amount, Description columns) "
+        "in one transaction and report invalid rows by line number and rows/second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import, or - for stdin.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--all-or-nothing", action="store_true", help="Import nothing if any row is invalid.")
+        parser.add_argument("--encoding", default="utf-8-sig")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            if options["path"] == "-":
+                result = import_expenses_csv(sys.stdin, options["batch_size"], options["all_or_nothing"])
+            else:
+                with open(options["path"], encoding=options["encoding"], newline="") as f:
+                    result = import_expenses_csv(f, options["batch_size"], options["all_or_nothing"])
+        except (OSError, UnicodeDecodeError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+        elapsed = time.perf_counter() - started
+
+        for line, message in result.errors:
+            self.stderr.write(f"line {line}: {message}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... and {result.error_count - len(result.errors)} more error(s)")
+
+        summary = (
+            f"{result.created} of {result.rows} row(s) imported, {result.error_count} error(s) "
+            f"in {elapsed:.1f}s ({result.rows / elapsed if elapsed else 0:,.0f} rows/s)"
+        )
+        if result.rolled_back:
+            raise CommandError(f"Nothing imported (--all-or-nothing): {summary}")
+        self.stdout.write(self.style.SUCCESS(summary) if not result.error_count else summary)
@@ -2,6 +2,8 @@
 from django.db import models
 from django.utils import timezone
 
+from ledger.bulk import BulkSignalQuerySet
+
 
 class Expense(models.Model):
     class Category(models.TextChoices):
@@ -28,6 +30,15 @@ class Expense(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BulkSignalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-date", "-id"], name="expense_date_id_idx"),
+            models.Index(fields=["category", "-date", "-id"], name="expense_cat_date_id_idx"),
+            models.Index(fields=["updated_at"], name="expense_updated_idx"),
+        ]
+
     def clean(self):
         from django.core.exceptions import ValidationError
         if self.category == self.Category.RBG and not self.sub_type:
@@ -0,0 +1,168 @@
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import chain
+
+from django.db.models import Q
+
+from dashboard.services import window_totals
+from ledger.archive import archived_rows
+from ledger.pdf import PageCanvas, StreamingPDF
+from .models import Expense
+
+PDF_CHUNK_SIZE = 2000
+ROW_HEIGHT = 20
+BOTTOM_MARGIN = 70
+
+
+def parse_report_filters(params):
+    """(start, end, category) from GET/POST data; blank or invalid values mean "no filter"."""
+    def day(name):
+        try:
+            return datetime.strptime(params.get(name) or "", "%Y-%m-%d").date()
+        except ValueError:
+            return None
+
+    start, end = day("start_date"), day("end_date")
+    if start and end and start > end:
+        start, end = end, start
+    # ?category= (the report form / list dropdown) or the list's ?tab=
+    category = (params.get("category") or params.get("tab") or "").upper()
+    if category not in Expense.Category.values:
+        category = None
+    return start, end, category
+
+
+def expense_rows(start=None, end=None, category=None, chunk_size=PDF_CHUNK_SIZE):
+    """
+    (date, category, description, amount) tuples, newest first, streamed in
+    chunks; archived expenses in the range follow the live ones.
+    """
+    qs = Expense.objects.all()
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+    if category:
+        qs = qs.filter(category=category)
+    live = (
+        qs.order_by("-date", "-id")
+        .values_list("date", "category", "description", "amount")
+        .iterator(chunk_size=chunk_size)
+    )
+    archived = (
+        (e.date, e.category, e.description, e.amount)
+        for e in archived_rows(Expense, start, end, **({"category": category} if category else {}))
+    )
+    return chain(live, archived)
+
+
+def write_expense_pdf(out, rows, subtitle=""):
+    """
+    Draw the expense report into the binary file ``out`` one page at a time,
+    with a subtotal under every page and the grand total on the last one.
+    Returns (row count, grand total).
+    """
+    pdf = StreamingPDF(out)
+    width, height = pdf.width, pdf.height
+    labels = dict(Expense.Category.choices)
+    count, grand_total = 0, Decimal("0")
+
+    def new_page():
+        page = PageCanvas()
+        y = height - 50
+        if not pdf.page_ids:
+            page.setFont("Helvetica-Bold", 16)
+            page.drawString(200, y, "Expense Report")
+            if subtitle:
+                page.setFont("Helvetica", 10)
+                page.drawString(50, y - 20, subtitle)
+            y = height - 100
+        page.setFont("Helvetica-Bold", 12)
+        page.drawString(50, y, "Date")
+        page.drawString(150, y, "Category")
+        page.drawString(300, y, "Description")
+        page.drawRightString(550, y, "Amount")
+        page.setFont("Helvetica", 10)
+        return page, y - ROW_HEIGHT
+
+    def finish_page(page, subtotal, last=False):
+        page.setFont("Helvetica-Bold", 10)
+        page.drawRightString(550, 50, f"Page subtotal: {subtotal:.2f}")
+        if last:
+            page.drawString(50, 50, f"Total ({count} expenses): {grand_total:.2f}")
+        page.setFont("Helvetica", 8)
+        page.drawRightString(550, 30, f"Page {len(pdf.page_ids) + 1}")
+        pdf.add_page(page)
+
+    page, y = new_page()
+    subtotal = Decimal("0")
+    for day, code, description, amount in rows:
+        if y < BOTTOM_MARGIN:
+            finish_page(page, subtotal)
+            page, y = new_page()
+            subtotal = Decimal("0")
+        amount = amount or Decimal("0")
+        page.drawString(50, y, str(day))
+        page.drawString(150, y, labels.get(code, code))
+        page.drawString(300, y, page.fit(description or "-", 170))
+        page.drawRightString(550, y, str(amount))
+        subtotal += amount
+        grand_total += amount
+        count += 1
+        y -= ROW_HEIGHT
+
+    finish_page(page, subtotal, last=True)
+    pdf.close()
+    return count, grand_total
+
+
+def report_subtitle(start, end, category):
+    parts = []
+    if start or end:
+        parts.append(f"{start or 'start'} to {end or 'today'}")
+    if category:
+        parts.append(dict(Expense.Category.choices)[category])
+    return " · ".join(parts)
+
+
+CATEGORY_TOTALS = {"MATERIAL": "total_material", "RBG": "total_rbg", "SETUP": "total_setup"}
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def expense_report_context(start_date, end_date, selected_category=None):
+    """Context for expenses/report_pdf.html (the form-driven xhtml2pdf report)."""
+    expenses = []
+    totals = {"total_material": 0, "total_rbg": 0, "total_setup": 0, "total_all": 0}
+
+    if start_date and end_date:
+        window = Expense.objects.filter(date__range=[start_date, end_date])
+        expenses = window.filter(category=selected_category) if selected_category else window
+
+        # Totals (one aggregate)
+        totals = window_totals(window, {
+            "total_material": Q(category="MATERIAL"),
+            "total_rbg": Q(category="RBG"),
+            "total_setup": Q(category="SETUP"),
+            "total_all": None,
+        })
+
+        # Archived expenses in the range, after the (newer) live ones
+        archived = list(archived_rows(Expense, _as_date(start_date), _as_date(end_date)))
+        if archived:
+            expenses = list(expenses) + [e for e in archived if not selected_category or e.category == selected_category]
+            for e in archived:
+                key = CATEGORY_TOTALS.get(e.category)
+                if key:
+                    totals[key] += e.amount
+                totals["total_all"] += e.amount
+
+    return {
+        "expenses": expenses,
+        **totals,
+        "start_date": start_date,
+        "end_date": end_date,
+        "selected_category": selected_category,
+    }
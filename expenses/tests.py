@@ -0,0 +1,41 @@
+import io
+from decimal import Decimal
+
+from django.test import TestCase
+
+from ledger.models import DailyLedgerRollup, LedgerEntry
+from .imports import import_expenses_csv
+from .models import Expense
+
+CSV = (
+    "Date,Category,Amount,Description\n"
+    "2026-03-01,MATERIAL,10.00,thread\n"
+    "2026-03-02,SETUP,20.00,needles\n"
+    "2026-03-03,RBG,30.00,rent\n"
+)
+
+
+class ImportExpensesCsvTests(TestCase):
+    def test_all_or_nothing_rolls_back_batches_already_written(self):
+        textfile = io.StringIO(CSV + "2026-03-04,NOPE,40.00,bad category\n")
+
+        result = import_expenses_csv(textfile, batch_size=2, all_or_nothing=True)
+
+        self.assertTrue(result.rolled_back)
+        self.assertEqual((result.rows, result.created, result.error_count), (4, 0, 1))
+        self.assertEqual(result.errors[0][0], 5)
+        self.assertFalse(Expense.objects.exists())
+        self.assertFalse(DailyLedgerRollup.objects.exists())
+        self.assertFalse(LedgerEntry.objects.exists())
+
+    def test_valid_rows_are_kept_without_all_or_nothing(self):
+        textfile = io.StringIO(CSV + "2026-03-04,NOPE,40.00,bad category\n")
+
+        result = import_expenses_csv(textfile, batch_size=2)
+
+        self.assertFalse(result.rolled_back)
+        self.assertEqual((result.created, result.error_count), (3, 1))
+        self.assertEqual(
+            DailyLedgerRollup.objects.filter(source=DailyLedgerRollup.Source.EXPENSE).count(), 3,
+        )
+        self.assertEqual(sum(e.amount for e in Expense.objects.all()), Decimal("60.00"))
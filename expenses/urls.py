@@ -16,6 +16,9 @@ urlpatterns = [
     # Bulk add page
     path("bulk-add/", views.expense_bulk_add, name="bulk_add"),
 
+    # CSV import (batched, optionally all-or-nothing)
+    path("import/", views.expense_import, name="import"),
+
     # Delete (with ?return= to preserve filters from the list page)
     path("<int:pk>/delete/", views.expense_delete, name="delete"),
 
@@ -23,7 +26,10 @@ urlpatterns = [
     # 1) Form-driven report (GET shows form; POST returns filtered PDF via xhtml2pdf)
     path("report/", views.expense_report, name="report"),
 
-    # 2) Quick "all expenses" PDF generated via ReportLab
+    # 2) Quick "all expenses" PDF, streamed page by page (optional date/category filters)
     #    >>> Rename your first report function to expense_report_pdf_all <<<
     path("report/pdf/", views.expense_report_pdf_all, name="report_pdf"),
+
+    # 3) Streaming CSV / XLSX export of the filtered list (?gzip=1 for a .csv.gz)
+    path("export/<str:fmt>/", views.expense_export, name="export"),
 ]
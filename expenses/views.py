@@ -1,12 +1,8 @@
 from django.contrib import messages
 from django.http import HttpResponse
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from django.template.loader import get_template
-from xhtml2pdf import pisa
 from itertools import zip_longest
 
-import io
+import tempfile
 from django.shortcuts import get_object_or_404
 from django.shortcuts import render, redirect
 from django.db.models import Sum
@@ -50,6 +46,9 @@ def material_list(request):
     return render(request, "expenses/material_list.html", context)
 
 # expenses/views.py
+import csv
+import io
+
 from django.contrib import messages
 from django.db.models import Sum
 from django.shortcuts import get_object_or_404, redirect, render
@@ -57,11 +56,23 @@ from django.utils import timezone
 from datetime import datetime
 from .models import Expense
 from .forms import ExpenseForm
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
 from itertools import zip_longest
-from django.http import HttpResponse
+from django.http import FileResponse
 from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
+from ledger.archive import archived_export_rows
+from ledger.cache import cached_result
+from ledger.exports import export_response
+from ledger.models import DailyLedgerRollup
+from ledger.periods import check_open, closed_through, redirect_on_closed_period
+from ledger.pagination import KeysetPaginator
+from ledger.rollups import totals_by_key
+from .imports import import_expenses_csv, normalise_row
+from .reports import expense_rows, parse_report_filters, report_subtitle, write_expense_pdf
+
+EXPENSES_PER_PAGE = 50
+PDF_SPOOL_MAX_SIZE = 5 * 1024 * 1024  # bigger exports spill to disk
 
 # --- Daily expenses list with tabs + date filter ---
 def expense_list(request):
@@ -112,16 +123,24 @@ def expense_list(request):
     # Visible rows
     qs = window_qs.filter(category=selected_code) if selected_code else window_qs
 
-    # Totals for the window (overall + per category)
-    total_all = window_qs.aggregate(total=Sum("amount"))["total"] or 0
-    totals_by_cat = {
-        code: (window_qs.filter(category=code).aggregate(total=Sum("amount"))["total"] or 0)
-        for code in codes
-    }
-    # Counts for badges
-    count_all = window_qs.count()
-    counts_by_cat = {code: window_qs.filter(category=code).count() for code in codes}
-    visible_total = qs.aggregate(total=Sum("amount"))["total"] or 0
+    # Totals and badge counts for the window, from the daily rollups (one query,
+    # cached until an Expense is written)
+    rolled = cached_result(
+        "expenses:list", [Expense], (start_date, end_date),
+        lambda: totals_by_key(DailyLedgerRollup.Source.EXPENSE, start_date, end_date),
+    )
+    totals_by_cat = {code: rolled.get(code, (0, 0))[0] for code in codes}
+    counts_by_cat = {code: rolled.get(code, (0, 0))[1] for code in codes}
+    total_all = sum(totals_by_cat.values())
+    count_all = sum(counts_by_cat.values())
+    visible_total = totals_by_cat[selected_code] if selected_code else total_all
+    visible_count = counts_by_cat[selected_code] if selected_code else count_all
+
+    # Keyset-page the visible rows on (date, id); the count comes from the rollups,
+    # which still count archived rows (the template says so)
+    page_obj = KeysetPaginator(qs, EXPENSES_PER_PAGE).page(request.GET.get("cursor"))
+    page_params = request.GET.copy()
+    page_params.pop("cursor", None)
 
     # Convenience: pull well-known categories if present
     def t(code): return totals_by_cat.get(code, 0)
@@ -151,8 +170,12 @@ def expense_list(request):
         })
 
     context = {
-        # rows
-        "expenses": qs,
+        # rows (current page only)
+        "expenses": page_obj,
+        "page_obj": page_obj,
+        "is_paginated": page_obj.has_other_pages(),
+        "page_query": page_params.urlencode(),
+        "visible_count": visible_count,
 
         # filters/state
         "start_date": start_date,
@@ -182,6 +205,7 @@ def expense_list(request):
 
 
 
+@redirect_on_closed_period
 def expense_new(request):
     if request.method == "POST":
         form = ExpenseForm(request.POST)
@@ -199,6 +223,7 @@ def expense_new(request):
     return render(request, "expenses/new.html", {"form": form})
 
 
+@redirect_on_closed_period
 def expense_delete(request, pk):
     expense = get_object_or_404(Expense, pk=pk)
     if request.method == "POST":
@@ -209,46 +234,41 @@ def expense_delete(request, pk):
     return render(request, "expenses/confirm_delete.html", {"expense": expense})
 
 def expense_report_pdf_all(request):
-    # Get all expenses (you can add filters if needed)
-    expenses = Expense.objects.all().order_by("-date")
-
-    # Create PDF buffer
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-
-    # Title
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(200, height - 50, "Expense Report ")
-
-    # Table header
-    y = height - 100
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(50, y, "Date")
-    p.drawString(150, y, "Category")
-    p.drawString(300, y, "Description")
-    p.drawString(500, y, "Amount")
-
-    # Table content
-    p.setFont("Helvetica", 10)
-    y -= 20
-    for exp in expenses:
-        p.drawString(50, y, str(exp.date))
-        p.drawString(150, y, exp.get_category_display())
-        p.drawString(300, y, exp.description or "-")
-        p.drawRightString(550, y, str(exp.amount))
-        y -= 20
-        if y < 50:  # new page
-            p.showPage()
-            y = height - 50
-
-    p.showPage()
-    p.save()
+    # Optional ?start_date=&end_date=&category= filters; no filters = every expense.
+    start, end, category = parse_report_filters(request.GET)
+
+    # Rows are streamed in chunks and each finished page is written straight to
+    # a spooled temp file, so memory stays flat however many expenses there are.
+    buffer = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE)
+    write_expense_pdf(buffer, expense_rows(start, end, category), report_subtitle(start, end, category))
 
     buffer.seek(0)
-    return HttpResponse(buffer, content_type="application/pdf")
+    return FileResponse(buffer, content_type="application/pdf", filename="expense_report.pdf")
+
+# --- CSV / XLSX export (same ?start_date=&end_date=&category=/tab= filters) ---
+EXPORT_COLUMNS = [
+    ("Date", "date"),
+    ("Category", "category"),
+    ("Description", "description"),
+    ("Amount", "amount"),
+]
+
+
+def expense_export(request, fmt):
+    start, end, category = parse_report_filters(request.GET)
+    qs = Expense.objects.order_by("-date", "-id")
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+    if category:
+        qs = qs.filter(category=category)
+    # Archived expenses are older than every live one, so they follow in order
+    archived = archived_export_rows(Expense, EXPORT_COLUMNS, start, end, **({"category": category} if category else {}))
+    return export_response(request, fmt, qs, EXPORT_COLUMNS, "expenses", more_rows=archived)
 
 # ___________EXPENCES
+@redirect_on_closed_period
 def expense_bulk_add(request):
     """
     Bulk add expenses. Accepts multiple rows from a dynamic form.
@@ -270,55 +290,27 @@ def expense_bulk_add(request):
             return redirect("expenses:list")
 
         to_create = []
+        skipped = []
         today = timezone.now().date()
-
-        valid_categories = {key for key, _ in Expense.Category.choices}
+        closed = closed_through()
 
         # date, category, amount, description
         rows = zip_longest(dates, categories, amounts, descriptions, fillvalue="")
 
-        for date_str, cat_raw, amt_raw, desc_raw in rows:
-            # Normalize inputs
-            date_str = (date_str or "").strip()
-            description = (desc_raw or "").strip()
-            category = (cat_raw or "").strip().upper()
-            amt_str = (amt_raw or "").strip()
-
-            # Skip completely empty row
-            if not any([date_str, category, description, amt_str]):
-                continue
-
-            # Validate category
-            if category not in valid_categories:
-                continue
-
-            # Parse amount: strip currency symbols, commas
-            amt_clean = amt_str.replace("£", "").replace(",", "").strip()
+        for number, (date_str, cat_raw, amt_raw, desc_raw) in enumerate(rows, start=1):
+            # Same normalisation as the CSV import; a bad date falls back to today
             try:
-                amount = Decimal(amt_clean)
-            except (InvalidOperation, TypeError):
+                values = normalise_row(date_str, cat_raw, amt_raw, desc_raw, invalid_date=today)
+                if values is not None:
+                    check_open(values.get("date"), closed, "Expense")
+            except ValueError as exc:  # includes PeriodClosedError
+                skipped.append(f"row {number}: {exc}")
                 continue
+            if values is not None:
+                to_create.append(Expense(**values))
 
-            # Parse date, fallback to "today" if invalid or blank -> or None to let model default
-            if date_str:
-                try:
-                    parsed_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                except ValueError:
-                    parsed_date = today
-            else:
-                parsed_date = None  # let model default apply
-
-            # Build model instance (sub_type always None now)
-            kwargs = {
-                "description": description,
-                "category": category,
-                "amount": amount,
-                "sub_type": None,  # ensure it's cleared if the model still has the field
-            }
-            if parsed_date:
-                kwargs["date"] = parsed_date
-
-            to_create.append(Expense(**kwargs))
+        if skipped:
+            messages.error(request, "Skipped " + "; ".join(skipped))
 
         if to_create:
             Expense.objects.bulk_create(to_create)
@@ -331,48 +323,38 @@ def expense_bulk_add(request):
     # GET request - render page
     return render(request, "expenses/bulk_add.html", {"today": timezone.now().date()})
 
-# ///////////////////////////////Generate reprot////////////////
-def expense_report(request):
-    expenses = []
-    total_material = total_rbg = total_setup = total_all = 0
-    start_date = end_date = selected_category = None
-
+@redirect_on_closed_period
+def expense_import(request):
+    """
+    Upload a CSV (Date, Category, Amount, Description) and import it in
+    batches. Invalid rows are listed by line number; "all or nothing" rolls
+    the whole file back if any row is invalid.
+    """
+    result = None
     if request.method == "POST":
-        start_date = request.POST.get("start_date")
-        end_date = request.POST.get("end_date")
-        selected_category = request.POST.get("category")
-
-        if start_date and end_date:
-            expenses = Expense.objects.filter(date__range=[start_date, end_date])
-
-            if selected_category:  # filter by category if chosen
-                expenses = expenses.filter(category=selected_category)
-
-        # Totals
-        total_material = Expense.objects.filter(date__range=[start_date, end_date], category="MATERIAL").aggregate(total=Sum("amount"))["total"] or 0
-        total_rbg = Expense.objects.filter(date__range=[start_date, end_date], category="RBG").aggregate(total=Sum("amount"))["total"] or 0
-        total_setup = Expense.objects.filter(date__range=[start_date, end_date], category="SETUP").aggregate(total=Sum("amount"))["total"] or 0
-        total_all = Expense.objects.filter(date__range=[start_date, end_date]).aggregate(total=Sum("amount"))["total"] or 0
-
-        # ✅ Generate PDF
-        template_path = "expenses/report_pdf.html"
-        context = {
-            "expenses": expenses,
-            "total_material": total_material,
-            "total_rbg": total_rbg,
-            "total_setup": total_setup,
-            "total_all": total_all,
-            "start_date": start_date,
-            "end_date": end_date,
-            "selected_category": selected_category,
-        }
-        template = get_template(template_path)
-        html = template.render(context)
-
-        response = HttpResponse(content_type="application/pdf")
-        response["Content-Disposition"] = 'attachment; filename="expenses_report.pdf"'
-        pisa.CreatePDF(html, dest=response)
-        return response
+        upload = request.FILES.get("file")
+        if upload is None:
+            messages.error(request, "Choose a CSV file to import.")
+            return redirect("expenses:import")
+
+        textfile = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            result = import_expenses_csv(textfile, all_or_nothing=bool(request.POST.get("all_or_nothing")))
+        except (ValueError, csv.Error) as exc:  # includes UnicodeDecodeError; the transaction rolls back
+            messages.error(request, f"Could not import {upload.name}: {exc}")
+            return redirect("expenses:import")
+
+        if result.rolled_back:
+            messages.error(request, f"Nothing imported: {result.error_count} invalid row(s).")
+        else:
+            messages.success(request, f"Imported {result.created} of {result.rows} expense(s).")
+
+    return render(request, "expenses/import.html", {"result": result})
 
+# ///////////////////////////////Generate reprot////////////////
+def expense_report(request):
+    # The form posts to reports:queue; the PDF is rendered by run_report_worker,
+    # never inside a web request.
+    selected_category = request.GET.get("category")
     return render(request, "expenses/report_form.html", {"selected_category": selected_category})
 # /////////////////////////////end Generate reprot////////////////
\ No newline at end of file
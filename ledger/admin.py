@@ -0,0 +1,88 @@
+from functools import wraps
+
+from django.contrib import admin, messages
+from django.db import transaction
+from django.shortcuts import redirect
+from django.urls import reverse
+
+from .models import ArchivedMonth, DailyLedgerRollup, LedgerEntry, PeriodSnapshot, PeriodTotal
+from .periods import PeriodClosedError
+
+
+class OpenPeriodAdminMixin:
+    """
+    ModelAdmin mixin for dated movements; give it a form with
+    ledger.forms.OpenPeriodFormMixin for adds and edits. A delete the
+    closed-period guards refuse, from the delete page or the "delete
+    selected" action, rolls back and becomes an error message instead of
+    a server error.
+    """
+
+    def delete_view(self, request, object_id, extra_context=None):
+        try:
+            with transaction.atomic():
+                return super().delete_view(request, object_id, extra_context)
+        except PeriodClosedError as exc:
+            self.message_user(request, str(exc), messages.ERROR)
+            opts = self.model._meta
+            return redirect(reverse(f"admin:{opts.app_label}_{opts.model_name}_change", args=[object_id]))
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        if "delete_selected" in actions:
+            func, name, description = actions["delete_selected"]
+            actions["delete_selected"] = (self._refusing_closed(func), name, description)
+        return actions
+
+    @staticmethod
+    def _refusing_closed(action):
+        @wraps(action)
+        def wrapper(modeladmin, request, queryset):
+            try:
+                with transaction.atomic():
+                    return action(modeladmin, request, queryset)
+            except PeriodClosedError as exc:
+                modeladmin.message_user(request, str(exc), messages.ERROR)
+                return None  # back to the change list
+        return wrapper
+
+
+@admin.register(DailyLedgerRollup)
+class DailyLedgerRollupAdmin(admin.ModelAdmin):
+    list_display = ("date", "source", "key", "total", "count")
+    list_filter = ("source", "key")
+    date_hierarchy = "date"
+    ordering = ("-date", "source", "key")
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ("date", "source", "object_id", "amount", "balance")
+    list_filter = ("source",)
+    date_hierarchy = "date"
+    ordering = ("-date", "-id")
+
+
+class PeriodTotalInline(admin.TabularInline):
+    model = PeriodTotal
+    extra = 0
+    can_delete = False
+    readonly_fields = ("source", "key", "total", "count")
+
+
+@admin.register(PeriodSnapshot)
+class PeriodSnapshotAdmin(admin.ModelAdmin):
+    # Created by `manage.py close_period`; deleting the latest one reopens its period.
+    list_display = ("period_end", "cash_balance", "closed_at")
+    readonly_fields = ("period_end", "cash_balance", "closed_at")
+    inlines = [PeriodTotalInline]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ArchivedMonth)
+class ArchivedMonthAdmin(admin.ModelAdmin):
+    list_display = ("label", "month", "key", "employee_id", "total", "count", "archived_at")
+    list_filter = ("label",)
+    date_hierarchy = "month"
@@ -0,0 +1,205 @@
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from itertools import chain
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from employees.models import WorkRecord
+from expenses.models import Expense
+from payments.models import Payment
+from .cache import bump_generation
+from .models import ArchivedMonth, PeriodSnapshot
+from .versions import bump_data_version
+
+READ_CHUNK_SIZE = 5000
+DELETE_CHUNK_SIZE = 500
+
+# model -> (columns kept per row, summary key column, row value). Every other
+# table stays live: salary and advance rows are few, and employee pages read them.
+ARCHIVE_TABLES = {
+    Expense: (
+        ("id", "date", "category", "sub_type", "description", "amount", "created_at", "updated_at"),
+        "category",
+        lambda row: row["amount"],
+    ),
+    Payment: (("id", "date", "type", "description", "amount"), "type", lambda row: row["amount"]),
+    WorkRecord: (
+        ("id", "employee_id", "date", "quantity", "item_price", "description"),
+        "employee_id",
+        lambda row: row["quantity"] * row["item_price"],
+    ),
+}
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def partition_path(model, month):
+    """The gzipped JSON-lines file holding ``model``'s archived rows of ``month``."""
+    return Path(settings.LEDGER_ARCHIVE_DIR) / model._meta.label_lower / f"{month:%Y-%m}.jsonl.gz"
+
+
+def _read_partition(model, path):
+    columns = ARCHIVE_TABLES[model][0]
+    fields = {name: model._meta.get_field(name) for name in columns}
+    with gzip.open(path, "rt", encoding="utf-8") as lines:
+        for line in lines:
+            yield {name: fields[name].to_python(value) for name, value in json.loads(line).items()}
+
+
+def archive(before):
+    """
+    Move every Expense, Payment and WorkRecord dated before ``before`` (the
+    first day of a month, inside a closed period) into monthly partition
+    files. Returns [(model label, month, rows archived)].
+    """
+    if before.day != 1:
+        raise ValueError("The archive cutoff must be the first day of a month.")
+    closed = PeriodSnapshot.objects.order_by("-period_end").values_list("period_end", flat=True).first()
+    if closed is None or before - timedelta(days=1) > closed:
+        raise ValueError(f"Only closed periods can be archived (closed through {closed or 'nothing yet'}).")
+
+    archived = []
+    for model in ARCHIVE_TABLES:
+        for month in model.objects.filter(date__lt=before).dates("date", "month"):
+            archived.append((model._meta.label_lower, month, archive_month(model, month)))
+    return archived
+
+
+def archive_month(model, month):
+    """
+    Write one month of ``model`` to its partition (merged with any rows
+    archived from that month before), replace its summary rows and delete
+    the rows from the table, all in one transaction. Returns the number of
+    rows that left the table.
+    """
+    columns, key_column, value = ARCHIVE_TABLES[model]
+    label = model._meta.label_lower
+    live = model.objects.filter(date__gte=month, date__lt=_next_month(month)).order_by("date", "id")
+    path = partition_path(model, month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with transaction.atomic():
+        ids = list(live.values_list("id", flat=True))
+        summaries = ArchivedMonth.objects.filter(label=label, month=month)
+        earlier = ()
+        if summaries.exists() and path.exists():
+            # Rows a failed run wrote but did not delete are still live: keep those copies.
+            live_ids = set(ids)
+            earlier = (row for row in _read_partition(model, path) if row["id"] not in live_ids)
+
+        totals = defaultdict(lambda: [Decimal("0.00"), 0])
+        temporary = path.with_name(path.name + ".tmp")
+        with gzip.open(temporary, "wt", encoding="utf-8", compresslevel=6) as out:
+            for row in chain(earlier, live.values(*columns).iterator(chunk_size=READ_CHUNK_SIZE)):
+                out.write(json.dumps(row, cls=DjangoJSONEncoder, separators=(",", ":")) + "\n")
+                summary = totals[row[key_column] or ""]
+                summary[0] += value(row)
+                summary[1] += 1
+        os.replace(temporary, path)
+
+        summaries.delete()
+        employee_keyed = key_column == "employee_id"
+        ArchivedMonth.objects.bulk_create([
+            ArchivedMonth(
+                label=label, month=month,
+                key="" if employee_keyed else key,
+                employee_id=key if employee_keyed else None,
+                total=total, count=count,
+            )
+            for key, (total, count) in totals.items()
+        ])
+        _delete_rows(model, ids)
+        transaction.on_commit(lambda: (bump_generation(model), bump_data_version(model)))
+    return len(ids)
+
+
+def _delete_rows(model, ids):
+    # Raw SQL so no delete signal fires: the rollups, ledger entries, employee
+    # totals and period snapshots go on counting the archived rows.
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    pk = quote(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            chunk = ids[start:start + DELETE_CHUNK_SIZE]
+            cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+
+def archived_rows(model, start=None, end=None, **equals):
+    """
+    Archived ``model`` rows dated within start..end (either may be None)
+    whose fields equal ``equals``, as unsaved instances, newest first. One
+    query finds the partitions the range reaches; a range that starts after
+    the archive reads no file.
+    """
+    if model not in ARCHIVE_TABLES:
+        return
+    months = ArchivedMonth.objects.filter(label=model._meta.label_lower)
+    key_column = ARCHIVE_TABLES[model][1]
+    if key_column in equals:
+        # Only the months whose summary has that key (an employee, a category)
+        summary_column = "employee_id" if key_column == "employee_id" else "key"
+        months = months.filter(**{summary_column: equals[key_column]})
+    if start:
+        months = months.filter(month__gte=start.replace(day=1))
+    if end:
+        months = months.filter(month__lte=end)
+    for month in months.order_by("-month").values_list("month", flat=True).distinct():
+        rows = [
+            row for row in _read_partition(model, partition_path(model, month))
+            if (not start or row["date"] >= start)
+            and (not end or row["date"] <= end)
+            and all(row[name] == wanted for name, wanted in equals.items())
+        ]
+        rows.sort(key=lambda row: (row["date"], row["id"]), reverse=True)
+        for row in rows:
+            yield model(**row)
+
+
+def archived_export_rows(model, columns, start=None, end=None, computed=None, **equals):
+    """
+    archived_rows() as export tuples for ``(header, field name)`` columns:
+    choices as labels, ``relation__field`` names read in one query for the
+    whole export, and the headers in ``computed`` ({header: function of the
+    row}, for expression columns) computed from the row.
+    """
+    computed = computed or {}
+    getters = []
+    for header, name in columns:
+        if header in computed:
+            getters.append(computed[header])
+        elif "__" in name:
+            relation, target = name.split("__", 1)
+            getters.append(_related_getter(model._meta.get_field(relation), target))
+        else:
+            getters.append(_field_getter(model._meta.get_field(name)))
+    for obj in archived_rows(model, start, end, **equals):
+        yield tuple(get(obj) for get in getters)
+
+
+def _field_getter(field):
+    labels = dict(field.flatchoices) if field.choices else None
+    if labels:
+        return lambda obj: labels.get(getattr(obj, field.attname), getattr(obj, field.attname))
+    return lambda obj: getattr(obj, field.attname)
+
+
+def _related_getter(field, target):
+    """Reads ``target`` of every related row on first use, so an export with no archived rows queries nothing."""
+    values = None
+
+    def get(obj):
+        nonlocal values
+        if values is None:
+            values = dict(field.related_model._default_manager.values_list("pk", target))
+        return values.get(getattr(obj, field.attname))
+    return get
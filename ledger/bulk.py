@@ -0,0 +1,45 @@
+from django.db import connection, models
+from django.dispatch import Signal
+
+# Sent before and after QuerySet.bulk_create(), which skips pre_save/post_save.
+# Arguments: sender (model class), objs (the instances to create / created).
+pre_bulk_create = Signal()
+post_bulk_create = Signal()
+
+
+class BulkSignalQuerySet(models.QuerySet):
+    """QuerySet whose bulk_create() announces the new rows via ``pre_bulk_create``/``post_bulk_create``."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if objs:
+            pre_bulk_create.send(sender=self.model, objs=objs)
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            post_bulk_create.send(sender=self.model, objs=objs)
+        return objs
+
+
+def bulk_increment(model, columns, rows, chunk_size=250):
+    """
+    Add deltas to ``columns`` on many rows of ``model``. ``rows`` is
+    [(pk, delta, ...)] with one delta per column. Runs one
+    ``UPDATE ... SET col = col + CASE pk WHEN ... END`` per ``chunk_size`` rows.
+    The SQL is built by hand: compiling thousands of When() objects through
+    the ORM cost more than running the statement.
+    """
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    id_col = quote(model._meta.pk.column)
+    targets = [quote(model._meta.get_field(name).column) for name in columns]
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            whens = " ".join(["WHEN %s THEN %s"] * len(chunk))
+            sets = ", ".join(f"{col} = {col} + CASE {id_col} {whens} END" for col in targets)
+            params = [v for i in range(len(targets)) for row in chunk for v in (row[0], row[i + 1])]
+            params += [row[0] for row in chunk]
+            cursor.execute(
+                f"UPDATE {table} SET {sets} WHERE {id_col} IN ({', '.join(['%s'] * len(chunk))})",
+                params,
+            )
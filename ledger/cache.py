@@ -0,0 +1,72 @@
+import hashlib
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+
+CONTEXT_TIMEOUT = 60 * 15
+
+# In-process hit/miss/recompute counters per cached view, for /cache-stats/.
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0, "recompute_ms_total": 0.0, "last_recompute_ms": None})
+
+
+def _generation_key(model):
+    return f"ledger:gen:{model._meta.label_lower}"
+
+
+def _fresh_generation():
+    # Time based, so an evicted counter never restarts at a value that old
+    # cache entries were keyed with.
+    return time.time_ns()
+
+
+def generations(models):
+    """Current generation number of each model, fetched in one cache call."""
+    keys = [_generation_key(m) for m in models]
+    found = cache.get_many(keys)
+    missing = {k: _fresh_generation() for k in keys if k not in found}
+    for key, value in missing.items():
+        cache.add(key, value, timeout=None)
+    if missing:
+        found.update(cache.get_many(list(missing)))
+    return [found.get(k, missing.get(k)) for k in keys]
+
+
+def bump_generation(model):
+    """Invalidate every cached result that depends on ``model``."""
+    key = _generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_generation(), timeout=None)
+
+
+def cached_result(name, models, params, compute, timeout=CONTEXT_TIMEOUT):
+    """
+    Return ``compute()`` cached under ``name`` + ``params`` + the generations
+    of ``models``. A write to any of those models changes the key, so stale
+    entries are simply never read again and age out.
+    """
+    raw = repr((params, generations(models))).encode()
+    key = f"ledger:ctx:{name}:{hashlib.sha1(raw).hexdigest()}"
+
+    stats = _stats[name]
+    value = cache.get(key)
+    if value is not None:
+        stats["hits"] += 1
+        return value
+
+    started = time.perf_counter()
+    value = compute()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    cache.set(key, value, timeout=timeout)
+
+    stats["misses"] += 1
+    stats["recompute_ms_total"] += elapsed_ms
+    stats["last_recompute_ms"] = elapsed_ms
+    return value
+
+
+def cache_stats():
+    """Snapshot of the hit/miss/recompute counters for this process."""
+    return {name: dict(values) for name, values in _stats.items()}
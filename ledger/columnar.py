@@ -0,0 +1,302 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+
+from employees.models import WorkRecord
+from expenses.models import Expense
+from payments.models import Payment
+from .archive import archived_rows
+from .versions import data_versions
+
+READ_CHUNK_SIZE = 5000
+# Rows are re-read from this long before the last refresh's newest
+# updated_at, so a transaction that stamped its rows earlier but committed
+# later is not missed. Re-reading a row twice is harmless.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+EPOCH = date(1970, 1, 1).toordinal()
+# A value's code in the "category" / "type" columns is its position in these
+# lists. Any other value (a choice since retired, a row written around the
+# form) gets the extra code len(list), an "other" bucket, so it is still
+# counted and never stops a refresh.
+EXPENSE_CATEGORIES = list(Expense.Category.values)
+PAYMENT_TYPES = [code for code, _ in Payment.TYPE_CHOICES]
+
+
+def day_number(day):
+    """``day`` as the int stored in the date columns (days since 1970-01-01)."""
+    return day.toordinal() - EPOCH
+
+
+def month_number(day):
+    """The month holding ``day`` as month_of() numbers it (months since 1970-01)."""
+    return (day.year - 1970) * 12 + day.month - 1
+
+
+def _pence(amount):
+    return int((amount * 100).to_integral_value())
+
+
+def _coder(codes):
+    """Value -> its position in ``codes``, or len(codes) (the "other" bucket) when it is not there."""
+    positions = {code: position for position, code in enumerate(codes)}
+    return lambda value: positions.get(value, len(codes))
+
+
+_expense_code = _coder(EXPENSE_CATEGORIES)
+_payment_code = _coder(PAYMENT_TYPES)
+
+
+# model -> (fields read per row, {column: (dtype, value of a row)}). Every
+# table also gets an int64 "id" column, sorted.
+COLUMNAR_TABLES = {
+    Expense: (
+        ("date", "category", "amount"),
+        {
+            "date": (np.int32, lambda row: day_number(row["date"])),
+            "category": (np.int8, lambda row: _expense_code(row["category"])),
+            "amount": (np.int64, lambda row: _pence(row["amount"])),
+        },
+    ),
+    Payment: (
+        ("date", "type", "amount"),
+        {
+            "date": (np.int32, lambda row: day_number(row["date"])),
+            "type": (np.int8, lambda row: _payment_code(row["type"])),
+            "amount": (np.int64, lambda row: _pence(row["amount"])),
+        },
+    ),
+    WorkRecord: (
+        ("date", "employee_id", "quantity", "item_price"),
+        {
+            "date": (np.int32, lambda row: day_number(row["date"])),
+            "employee": (np.int64, lambda row: row["employee_id"]),
+            "quantity": (np.int64, lambda row: row["quantity"]),
+            "item_price": (np.int64, lambda row: _pence(row["item_price"])),
+            "amount": (np.int64, lambda row: row["quantity"] * _pence(row["item_price"])),
+        },
+    ),
+}
+
+
+def _table_dir(model):
+    return Path(settings.LEDGER_ANALYTICS_DIR) / model._meta.label_lower
+
+
+def _read_meta(model):
+    try:
+        with open(_table_dir(model) / "meta.json", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _to_arrays(model, rows):
+    _, columns = COLUMNAR_TABLES[model]
+    arrays = {"id": np.array([row["id"] for row in rows], dtype=np.int64)}
+    for name, (dtype, value) in columns.items():
+        arrays[name] = np.array([value(row) for row in rows], dtype=dtype)
+    order = np.argsort(arrays["id"], kind="stable")
+    return {name: array[order] for name, array in arrays.items()}
+
+
+def _write(model, arrays, meta, previous=None):
+    """Save ``arrays`` as a new generation directory, then point meta.json at it."""
+    base = _table_dir(model)
+    base.mkdir(parents=True, exist_ok=True)
+    generation = Path(tempfile.mkdtemp(prefix="g", dir=base))
+    for name, array in arrays.items():
+        np.save(generation / f"{name}.npy", np.ascontiguousarray(array))
+    meta = dict(meta, generation=generation.name, rows=len(arrays["id"]))
+    with open(generation / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(generation / "meta.json", base / "meta.json")
+    if previous:
+        # Processes still mapping the old files keep reading them until they reload.
+        shutil.rmtree(base / previous, ignore_errors=True)
+    return meta
+
+
+def _live_check(model):
+    return model.objects.order_by().aggregate(count=Count("id"), id_sum=Sum("id"))
+
+
+def _rebuild_table(model, version):
+    fields = ("id", *COLUMNAR_TABLES[model][0])
+    rows = []
+    watermark = None
+    for row in model.objects.order_by().values(*fields, "updated_at").iterator(chunk_size=READ_CHUNK_SIZE):
+        rows.append(row)
+        if watermark is None or row["updated_at"] > watermark:
+            watermark = row["updated_at"]
+    archived_ids = []
+    for obj in archived_rows(model):
+        rows.append({name: getattr(obj, name) for name in fields})
+        archived_ids.append(obj.pk)
+    arrays = _to_arrays(model, rows)
+
+    old = _read_meta(model)
+    meta = {
+        "version": version,
+        "max_id": int(arrays["id"].max()) if len(rows) else 0,
+        "watermark": watermark.isoformat() if watermark else None,
+        "archived_count": len(archived_ids),
+        "archived_id_sum": sum(archived_ids),
+    }
+    _write(model, arrays, meta, previous=old and old["generation"])
+    # Generations left behind by refreshes that raced this one
+    current = _read_meta(model)["generation"]
+    for stale in _table_dir(model).iterdir():
+        if stale.is_dir() and stale.name != current:
+            shutil.rmtree(stale, ignore_errors=True)
+    return len(rows)
+
+
+def _refresh_table(model, meta, version):
+    """
+    Merge the rows added (id above the last max id) or changed (updated_at
+    since the last watermark) into the snapshot. Returns the number of rows
+    merged, or None when rows were deleted and the table must be rebuilt.
+    """
+    fields = ("id", *COLUMNAR_TABLES[model][0])
+    changed = Q(id__gt=meta["max_id"])
+    if meta["watermark"]:
+        changed |= Q(updated_at__gte=datetime.fromisoformat(meta["watermark"]) - WATERMARK_OVERLAP)
+    rows = list(model.objects.filter(changed).order_by().values(*fields, "updated_at"))
+    watermark = max([row["updated_at"] for row in rows] + (
+        [datetime.fromisoformat(meta["watermark"])] if meta["watermark"] else []
+    ), default=None)
+
+    old = load(model, meta)
+    fresh = _to_arrays(model, rows)
+    kept = ~np.isin(old["id"], fresh["id"])
+    merged = {name: np.concatenate([old[name][kept], fresh[name]]) for name in old}
+    order = np.argsort(merged["id"], kind="stable")
+    merged = {name: array[order] for name, array in merged.items()}
+
+    # A deleted row leaves neither a new id nor a new updated_at behind; the
+    # live row count and id sum catch it.
+    live = _live_check(model)
+    if (
+        live["count"] != len(merged["id"]) - meta["archived_count"]
+        or (live["id_sum"] or 0) != int(merged["id"].sum()) - meta["archived_id_sum"]
+    ):
+        return None
+
+    _write(model, merged, dict(
+        meta,
+        version=version,
+        max_id=max(meta["max_id"], int(fresh["id"].max()) if rows else 0),
+        watermark=watermark.isoformat() if watermark else None,
+    ), previous=meta["generation"])
+    return len(rows)
+
+
+def refresh(models=None, rebuild=False):
+    """
+    Bring the column snapshot of ``models`` (default: every table in
+    COLUMNAR_TABLES) up to date with the database and the archive. One
+    query when nothing has been written since the last refresh; otherwise
+    only the new and changed rows are read, unless rows were deleted (or
+    archived), which rebuilds that table. Returns {label: "unchanged" |
+    "rebuilt" | rows merged}.
+    """
+    models = list(models or COLUMNAR_TABLES)
+    result = {}
+    for model, version in zip(models, data_versions(models)):
+        label = model._meta.label_lower
+        meta = _read_meta(model)
+        if meta is not None and not rebuild and meta["version"] == version:
+            result[label] = "unchanged"
+            continue
+        merged = None if meta is None or rebuild else _refresh_table(model, meta, version)
+        if merged is None:
+            _rebuild_table(model, version)
+            result[label] = "rebuilt"
+        else:
+            result[label] = merged
+    return result
+
+
+_mapped = {}  # label -> (generation, {column: memory-mapped array})
+
+
+def load(model, meta=None):
+    """
+    ``model``'s snapshot as {column: read-only memory-mapped array}, rows
+    sorted by id. Mapped once per process and generation. Only refresh()
+    writes the snapshot; an empty dict means it has not been built yet.
+    """
+    label = model._meta.label_lower
+    for _ in range(2):
+        meta = meta or _read_meta(model)
+        if meta is None:
+            return {}
+        mapped = _mapped.get(label)
+        if mapped and mapped[0] == meta["generation"]:
+            return mapped[1]
+        directory = _table_dir(model) / meta["generation"]
+        try:
+            arrays = {
+                name: np.load(directory / f"{name}.npy", mmap_mode="r")
+                for name in ("id", *COLUMNAR_TABLES[model][1])
+            }
+        except FileNotFoundError:
+            meta = None  # replaced by a concurrent refresh: read meta.json again
+            continue
+        _mapped[label] = (meta["generation"], arrays)
+        return arrays
+    raise FileNotFoundError(f"The {label} column snapshot keeps changing under this reader.")
+
+
+def snapshot_generations(models=None):
+    """
+    The current snapshot generation of each of ``models`` (default: every
+    table), None for one never built. A refresh that writes anything changes
+    it, so it keys results computed from the snapshot.
+    """
+    return [(meta or {}).get("generation") for meta in map(_read_meta, models or COLUMNAR_TABLES)]
+
+
+# --- Vectorised helpers over the columns ---
+
+def month_of(days):
+    """Month numbers (months since 1970-01) of a date column."""
+    return np.asarray(days).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def group_sum(keys, values, size):
+    """Sum of ``values`` per key in 0..size-1 (keys outside are not allowed), as int64."""
+    # bincount sums in float64: exact for totals below 2**53 pence.
+    return np.rint(np.bincount(keys, weights=values, minlength=size)[:size]).astype(np.int64)
+
+
+def group_count(keys, size):
+    """Number of rows per key in 0..size-1."""
+    return np.bincount(keys, minlength=size)[:size]
+
+
+def rolling_sum(values, window):
+    """Sum of each value and the ``window`` - 1 before it (fewer at the start)."""
+    totals = np.cumsum(values, dtype=np.int64)
+    totals[window:] -= totals[:-window].copy()
+    return totals
+
+
+def percentiles(values, qs):
+    """
+    The ``qs`` percentiles of ``values`` by rank (the value at index
+    (n - 1) * q // 100 of the sorted values, never an interpolation), as
+    int64; zeros when there are no values.
+    """
+    values = np.sort(np.asarray(values))
+    if not len(values):
+        return np.zeros(len(qs), dtype=np.int64)
+    return values[(len(values) - 1) * np.asarray(qs, dtype=np.int64) // 100].astype(np.int64)
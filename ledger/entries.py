@@ -0,0 +1,179 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .archive import archived_rows
+from .models import LedgerEntry
+
+Source = LedgerEntry.Source
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+ENTRY_BATCH_SIZE = 1000
+SHIFT_CHUNK_SIZE = 250  # date ranges per balance-shifting UPDATE
+LEDGER_LOCK = 0x4C454447  # PostgreSQL advisory lock serialising appends
+
+
+def signed_amount(source, key, amount):
+    """A rollup row's (source, key, amount) as cash: pay-ins positive, everything else paid out."""
+    return amount if source == Source.PAYMENT and key == "IN" else -amount
+
+
+_local = threading.local()
+
+
+def append(rows):
+    """
+    Add ``(source, object_id, date, signed amount)`` rows to the ledger.
+
+    New entries go after every existing entry of their date, take their
+    running balance from the last entry before them, and the entries dated
+    later are shifted by the new amounts in a few set-based UPDATEs; a
+    batch costs the same handful of queries whatever its size. Inside
+    ``deferred_entries()`` the rows are only collected, and written on exit.
+    """
+    # Rounded as the amount column stores it, so balances add up exactly
+    rows = [(source, pk, day, amount.quantize(CENT)) for source, pk, day, amount in rows if amount]
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        pending.extend(rows)
+        return
+    if not rows:
+        return
+
+    rows.sort(key=lambda row: row[2])  # stable: same-day rows keep their order
+    days = []  # [(day, cumulative new amount up to and including that day)]
+    total = ZERO
+    for day, group in groupby(rows, key=lambda row: row[2]):
+        total += sum(row[3] for row in group)
+        days.append((day, total))
+
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [LEDGER_LOCK])
+
+        # Closing balance of every day in the batch's range before this
+        # batch, starting from the last entry before the first day.
+        first, last = days[0][0], days[-1][0]
+        before = LedgerEntry.objects.filter(date__lt=first).order_by("-date", "-id").values_list("balance", flat=True)
+        closing = _money(before.first())
+        last_ids = LedgerEntry.objects.filter(date__range=(first, last)).values("date").annotate(last=Max("id"))
+        closings = sorted(
+            LedgerEntry.objects.filter(id__in=last_ids.values("last")).values_list("date", "balance")
+        )
+
+        _shift_later(days)
+
+        entries = []
+        carried = ZERO  # new amounts on earlier batch days
+        seen = 0
+        for day, group in groupby(rows, key=lambda row: row[2]):
+            # The existing balance as of ``day``: the last closing on or before it
+            while seen < len(closings) and closings[seen][0] <= day:
+                closing = _money(closings[seen][1])
+                seen += 1
+            balance = closing + carried
+            for source, object_id, _, amount in group:
+                balance += amount
+                entries.append(LedgerEntry(
+                    date=day, source=source, object_id=object_id, amount=amount, balance=balance,
+                ))
+            carried = balance - closing
+        LedgerEntry.objects.bulk_create(entries, batch_size=ENTRY_BATCH_SIZE)
+
+
+def _shift_later(days):
+    """
+    Add the new amounts to the existing entries that now come after them:
+    an entry dated after batch day k (and up to day k+1) gains the batch
+    total up to day k. One ``CASE`` UPDATE per SHIFT_CHUNK_SIZE days; nothing
+    to do when the batch is dated on or after the last entry, as it usually is.
+    """
+    quote = connection.ops.quote_name
+    table = quote(LedgerEntry._meta.db_table)
+    date_col = quote("date")
+    balance_col = quote("balance")
+    adapt = connection.ops.adapt_datefield_value
+    with connection.cursor() as cursor:
+        for start in range(0, len(days), SHIFT_CHUNK_SIZE):
+            chunk = days[start:start + SHIFT_CHUNK_SIZE]
+            after = days[start + len(chunk)][0] if start + len(chunk) < len(days) else None
+            whens, params = [], []
+            for day, total in reversed(chunk):
+                whens.append(f"WHEN {date_col} > %s THEN %s")
+                params += [adapt(day), total]
+            where = f"{date_col} > %s"
+            params.append(adapt(chunk[0][0]))
+            if after is not None:
+                where += f" AND {date_col} <= %s"
+                params.append(adapt(after))
+            cursor.execute(
+                f"UPDATE {table} SET {balance_col} = {balance_col} + CASE {' '.join(whens)} ELSE 0 END WHERE {where}",
+                params,
+            )
+
+
+@contextmanager
+def deferred_entries():
+    """Collect every append() made inside the block and write them as one batch on exit."""
+    if getattr(_local, "pending", None) is not None:
+        yield  # already deferring
+        return
+    _local.pending = pending = []
+    try:
+        yield
+    finally:
+        _local.pending = None
+    append(pending)
+
+
+def _money(value):
+    # SQLite hands the balance back as a float
+    return Decimal(str(value)).quantize(CENT) if value is not None else ZERO
+
+
+def balance_as_of(day):
+    """Cash balance at the end of ``day``: one indexed lookup of the last entry on or before it."""
+    last = LedgerEntry.objects.filter(date__lte=day).order_by("-date", "-id").values_list("balance", flat=True)
+    return _money(last.first())
+
+
+def net_flow(start, end):
+    """Money in minus money out from ``start`` to ``end`` inclusive (two indexed lookups)."""
+    return balance_as_of(end) - balance_as_of(start - timedelta(days=1))
+
+
+def rebuild(models_by_source, batch_size=ENTRY_BATCH_SIZE):
+    """
+    Recompute the ledger from the source tables (and their archived rows):
+    one entry per row in (date, source, id) order. ``models_by_source`` is
+    [(source, model, key field or None)]. Returns the number of entries written.
+    """
+    rows = []
+    for source, model, key_field in models_by_source:
+        fields = ["pk", "date", "amount"] + ([key_field] if key_field else [])
+        for values in model.objects.order_by().values_list(*fields).iterator(chunk_size=5000):
+            pk, day, amount = values[:3]
+            key = values[3] if key_field else ""
+            rows.append((day, source, pk, signed_amount(source, key, _money(amount))))
+        for obj in archived_rows(model):
+            key = getattr(obj, key_field) if key_field else ""
+            rows.append((obj.date, source, obj.pk, signed_amount(source, key, _money(obj.amount))))
+    rows.sort()
+
+    with transaction.atomic():
+        LedgerEntry.objects.all().delete()
+        balance = ZERO
+        for start in range(0, len(rows), batch_size):
+            entries = []
+            for day, source, pk, amount in rows[start:start + batch_size]:
+                balance += amount
+                entries.append(LedgerEntry(date=day, source=source, object_id=pk, amount=amount, balance=balance))
+            LedgerEntry.objects.bulk_create(entries)
+    return len(rows)
@@ -0,0 +1,24 @@
+from .periods import PeriodClosedError, check_open, closed_through
+
+
+class OpenPeriodFormMixin:
+    """
+    ModelForm mixin for dated movements: a date in a closed period is an
+    error on the date field, and a row already dated in one cannot be edited.
+    """
+
+    def clean(self):
+        cleaned = super().clean()
+        closed = closed_through()
+        if closed is None:
+            return cleaned
+        try:
+            check_open(cleaned.get("date"), closed, "A record")
+        except PeriodClosedError as exc:
+            self.add_error("date", str(exc))
+        if self.instance.pk is not None:
+            try:
+                check_open(self.instance.date, closed, "This record")
+            except PeriodClosedError as exc:
+                self.add_error(None, str(exc))
+        return cleaned
@@ -0,0 +1,42 @@
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+MAX_REPORTED_ERRORS = 1000  # later errors are counted, not kept
+
+
+def parse_money(raw, field, label="amount"):
+    """
+    ``raw`` ("£1,234.5", "12") as a Decimal rounded to ``field``'s decimal
+    places. Raises ValueError when it is not a number or does not fit the field.
+    """
+    text = (raw or "").replace("£", "").replace(",", "").strip()
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"invalid {label} {raw!r}") from None
+    if not value.is_finite() or abs(value) >= Decimal(10) ** (field.max_digits - field.decimal_places):
+        raise ValueError(f"invalid {label} {raw!r}")
+    return value.quantize(Decimal(1).scaleb(-field.decimal_places))
+
+
+def parse_day(value):
+    """A YYYY-MM-DD string as a date; raises ValueError."""
+    # fromisoformat is several times faster than strptime for the usual
+    # YYYY-MM-DD; strptime keeps accepting the unpadded "2025-1-5" form.
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return date.fromisoformat(value)
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []  # (line number, message), first MAX_REPORTED_ERRORS only
+        self.error_count = 0
+        self.rolled_back = False
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
@@ -0,0 +1,37 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ledger.archive import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move expenses, payments and work records dated before a month start (inside a "
+        "closed period) into gzipped JSON-lines files, one per table and month."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", required=True, help="YYYY-MM-01: archive everything dated before it.")
+
+    def handle(self, *args, **options):
+        try:
+            before = datetime.strptime(options["before"], "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"Invalid date: {options['before']} (expected YYYY-MM-DD)")
+
+        started = time.perf_counter()
+        try:
+            archived = archive(before)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        for label, month, rows in archived:
+            self.stdout.write(f"- {label} {month:%Y-%m}: {rows} row(s)")
+        total = sum(rows for _, _, rows in archived)
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {total} row(s) in {len(archived)} partition(s) in {elapsed:.1f}s "
+            f"({total / elapsed if elapsed else 0:,.0f} rows/s)."
+        ))
@@ -0,0 +1,97 @@
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ledger.pagination import KeysetPaginator
+from payments.models import Payment
+
+SEED_BATCH_SIZE = 10000
+ROWS_PER_DAY = 300  # synthetic payments share a date, so the id tie-break is exercised
+
+
+class _RollBack(Exception):
+    """Leaves the seeded rows behind the transaction that is thrown away."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Time payment-list pages at increasing depths with the keyset paginator and with OFFSET, "
+        "over --rows synthetic payments added inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic payments to add (default 1,000,000).")
+        parser.add_argument(
+            "--pages", default="1,10,100,1000,10000",
+            help="Comma-separated page numbers to time (default 1,10,100,1000,10000).",
+        )
+        parser.add_argument("--per-page", type=int, default=50)
+        parser.add_argument("--runs", type=int, default=5, help="Timings per page; the median is shown.")
+
+    def handle(self, *args, **options):
+        try:
+            pages = sorted({int(page) for page in options["pages"].split(",")})
+        except ValueError:
+            raise CommandError("--pages must be comma-separated page numbers.")
+        if not pages or pages[0] < 1 or options["rows"] < 0 or options["per_page"] < 1 or options["runs"] < 1:
+            raise CommandError("--rows, --pages, --per-page and --runs must be positive.")
+
+        try:
+            with transaction.atomic():
+                self.seed(options["rows"])
+                self.report(pages, options["per_page"], options["runs"])
+                raise _RollBack
+        except _RollBack:
+            pass
+
+    def seed(self, rows):
+        """Bulk-insert ``rows`` payments, bypassing the ledger signals (they are rolled back anyway)."""
+        started = time.perf_counter()
+        today = timezone.now().date()
+        for start in range(0, rows, SEED_BATCH_SIZE):
+            Payment._base_manager.bulk_create(
+                Payment(
+                    date=today - timedelta(days=i // ROWS_PER_DAY),
+                    description=f"benchmark {i}",
+                    amount=Decimal(i % 10000) / 100,
+                    type="IN" if i % 2 else "OUT",
+                )
+                for i in range(start, min(start + SEED_BATCH_SIZE, rows))
+            )
+        total = Payment.objects.count()
+        self.stdout.write(f"Seeded {rows:,} payment(s) in {time.perf_counter() - started:.1f}s; {total:,} in the table.")
+
+    def report(self, pages, per_page, runs):
+        qs = Payment.objects.all()
+        ordered = qs.order_by("-date", "-id")
+        paginator = KeysetPaginator(qs, per_page)
+        total = qs.count()
+
+        def median_ms(call):
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                call()
+                timings.append(time.perf_counter() - started)
+            return statistics.median(timings) * 1000
+
+        self.stdout.write(f"{'page':>8} {'keyset ms':>10} {'offset ms':>10}")
+        for page in pages:
+            offset = (page - 1) * per_page
+            if offset >= total:
+                self.stdout.write(f"{page:>8} {'(past the last row)':>21}")
+                continue
+            cursor = None
+            if offset:
+                date, pk = ordered.values_list("date", "id")[offset - 1]
+                cursor = paginator.encode_cursor(SimpleNamespace(date=date, id=pk))
+            keyset = median_ms(lambda: list(paginator.page(cursor)))
+            by_offset = median_ms(lambda: list(ordered[offset:offset + per_page]))
+            self.stdout.write(f"{page:>8} {keyset:>10.2f} {by_offset:>10.2f}")
+        self.stdout.write(self.style.SUCCESS(f"{per_page} rows per page over {total:,} payments; nothing was kept."))
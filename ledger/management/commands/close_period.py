@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ledger.periods import close_period, period_end
+
+
+class Command(BaseCommand):
+    help = (
+        "Close a month or year: freeze the cumulative ledger totals and cash balance "
+        "at its last day and make everything dated up to it read-only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "period", nargs="?",
+            help="YYYY-MM or YYYY (default: the last complete month).",
+        )
+
+    def handle(self, *args, **options):
+        if options["period"]:
+            try:
+                end = period_end(options["period"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        else:
+            end = timezone.now().date().replace(day=1) - timedelta(days=1)
+
+        started = time.perf_counter()
+        try:
+            snapshot = close_period(end)
+        except ValueError as exc:  # already closed, or not over yet
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Closed through {snapshot.period_end}: {snapshot.totals.count()} ledger totals, "
+            f"cash balance {snapshot.cash_balance} "
+            f"({elapsed:.2f}s)."
+        ))
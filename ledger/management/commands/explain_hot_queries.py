@@ -0,0 +1,129 @@
+import re
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.http import Http404
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from dashboard.views import HomeView
+from employees import views as employee_views
+from employees.models import ContractualEmployee, FixedEmployee
+from expenses.views import expense_list
+from ledger.pagination import KeysetPaginator
+from payments.models import Payment
+from payments.views import PaymentList
+
+# Tables the views read in full on purpose (the employee rosters).
+WHOLE_TABLE_READS = {
+    ContractualEmployee._meta.db_table,
+    FixedEmployee._meta.db_table,
+}
+
+SQLITE_SCAN = re.compile(r"\bSCAN (\w+)(.*)")
+POSTGRES_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the list/report/dashboard views, EXPLAIN every SELECT they issue and "
+        "fail if any falls back to a full table scan (SQLite and PostgreSQL)."
+    )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"Unsupported database backend: {vendor}")
+
+        tables = set(connection.introspection.table_names())
+        failures = []
+        for name, call in self.hot_views():
+            statements = self.capture(call)
+            if statements is None:
+                self.stdout.write(f"- {name}: skipped (no data to look up)")
+                continue
+            for sql, params in statements:
+                scans = self.full_scans(vendor, sql, params, tables)
+                status = "FULL SCAN on " + ", ".join(scans) if scans else "ok"
+                self.stdout.write(f"- {name}: {status}\n    {sql[:160]}")
+                if scans:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot query(ies) use a full table scan: {', '.join(sorted(set(failures)))}")
+        self.stdout.write(self.style.SUCCESS("Every hot query is served by an index."))
+
+    def hot_views(self):
+        """(name, callable) pairs that render each view the way a browser would hit it."""
+        rf = RequestFactory()
+        user = User(username="explain", is_staff=True)
+        today = timezone.now().date()
+        start, end = (today - timedelta(days=90)).isoformat(), today.isoformat()
+        cursor = KeysetPaginator(Payment.objects.all(), 50).encode_cursor(
+            SimpleNamespace(date=today - timedelta(days=30), id=2**31)
+        )
+        employee = ContractualEmployee.objects.order_by("pk").values_list("pk", flat=True).first()
+        fixed = FixedEmployee.objects.order_by("pk").values_list("pk", flat=True).first()
+
+        def get(view, path, **kwargs):
+            def call():
+                request = rf.get(path)
+                request.user = user
+                response = view(request, **kwargs)
+                if hasattr(response, "render"):
+                    response.render()
+            return call
+
+        return [
+            ("dashboard", get(HomeView.as_view(), f"/?start_date={start}&end_date={end}")),
+            ("payments", get(PaymentList.as_view(), f"/payments/?start={start}&end={end}")),
+            ("payments tab", get(PaymentList.as_view(), f"/payments/?tab=out&start={start}&end={end}")),
+            ("payments cursor", get(PaymentList.as_view(), f"/payments/?cursor={cursor}")),
+            ("expenses", get(expense_list, f"/expenses/?start_date={start}&end_date={end}")),
+            ("expenses tab", get(expense_list, f"/expenses/?tab=material&start_date={start}&end_date={end}")),
+            ("expenses cursor", get(expense_list, f"/expenses/?cursor={cursor}&start_date={start}&end_date={end}")),
+            ("employee report", get(employee_views.employee_report, f"/?start_date={start}&end_date={end}", pk=employee)),
+            ("employee report (all)", get(employee_views.employee_report, "/", pk=employee)),
+            ("employee report (monthly)", get(employee_views.employee_report, "/?period=month", pk=employee)),
+            ("fixed report", get(employee_views.fixed_employee_report, f"/?start_date={start}&end_date={end}", pk=fixed)),
+            ("fixed report (weekly)", get(employee_views.fixed_employee_report, "/?period=week", pk=fixed)),
+            ("fixed payslip", get(employee_views.fixed_employee_payslip, f"/?start_date={start}&end_date={end}", pk=fixed)),
+        ]
+
+    def capture(self, call):
+        """Every SELECT the call runs, with the dashboard cache switched off."""
+        statements = []
+
+        def wrapper(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith("SELECT"):
+                statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        dummy_cache = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        try:
+            with override_settings(CACHES=dummy_cache), connection.execute_wrapper(wrapper):
+                call()
+        except Http404:
+            return None
+        return statements
+
+    def full_scans(self, vendor, sql, params, tables):
+        """Names of the tables the plan reads in full (minus intentional whole-table reads)."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            if vendor == "sqlite":
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+                details = [row[-1] for row in cursor.fetchall()]
+                scanned = [
+                    m.group(1) for m in map(SQLITE_SCAN.search, details)
+                    if m and "USING" not in m.group(2)
+                ]
+            else:
+                # Tiny dev tables always get a seq scan; ask whether an index *can* serve it.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("EXPLAIN " + sql, params)
+                scanned = [m.group(1) for m in map(POSTGRES_SEQ_SCAN.search, (r[0] for r in cursor.fetchall())) if m]
+        return sorted({t for t in scanned if t in tables and t not in WHOLE_TABLE_READS})
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ledger.entries import ENTRY_BATCH_SIZE, rebuild
+from ledger.rollups import ROLLUP_SOURCES
+
+
+class Command(BaseCommand):
+    help = "Rebuild the LedgerEntry cash book (and its running balances) from the payment, expense and salary tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=ENTRY_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        sources = [(source, model, key_field) for model, (source, key_field) in ROLLUP_SOURCES.items()]
+        written = rebuild(sources, batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} ledger entries in {elapsed:.1f}s."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ledger.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute DailyLedgerRollup from the Payment, Expense and salary tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} rollup row(s)."))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyLedgerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('source', models.CharField(choices=[('PAYMENT', 'Payment'), ('EXPENSE', 'Expense'), ('SALARY', 'Contractual salary'), ('FIXED_SALARY', 'Fixed salary')], max_length=20)),
+                ('key', models.CharField(blank=True, default='', max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date', 'source', 'key'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'source', 'key'), name='ledger_rollup_unique_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+# (app label, model, rollup source, key field)
+SOURCES = [
+    ("payments", "Payment", "PAYMENT", "type"),
+    ("expenses", "Expense", "EXPENSE", "category"),
+    ("employees", "SalaryPayment", "SALARY", None),
+    ("employees", "FixedSalaryPayment", "FIXED_SALARY", None),
+]
+
+
+def backfill(apps, schema_editor):
+    Rollup = apps.get_model("ledger", "DailyLedgerRollup")
+    Rollup.objects.all().delete()
+    for app_label, model_name, source, key_field in SOURCES:
+        model = apps.get_model(app_label, model_name)
+        group_by = ["date", key_field] if key_field else ["date"]
+        grouped = model.objects.order_by().values(*group_by).annotate(total=Sum("amount"), count=Count("id"))
+        Rollup.objects.bulk_create(
+            [
+                Rollup(
+                    date=g["date"],
+                    source=source,
+                    key=g[key_field] if key_field else "",
+                    total=g["total"] or 0,
+                    count=g["count"],
+                )
+                for g in grouped
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ledger", "0001_initial"),
+        ("payments", "0001_initial"),
+        ("expenses", "0002_alter_expense_category"),
+        ("employees", "0019_fixedworkrecord"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
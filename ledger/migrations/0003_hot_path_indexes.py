@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0002_backfill_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyledgerrollup',
+            index=models.Index(fields=['source', 'date'], name='ledger_rollup_source_date_idx'),
+        ),
+    ]
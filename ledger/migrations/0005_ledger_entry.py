@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:04
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# (app label, model, source, key field); pay-ins are the only money coming in
+SOURCES = [
+    ("payments", "Payment", "PAYMENT", "type"),
+    ("expenses", "Expense", "EXPENSE", "category"),
+    ("employees", "SalaryPayment", "SALARY", None),
+    ("employees", "FixedSalaryPayment", "FIXED_SALARY", None),
+]
+
+
+def backfill(apps, schema_editor):
+    LedgerEntry = apps.get_model("ledger", "LedgerEntry")
+    rows = []
+    for app_label, model_name, source, key_field in SOURCES:
+        model = apps.get_model(app_label, model_name)
+        fields = ["pk", "date", "amount"] + ([key_field] if key_field else [])
+        for values in model.objects.order_by().values_list(*fields).iterator(chunk_size=5000):
+            amount = Decimal(str(values[2])).quantize(Decimal("0.01"))
+            if not (source == "PAYMENT" and values[3] == "IN"):
+                amount = -amount
+            rows.append((values[1], source, values[0], amount))
+    rows.sort()
+
+    balance = Decimal("0.00")
+    for start in range(0, len(rows), 1000):
+        entries = []
+        for day, source, pk, amount in rows[start:start + 1000]:
+            balance += amount
+            entries.append(LedgerEntry(date=day, source=source, object_id=pk, amount=amount, balance=balance))
+        LedgerEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0004_dataversion'),
+        ('payments', '0002_hot_path_indexes'),
+        ('expenses', '0003_hot_path_indexes'),
+        ('employees', '0023_typeahead_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('source', models.CharField(choices=[('PAYMENT', 'Payment'), ('EXPENSE', 'Expense'), ('SALARY', 'Contractual salary'), ('FIXED_SALARY', 'Fixed salary')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'ledger entries',
+                'ordering': ['date', 'id'],
+                'indexes': [models.Index(fields=['date', 'id'], name='ledger_entry_date_id_idx'), models.Index(fields=['source', 'object_id'], name='ledger_entry_source_obj_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0005_ledger_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeriodSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_end', models.DateField(unique=True)),
+                ('cash_balance', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('closed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-period_end'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PeriodBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('contractual', 'Contractual'), ('fixed', 'Fixed')], max_length=12)),
+                ('employee_id', models.PositiveBigIntegerField()),
+                ('earned_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('advance_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='ledger.periodsnapshot')),
+            ],
+            options={
+                'ordering': ['snapshot', 'kind', 'employee_id'],
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'kind', 'employee_id'), name='ledger_period_balance_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PeriodTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('PAYMENT', 'Payment'), ('EXPENSE', 'Expense'), ('SALARY', 'Contractual salary'), ('FIXED_SALARY', 'Fixed salary')], max_length=20)),
+                ('key', models.CharField(blank=True, default='', max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='totals', to='ledger.periodsnapshot')),
+            ],
+            options={
+                'ordering': ['snapshot', 'source', 'key'],
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'source', 'key'), name='ledger_period_total_unique')],
+            },
+        ),
+    ]
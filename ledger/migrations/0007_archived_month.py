@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0006_period_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100)),
+                ('month', models.DateField()),
+                ('key', models.CharField(blank=True, default='', max_length=20)),
+                ('employee_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['label', 'month', 'key', 'employee_id'],
+                'indexes': [models.Index(fields=['label', 'month'], name='ledger_archived_label_idx'), models.Index(fields=['employee_id', 'label'], name='ledger_archived_employee_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0007_archived_month'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='PeriodBalance',
+        ),
+    ]
@@ -0,0 +1,147 @@
+from django.db import models
+
+
+class DailyLedgerRollup(models.Model):
+    """
+    One row per (date, source, key) holding the sum and row count of that
+    day's money movements. ``key`` is the Payment type or Expense category;
+    salary sources use an empty key.
+    """
+
+    class Source(models.TextChoices):
+        PAYMENT = "PAYMENT", "Payment"
+        EXPENSE = "EXPENSE", "Expense"
+        SALARY = "SALARY", "Contractual salary"
+        FIXED_SALARY = "FIXED_SALARY", "Fixed salary"
+
+    date = models.DateField()
+    source = models.CharField(max_length=20, choices=Source.choices)
+    key = models.CharField(max_length=20, blank=True, default="")
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-date", "source", "key"]
+        constraints = [
+            models.UniqueConstraint(fields=["date", "source", "key"], name="ledger_rollup_unique_day"),
+        ]
+        indexes = [
+            # Per-source range reads and lifetime per-source totals
+            models.Index(fields=["source", "date"], name="ledger_rollup_source_date_idx"),
+        ]
+
+    def __str__(self):
+        label = self.get_source_display()
+        if self.key:
+            label = f"{label} · {self.key}"
+        return f"{label}: {self.total} ({self.count}) on {self.date}"
+
+
+class DataVersion(models.Model):
+    """
+    Write counter per model, bumped after every committed save/delete/bulk
+    insert. Unlike the cache generations it lives in the database, so every
+    process (web workers, the report worker) sees the same value.
+    """
+
+    label = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
+
+
+class LedgerEntry(models.Model):
+    """
+    Append-only cash book: one row per money movement in the rollup sources,
+    signed (+ in, - out), with ``balance`` = the running total of every entry
+    up to and including this one in (date, id) order. Edits and deletes of a
+    source row append a reversing entry instead of rewriting history.
+    """
+
+    Source = DailyLedgerRollup.Source
+
+    date = models.DateField()
+    source = models.CharField(max_length=20, choices=Source.choices)
+    object_id = models.PositiveBigIntegerField()  # pk of the source row
+    amount = models.DecimalField(max_digits=14, decimal_places=2)
+    balance = models.DecimalField(max_digits=16, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["date", "id"]
+        verbose_name_plural = "ledger entries"
+        indexes = [
+            # Balance as of a date: the last entry at or before it
+            models.Index(fields=["date", "id"], name="ledger_entry_date_id_idx"),
+            models.Index(fields=["source", "object_id"], name="ledger_entry_source_obj_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_display()} #{self.object_id}: {self.amount} on {self.date} (balance {self.balance})"
+
+
+class PeriodSnapshot(models.Model):
+    """
+    A closed period. Every money movement and employee record dated on or
+    before ``period_end`` is frozen (see ledger.periods); its cumulative
+    totals are stored in ``totals`` so lifetime figures are this snapshot
+    plus what was written after it.
+    """
+
+    period_end = models.DateField(unique=True)
+    cash_balance = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    closed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-period_end"]
+
+    def __str__(self):
+        return f"Closed through {self.period_end}"
+
+
+class PeriodTotal(models.Model):
+    """Cumulative (source, key) total and row count as of a period close."""
+
+    Source = DailyLedgerRollup.Source
+
+    snapshot = models.ForeignKey(PeriodSnapshot, on_delete=models.CASCADE, related_name="totals")
+    source = models.CharField(max_length=20, choices=Source.choices)
+    key = models.CharField(max_length=20, blank=True, default="")
+    total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["snapshot", "source", "key"]
+        constraints = [
+            models.UniqueConstraint(fields=["snapshot", "source", "key"], name="ledger_period_total_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_source_display()} {self.key}: {self.total} ({self.count}) through {self.snapshot.period_end}"
+
+
+class ArchivedMonth(models.Model):
+    """
+    One month of rows moved out of a table by archive_ledger, summed per
+    key: the Payment type, Expense category or WorkRecord employee. The
+    rows themselves live in that month's partition file (ledger.archive).
+    """
+
+    label = models.CharField(max_length=100)  # model label, e.g. "payments.payment"
+    month = models.DateField()  # first day of the month
+    key = models.CharField(max_length=20, blank=True, default="")
+    employee_id = models.PositiveBigIntegerField(null=True, blank=True)
+    total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    count = models.PositiveBigIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["label", "month", "key", "employee_id"]
+        indexes = [
+            models.Index(fields=["label", "month"], name="ledger_archived_label_idx"),
+            models.Index(fields=["employee_id", "label"], name="ledger_archived_employee_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.label} {self.month:%Y-%m} {self.key or self.employee_id}: {self.total} ({self.count})"
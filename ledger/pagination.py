@@ -0,0 +1,120 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator: the rows plus opaque prev/next cursors."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a unique ordering such as ("-date", "-id").
+
+    Each page is a ``WHERE (date, id) < (cursor)`` seek plus ``LIMIT``, so
+    page 1,000 costs the same as page 1 (given an index on the ordering),
+    unlike OFFSET paging. Cursors are opaque URL-safe strings; a bad or
+    stale cursor just falls back to the first page.
+    """
+
+    def __init__(self, queryset, per_page, ordering=("-date", "-id")):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [f.lstrip("-") for f in self.ordering]
+
+    # --- cursors ---
+    def encode_cursor(self, obj, backwards=False):
+        payload = {"v": [getattr(obj, f) for f in self.fields], "b": backwards}
+        raw = json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        """(values, backwards) or None when the cursor is missing or malformed."""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            opts = self.queryset.model._meta
+            values = [opts.get_field(f).to_python(v) for f, v in zip(self.fields, payload["v"], strict=True)]
+            return values, bool(payload.get("b"))
+        except (ValueError, TypeError, KeyError, ValidationError):
+            return None
+
+    # --- seeking ---
+    def _seek(self, values, backwards):
+        """
+        Rows strictly after ``values`` in the ordering (or before, going
+        backwards). The leading column is also bounded on its own: without
+        it the OR below gives the database no range to seek to, and it walks
+        the index from the top down to the cursor.
+        """
+        condition = Q()
+        equal = Q()
+        bound = None
+        for field, ordering, value in zip(self.fields, self.ordering, values):
+            descending = ordering.startswith("-") != backwards
+            step = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+            condition |= equal & step
+            if bound is None:
+                bound = Q(**{f"{field}__{'lte' if descending else 'gte'}": value})
+            equal &= Q(**{field: value})
+        return bound & condition
+
+    def _order(self, backwards):
+        if not backwards:
+            return self.ordering
+        return tuple(f[1:] if f.startswith("-") else f"-{f}" for f in self.ordering)
+
+    def page(self, cursor=None):
+        decoded = self.decode_cursor(cursor)
+        qs = self.queryset
+        backwards = False
+        if decoded is not None:
+            values, backwards = decoded
+            qs = qs.filter(self._seek(values, backwards))
+
+        rows = list(qs.order_by(*self._order(backwards))[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            # A stale cursor (its rows were deleted) restarts from the top.
+            return self.page() if decoded is not None else KeysetPage(rows, None, None)
+
+        if backwards:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, decoded is not None
+
+        return KeysetPage(
+            rows,
+            self.encode_cursor(rows[-1]) if has_next else None,
+            self.encode_cursor(rows[0], backwards=True) if has_previous else None,
+        )
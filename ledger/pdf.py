@@ -0,0 +1,97 @@
+import zlib
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Object ids fixed up front so pages can point at them before they are written.
+CATALOG_ID, PAGES_ID, FONT_ID, BOLD_FONT_ID = 1, 2, 3, 4
+FONTS = {"Helvetica": "F1", "Helvetica-Bold": "F2"}
+
+
+def _pdf_text(text):
+    """A PDF literal string for the standard fonts (WinAnsi, so £ survives)."""
+    raw = str(text).encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class PageCanvas:
+    """Text-only drawing calls for one page, mirroring the ReportLab canvas names."""
+
+    def __init__(self):
+        self.ops = []
+        self.font = ("Helvetica", 10)
+
+    def setFont(self, name, size):
+        self.font = (name, size)
+
+    def drawString(self, x, y, text):
+        name, size = self.font
+        self.ops.append(b"BT /%s %d Tf %.2f %.2f Td %s Tj ET" % (
+            FONTS[name].encode(), size, x, y, _pdf_text(text)))
+
+    def drawRightString(self, x, y, text):
+        name, size = self.font
+        self.drawString(x - stringWidth(str(text), name, size), y, text)
+
+    def fit(self, text, width):
+        """``text`` cut down (with an ellipsis) to fit ``width`` points in the current font."""
+        name, size = self.font
+        text = str(text)
+        if stringWidth(text, name, size) <= width:
+            return text
+        while text and stringWidth(text + "...", name, size) > width:
+            text = text[:-1]
+        return text + "..."
+
+
+class StreamingPDF:
+    """
+    Minimal PDF writer that appends each finished page straight to ``out``.
+
+    ReportLab's canvas keeps every page in memory until ``save()``; this
+    writer only remembers byte offsets, so memory stays flat however many
+    pages a report has. Text in Helvetica / Helvetica-Bold only.
+    """
+
+    def __init__(self, out, pagesize=A4):
+        self.out = out
+        self.width, self.height = pagesize
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = BOLD_FONT_ID + 1
+        self.out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_obj(FONT_ID, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        self._write_obj(BOLD_FONT_ID, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+    def _write_obj(self, obj_id, body):
+        self.offsets[obj_id] = self.out.tell()
+        self.out.write(b"%d 0 obj\n%s\nendobj\n" % (obj_id, body))
+
+    def _reserve(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def add_page(self, page):
+        """Compress a finished PageCanvas and write it out."""
+        stream = zlib.compress(b"\n".join(page.ops))
+        stream_id, page_id = self._reserve(), self._reserve()
+        self._write_obj(stream_id, b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+        self._write_obj(page_id, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>"
+        ) % (PAGES_ID, self.width, self.height, FONT_ID, BOLD_FONT_ID, stream_id))
+        self.page_ids.append(page_id)
+
+    def close(self):
+        """Write the page tree, catalog and cross-reference table."""
+        kids = b" ".join(b"%d 0 R" % i for i in self.page_ids)
+        self._write_obj(PAGES_ID, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids)))
+        self._write_obj(CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES_ID)
+
+        xref_at = self.out.tell()
+        size = self.next_id
+        self.out.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for obj_id in range(1, size):
+            self.out.write(b"%010d 00000 n \n" % self.offsets[obj_id])
+        self.out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, CATALOG_ID, xref_at))
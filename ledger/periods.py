@@ -0,0 +1,175 @@
+import calendar
+from datetime import date
+from decimal import Decimal
+from functools import wraps
+
+from django.contrib import messages
+from django.db import transaction
+from django.shortcuts import redirect
+from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.db.models import Subquery, Sum
+
+from employees.models import (
+    AdvancePayment,
+    FixedSalaryPayment,
+    FixedWorkRecord,
+    SalaryPayment,
+    WorkRecord,
+)
+from .entries import balance_as_of
+from .models import DailyLedgerRollup, PeriodSnapshot, PeriodTotal
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+# Employee movements, read-only once closed like the rolled-up ones. Their
+# lifetime totals need no snapshot: employees.signals keeps them on the
+# employee rows (see verify_balances), and closed rows no longer change.
+EMPLOYEE_RECORDS = (WorkRecord, SalaryPayment, AdvancePayment, FixedWorkRecord, FixedSalaryPayment)
+
+
+class PeriodClosedError(ValueError):
+    """A write to a movement dated on or before the last period close."""
+
+
+def closed_through():
+    """The last closed period's end date, or None (one indexed lookup)."""
+    return PeriodSnapshot.objects.order_by("-period_end").values_list("period_end", flat=True).first()
+
+
+def carried_totals(source=None):
+    """
+    (period_end, {(source, key): (total, count)}) of the last close, or
+    (None, {}) before the first one, in one query. Lifetime figures are
+    these plus the rollups dated after period_end. A close with no rows for
+    ``source`` also gives (None, {}): nothing was carried, so summing every
+    rollup is still right.
+    """
+    latest = PeriodSnapshot.objects.order_by("-period_end").values("pk")[:1]
+    rows = PeriodTotal.objects.filter(snapshot=Subquery(latest))
+    if source:
+        rows = rows.filter(source=source)
+    closed, totals = None, {}
+    for closed, s, k, t, c in rows.values_list("snapshot__period_end", "source", "key", "total", "count"):
+        totals[s, k] = (t, c)
+    return closed, totals
+
+
+def period_end(period):
+    """The last day of a "YYYY" or "YYYY-MM" period."""
+    try:
+        if len(period) == 4:
+            return date(int(period), 12, 31)
+        year, month = (int(part) for part in period.split("-"))
+        return date(year, month, calendar.monthrange(year, month)[1])
+    except ValueError:
+        raise ValueError(f"invalid period {period!r} (expected YYYY or YYYY-MM)") from None
+
+
+def _money(value):
+    # SQLite sums come back as floats
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def close_period(end):
+    """
+    Freeze everything dated on or before ``end``: store the cumulative
+    rollup totals and the cash balance as of that day, carried forward from
+    the previous close so only the rows dated since it are read. Returns the
+    new PeriodSnapshot.
+
+    Only days already over can be closed: ``end`` must be before today,
+    otherwise ValueError.
+    """
+    today = timezone.localdate()
+    if end >= today:
+        raise ValueError(f"Cannot close through {end}: only days before today ({today}) can be closed.")
+    with transaction.atomic():
+        previous = PeriodSnapshot.objects.select_for_update().order_by("-period_end").first()
+        if previous is not None and end <= previous.period_end:
+            raise PeriodClosedError(f"Already closed through {previous.period_end}.")
+
+        def since_previous(qs):
+            qs = qs.filter(date__lte=end)
+            return qs.filter(date__gt=previous.period_end) if previous is not None else qs
+
+        totals = {}
+        if previous is not None:
+            for row in previous.totals.all():
+                totals[row.source, row.key] = [row.total, row.count]
+
+        grouped = (
+            since_previous(DailyLedgerRollup.objects.order_by())
+            .values("source", "key")
+            .annotate(sum_total=Sum("total"), sum_count=Sum("count"))
+        )
+        for row in grouped:
+            carried = totals.setdefault((row["source"], row["key"]), [ZERO, 0])
+            carried[0] += _money(row["sum_total"])
+            carried[1] += row["sum_count"] or 0
+
+        snapshot = PeriodSnapshot.objects.create(period_end=end, cash_balance=balance_as_of(end))
+        PeriodTotal.objects.bulk_create([
+            PeriodTotal(snapshot=snapshot, source=source, key=key, total=total, count=count)
+            for (source, key), (total, count) in sorted(totals.items())
+        ])
+    return snapshot
+
+
+# --- Closed periods are read-only (connected in ledger.signals) ---
+
+def check_open(day, closed, what="A row"):
+    """Raise PeriodClosedError if ``day`` is on or before ``closed`` (a closed_through() date, or None)."""
+    if closed is not None and day is not None and day <= closed:
+        raise PeriodClosedError(f"{what} dated on or before {closed} belongs to a closed period.")
+
+
+def _refuse_closed(sender, closed, dates):
+    field = sender._meta.get_field("date")
+    for day in dates:
+        check_open(field.to_python(day), closed, sender._meta.verbose_name.capitalize())
+
+
+def refuse_closed_save(sender, instance, raw=False, **kwargs):
+    closed = None if raw else closed_through()
+    if closed is None:
+        return
+    dates = [instance.date]
+    if instance.pk is not None and not instance._state.adding:
+        # Moving a row out of a closed period is an edit of that period too.
+        dates += sender._base_manager.filter(pk=instance.pk).values_list("date", flat=True)
+    _refuse_closed(sender, closed, dates)
+
+
+def refuse_closed_delete(sender, instance, **kwargs):
+    closed = closed_through()
+    if closed is not None:
+        _refuse_closed(sender, closed, [instance.date])
+
+
+def refuse_closed_bulk_create(sender, objs, **kwargs):
+    closed = closed_through()
+    if closed is not None:
+        _refuse_closed(sender, closed, [obj.date for obj in objs])
+
+
+def redirect_on_closed_period(view):
+    """
+    View decorator: a write refused by the guards above becomes an error
+    message and a redirect back to the page the request came from (or the
+    same URL), instead of a server error. The view runs in one atomic
+    block, so nothing it wrote before the refusal is kept.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return view(request, *args, **kwargs)
+        except PeriodClosedError as exc:
+            messages.error(request, str(exc))
+            back = request.META.get("HTTP_REFERER", "")
+            if not url_has_allowed_host_and_scheme(back, {request.get_host()}, require_https=request.is_secure()):
+                back = request.get_full_path()
+            return redirect(back)
+    return wrapper
@@ -0,0 +1,185 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from expenses.models import Expense
+from payments.models import Payment
+from employees.models import SalaryPayment, FixedSalaryPayment
+from .archive import archived_rows
+from .bulk import bulk_increment
+from .entries import deferred_entries
+from .models import DailyLedgerRollup
+from .periods import carried_totals
+
+Source = DailyLedgerRollup.Source
+
+APPLY_CHUNK_SIZE = 250  # cells per rollup UPDATE in apply_rows
+
+# model -> (rollup source, field used as the rollup key or None)
+ROLLUP_SOURCES = {
+    Payment: (Source.PAYMENT, "type"),
+    Expense: (Source.EXPENSE, "category"),
+    SalaryPayment: (Source.SALARY, None),
+    FixedSalaryPayment: (Source.FIXED_SALARY, None),
+}
+
+
+def rollup_row(instance):
+    """(date, key, amount) for a source instance, normalised the way the DB stores it."""
+    _, key_field = ROLLUP_SOURCES[type(instance)]
+    opts = instance._meta
+    return (
+        opts.get_field("date").to_python(instance.date),
+        getattr(instance, key_field) if key_field else "",
+        Decimal(str(instance.amount or 0)),
+    )
+
+
+def bump(source, day, key, amount, count):
+    """Add ``amount``/``count`` to one rollup cell, creating it on first use."""
+    cell = DailyLedgerRollup.objects.filter(date=day, source=source, key=key)
+    if cell.update(total=F("total") + amount, count=F("count") + count):
+        return
+    try:
+        with transaction.atomic():
+            DailyLedgerRollup.objects.create(date=day, source=source, key=key, total=amount, count=count)
+    except IntegrityError:
+        # Someone else created the cell between our update and insert.
+        cell.update(total=F("total") + amount, count=F("count") + count)
+
+
+_local = threading.local()
+
+
+def _fold(cells, rows, sign):
+    for day, key, amount in rows:
+        cell = cells[(day, key)]
+        cell[0] += sign * amount
+        cell[1] += sign
+
+
+def apply_rows(source, rows, sign=1):
+    """
+    Fold many (date, key, amount) rows into the rollups. Inside
+    ``deferred_rollups()`` they are only collected, and written on exit.
+    """
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        _fold(pending[source], rows, sign)
+        return
+    cells = defaultdict(lambda: [Decimal("0"), 0])
+    _fold(cells, rows, sign)
+    _write_cells(source, cells)
+
+
+@contextmanager
+def deferred_rollups():
+    """
+    Collect every apply_rows() made inside the block and write the net change
+    once at the end, so a bulk import touches each rollup cell once instead of
+    once per batch. Ledger entries are deferred the same way. Use it inside
+    the transaction that does the writes.
+    """
+    if getattr(_local, "pending", None) is not None:
+        yield  # already deferring
+        return
+    _local.pending = pending = defaultdict(lambda: defaultdict(lambda: [Decimal("0"), 0]))
+    try:
+        with deferred_entries():
+            yield
+    finally:
+        _local.pending = None
+    for source, cells in pending.items():
+        _write_cells(source, cells)
+
+
+def _write_cells(source, cells):
+    """
+    Add {(date, key): [amount, count]} to the rollups. Missing cells are
+    inserted empty in one statement, then bumped together by bulk_increment,
+    so a large batch costs a few queries, not one per cell.
+    """
+    if not cells:
+        return
+
+    days = [day for day, _ in cells]
+    with transaction.atomic():
+        # ignore_conflicts: cells that exist (or that a concurrent writer just made) are left alone
+        DailyLedgerRollup.objects.bulk_create(
+            [DailyLedgerRollup(date=day, source=source, key=key) for day, key in cells],
+            ignore_conflicts=True,
+            batch_size=APPLY_CHUNK_SIZE,
+        )
+        ids = {
+            (day, key): pk
+            for pk, day, key in DailyLedgerRollup.objects.filter(
+                source=source, date__range=(min(days), max(days))
+            ).values_list("pk", "date", "key")
+            if (day, key) in cells
+        }
+
+        bulk_increment(
+            DailyLedgerRollup,
+            ["total", "count"],
+            [(ids[cell], amount, count) for cell, (amount, count) in cells.items()],
+            APPLY_CHUNK_SIZE,
+        )
+
+
+def rebuild(batch_size=1000):
+    """Recompute every rollup from the raw tables and their archived rows (backfill / repair)."""
+    created = 0
+    with transaction.atomic():
+        DailyLedgerRollup.objects.all().delete()
+        for model, (source, key_field) in ROLLUP_SOURCES.items():
+            group_by = ["date", key_field] if key_field else ["date"]
+            grouped = (
+                model.objects.order_by()
+                .values(*group_by)
+                .annotate(total=Sum("amount"), count=Count("id"))
+            )
+            cells = defaultdict(lambda: [Decimal("0"), 0])
+            for g in grouped:
+                cell = cells[g["date"], g[key_field] if key_field else ""]
+                cell[0] += g["total"] or 0
+                cell[1] += g["count"]
+            for obj in archived_rows(model):
+                cell = cells[obj.date, getattr(obj, key_field) if key_field else ""]
+                cell[0] += obj.amount
+                cell[1] += 1
+            rows = [
+                DailyLedgerRollup(date=day, source=source, key=key, total=total, count=count)
+                for (day, key), (total, count) in cells.items()
+            ]
+            DailyLedgerRollup.objects.bulk_create(rows, batch_size=batch_size)
+            created += len(rows)
+    return created
+
+
+def totals_by_key(source, start=None, end=None):
+    """
+    {key: (total, count)} for one source over an optional date window,
+    summed from the daily rollups in a single grouped query. A window open
+    at the start reads the last period close and only the days after it.
+    """
+    qs = DailyLedgerRollup.objects.filter(source=source)
+    carried = {}
+    if start:
+        qs = qs.filter(date__gte=start)
+    else:
+        closed, snapshot = carried_totals(source)
+        if closed is not None and (not end or end >= closed):
+            qs = qs.filter(date__gt=closed)
+            carried = {key: value for (_, key), value in snapshot.items()}
+    if end:
+        qs = qs.filter(date__lte=end)
+    grouped = qs.order_by().values("key").annotate(sum_total=Sum("total"), sum_count=Sum("count"))
+    totals = dict(carried)
+    for g in grouped:
+        total, count = totals.get(g["key"], (Decimal("0"), 0))
+        totals[g["key"]] = (total + (g["sum_total"] or Decimal("0")), count + (g["sum_count"] or 0))
+    return totals
@@ -0,0 +1,119 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from employees.models import (
+    AdvancePayment,
+    ContractualEmployee,
+    FixedEmployee,
+    FixedWorkRecord,
+    WorkRecord,
+)
+from .bulk import post_bulk_create, pre_bulk_create
+from .cache import bump_generation
+from .entries import append as append_entries, signed_amount
+from .periods import EMPLOYEE_RECORDS, refuse_closed_bulk_create, refuse_closed_delete, refuse_closed_save
+from .rollups import ROLLUP_SOURCES, apply_rows, bump, rollup_row
+from .versions import bump_data_version
+
+# Models whose writes invalidate cached dashboard/list results.
+CACHED_MODELS = [
+    *ROLLUP_SOURCES,
+    ContractualEmployee,
+    FixedEmployee,
+    WorkRecord,
+    AdvancePayment,
+    FixedWorkRecord,
+]
+
+# Models whose rows are frozen once their date is in a closed period.
+PERIOD_MODELS = list(dict.fromkeys([*ROLLUP_SOURCES, *EMPLOYEE_RECORDS]))
+
+
+def _previous_row(sender, instance):
+    """The (date, key, amount) currently stored for ``instance``, if it exists."""
+    _, key_field = ROLLUP_SOURCES[sender]
+    fields = ["date", key_field, "amount"] if key_field else ["date", "amount"]
+    row = sender._base_manager.filter(pk=instance.pk).values_list(*fields).first()
+    if row is None:
+        return None
+    if key_field:
+        return row
+    return row[0], "", row[1]
+
+
+def remember_rollup_row(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.pk is not None and not instance._state.adding:
+        instance._rollup_previous = _previous_row(sender, instance)
+    else:
+        instance._rollup_previous = None
+
+
+def update_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    source, _ = ROLLUP_SOURCES[sender]
+    previous = getattr(instance, "_rollup_previous", None)
+    row = rollup_row(instance)
+    day, key, amount = row
+    with transaction.atomic():
+        if previous is not None:
+            old_day, old_key, old_amount = previous
+            bump(source, old_day, old_key, -old_amount, -1)
+        bump(source, day, key, amount, 1)
+        if previous != row:
+            # The cash book is append-only: reverse the old entry, then add the new one.
+            entries = []
+            if previous is not None:
+                entries.append((source, instance.pk, old_day, -signed_amount(source, old_key, old_amount)))
+            entries.append((source, instance.pk, day, signed_amount(source, key, amount)))
+            append_entries(entries)
+    instance._rollup_previous = None
+
+
+def update_rollup_on_delete(sender, instance, **kwargs):
+    source, _ = ROLLUP_SOURCES[sender]
+    day, key, amount = rollup_row(instance)
+    bump(source, day, key, -amount, -1)
+    append_entries([(source, instance.pk, day, -signed_amount(source, key, amount))])
+
+
+def update_rollup_on_bulk_create(sender, objs, **kwargs):
+    source, _ = ROLLUP_SOURCES[sender]
+    rows = [rollup_row(obj) for obj in objs]
+    apply_rows(source, rows)
+    append_entries([
+        (source, obj.pk, day, signed_amount(source, key, amount))
+        for obj, (day, key, amount) in zip(objs, rows)
+    ])
+
+
+def invalidate_cached_results(sender, **kwargs):
+    # After commit, so a concurrent reader can't cache pre-commit totals under the new generation.
+    def bump():
+        bump_generation(sender)
+        bump_data_version(sender)
+
+    transaction.on_commit(bump)
+
+
+# Connected per source model so unrelated models keep Django's fast-delete path.
+for _model in ROLLUP_SOURCES:
+    _uid = f"ledger-rollup-{_model._meta.label_lower}"
+    pre_save.connect(remember_rollup_row, sender=_model, dispatch_uid=f"{_uid}-pre-save")
+    post_save.connect(update_rollup_on_save, sender=_model, dispatch_uid=f"{_uid}-save")
+    post_delete.connect(update_rollup_on_delete, sender=_model, dispatch_uid=f"{_uid}-delete")
+    post_bulk_create.connect(update_rollup_on_bulk_create, sender=_model, dispatch_uid=f"{_uid}-bulk")
+
+for _model in CACHED_MODELS:
+    _uid = f"ledger-cache-{_model._meta.label_lower}"
+    post_save.connect(invalidate_cached_results, sender=_model, dispatch_uid=f"{_uid}-save")
+    post_delete.connect(invalidate_cached_results, sender=_model, dispatch_uid=f"{_uid}-delete")
+    post_bulk_create.connect(invalidate_cached_results, sender=_model, dispatch_uid=f"{_uid}-bulk")
+
+for _model in PERIOD_MODELS:
+    _uid = f"ledger-period-{_model._meta.label_lower}"
+    pre_save.connect(refuse_closed_save, sender=_model, dispatch_uid=f"{_uid}-pre-save")
+    pre_delete.connect(refuse_closed_delete, sender=_model, dispatch_uid=f"{_uid}-pre-delete")
+    pre_bulk_create.connect(refuse_closed_bulk_create, sender=_model, dispatch_uid=f"{_uid}-pre-bulk")
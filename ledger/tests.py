@@ -0,0 +1,210 @@
+import tempfile
+from io import StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from expenses.models import Expense
+from payments.models import Payment
+from . import rollups
+from .archive import archive, archived_rows
+from .cache import cached_result
+from .entries import balance_as_of
+from .models import DailyLedgerRollup, LedgerEntry, PeriodSnapshot
+from .pagination import KeysetPaginator
+from .periods import close_period
+
+
+class ClosePeriodTests(TestCase):
+    def test_today_and_later_cannot_be_closed(self):
+        today = timezone.localdate()
+        for end in (today, today + timedelta(days=40)):
+            with self.assertRaisesMessage(ValueError, "only days before today"):
+                close_period(end)
+        with self.assertRaisesMessage(CommandError, "only days before today"):
+            call_command("close_period", str(today.year + 1))
+        self.assertFalse(PeriodSnapshot.objects.exists())
+
+    def test_closed_payment_writes_are_refused_without_a_server_error(self):
+        old = Payment.objects.create(date=date(2020, 1, 10), description="rent", amount=Decimal("50.00"), type="OUT")
+        close_period(date(2020, 1, 31))
+
+        response = self.client.post(reverse("payments:delete", args=[old.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Payment.objects.filter(pk=old.pk).exists())
+
+        response = self.client.post(reverse("payments:create"), {
+            "date": "2020-01-15", "description": "late", "amount": "5.00", "type": "IN",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context["form"], "date", "A record dated on or before 2020-01-31 belongs to a closed period.")
+        self.assertEqual(Payment.objects.count(), 1)
+
+
+class ClosedPeriodAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "x"))
+        self.old = Payment.objects.create(date=date(2020, 1, 10), description="rent", amount=Decimal("50.00"), type="OUT")
+        close_period(date(2020, 1, 31))
+
+    def messages(self, response):
+        return [str(m) for m in get_messages(response.wsgi_request)]
+
+    def test_edit_is_a_validation_error(self):
+        response = self.client.post(reverse("admin:payments_payment_change", args=[self.old.pk]), {
+            "date": "2020-02-10", "description": "rent", "amount": "50.00", "type": "OUT",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("This record dated on or before 2020-01-31", str(response.context["adminform"].form.non_field_errors()))
+        self.assertEqual(Payment.objects.get(pk=self.old.pk).date, date(2020, 1, 10))
+
+    def test_delete_page_reports_the_refusal(self):
+        response = self.client.post(reverse("admin:payments_payment_delete", args=[self.old.pk]), {"post": "yes"})
+        self.assertRedirects(response, reverse("admin:payments_payment_change", args=[self.old.pk]))
+        self.assertIn("Payment dated on or before 2020-01-31 belongs to a closed period.", self.messages(response))
+        self.assertTrue(Payment.objects.filter(pk=self.old.pk).exists())
+
+    def test_delete_selected_action_reports_the_refusal(self):
+        recent = Payment.objects.create(date=date(2020, 2, 3), description="sale", amount=Decimal("9.00"), type="IN")
+        response = self.client.post(reverse("admin:payments_payment_changelist"), {
+            "action": "delete_selected", "_selected_action": [self.old.pk, recent.pk], "post": "yes",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.messages(response), ["Payment dated on or before 2020-01-31 belongs to a closed period."])
+        self.assertEqual(Payment.objects.count(), 2)
+
+
+class KeysetPaginatorTests(TestCase):
+    def test_pages_cover_the_ordering_both_ways(self):
+        # Three rows per day, so the id tie-break decides every page boundary
+        Payment.objects.bulk_create(
+            Payment(date=date(2024, 1, 1) + timedelta(days=i // 3), description=str(i), amount=Decimal("1.00"))
+            for i in range(23)
+        )
+        expected = list(Payment.objects.order_by("-date", "-id").values_list("pk", flat=True))
+        paginator = KeysetPaginator(Payment.objects.all(), 5)
+
+        page = paginator.page()
+        pages = [[p.pk for p in page]]
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pages.append([p.pk for p in page])
+        self.assertEqual(sum(pages, []), expected)
+
+        backwards = []
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backwards.insert(0, [p.pk for p in page])
+        self.assertEqual(backwards, pages[:-1])
+
+
+class LedgerEntryTests(TestCase):
+    def assert_running_balances(self, expected):
+        """Every entry's balance is the sum of the amounts up to it, and each day closes at ``expected``."""
+        running = Decimal("0.00")
+        for amount, balance in LedgerEntry.objects.order_by("date", "id").values_list("amount", "balance"):
+            running += Decimal(str(amount))
+            self.assertEqual(Decimal(str(balance)).quantize(Decimal("0.01")), running)
+        self.assertEqual({day: balance_as_of(day) for day in expected}, expected)
+
+    def test_backdated_writes_shift_the_later_balances(self):
+        d1, d2, d3 = date(2024, 5, 1), date(2024, 5, 2), date(2024, 5, 3)
+        Payment.objects.create(date=d3, description="sale", amount=Decimal("100.00"), type="IN")
+        early = Payment.objects.create(date=d1, description="supplier", amount=Decimal("30.00"), type="OUT")
+        self.assert_running_balances({d1: Decimal("-30.00"), d2: Decimal("-30.00"), d3: Decimal("70.00")})
+
+        early.amount, early.date = Decimal("45.50"), d2
+        early.save()
+        self.assert_running_balances({d1: Decimal("0.00"), d2: Decimal("-45.50"), d3: Decimal("54.50")})
+
+        early.delete()
+        self.assert_running_balances({d1: Decimal("0.00"), d2: Decimal("0.00"), d3: Decimal("100.00")})
+
+
+class RollupConsistencyTests(TestCase):
+    def cells(self):
+        return {
+            (day, source, key): (Decimal(str(total)), count)
+            for day, source, key, total, count in DailyLedgerRollup.objects.exclude(count=0)
+            .values_list("date", "source", "key", "total", "count")
+        }
+
+    def test_incremental_rollups_match_a_rebuild(self):
+        day = date(2024, 6, 3)
+        payment = Payment.objects.create(date=day, description="sale", amount=Decimal("80.00"), type="IN")
+        Payment.objects.create(date=day, description="refund", amount=Decimal("5.00"), type="OUT")
+        expense = Expense.objects.create(date=day, category="MATERIAL", description="cloth", amount=Decimal("12.00"))
+        Expense.objects.bulk_create([
+            Expense(date=day + timedelta(days=1), category="RBG", description="power", amount=Decimal("40.00")),
+        ])
+
+        payment.type, payment.amount = "OUT", Decimal("81.25")
+        payment.save()
+        expense.date = day - timedelta(days=2)
+        expense.save()
+        Expense.objects.filter(category="RBG").get().delete()
+
+        incremental = self.cells()
+        rollups.rebuild()
+        self.assertEqual(incremental, self.cells())
+        self.assertEqual(incremental[day, "PAYMENT", "OUT"], (Decimal("86.25"), 2))
+
+
+class CachedResultTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_a_committed_write_invalidates_the_result(self):
+        def total():
+            return sum(Payment.objects.values_list("amount", flat=True))
+
+        Payment.objects.create(date=date(2024, 1, 5), description="sale", amount=Decimal("10.00"), type="IN")
+        self.assertEqual(cached_result("test:total", [Payment], (), total), Decimal("10.00"))
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Payment.objects.create(date=date(2024, 1, 6), description="sale", amount=Decimal("5.00"), type="IN")
+        # Not committed yet: the old generation still serves the cached value
+        self.assertEqual(cached_result("test:total", [Payment], (), total), Decimal("10.00"))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(cached_result("test:total", [Payment], (), total), Decimal("15.00"))
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        archive_settings = override_settings(LEDGER_ARCHIVE_DIR=directory.name)
+        archive_settings.enable()
+        self.addCleanup(archive_settings.disable)
+
+    def test_archived_rows_round_trip(self):
+        Payment.objects.bulk_create([
+            Payment(date=date(2020, 1, 5), description="sale", amount=Decimal("120.00"), type="IN"),
+            Payment(date=date(2020, 1, 20), description="rent", amount=Decimal("45.10"), type="OUT"),
+            Payment(date=date(2020, 2, 3), description="sale", amount=Decimal("7.00"), type="IN"),
+        ])
+        columns = ("id", "date", "type", "description", "amount")
+        before = list(Payment.objects.filter(date__lt=date(2020, 2, 1)).order_by("-date", "-id").values_list(*columns))
+        balance = balance_as_of(date(2020, 2, 3))
+        close_period(date(2020, 1, 31))
+
+        self.assertEqual(archive(date(2020, 2, 1)), [("payments.payment", date(2020, 1, 1), 2)])
+        self.assertEqual(list(Payment.objects.values_list("description", flat=True)), ["sale"])
+        self.assertEqual([tuple(getattr(obj, name) for name in columns) for obj in archived_rows(Payment)], before)
+        self.assertEqual([obj.amount for obj in archived_rows(Payment, type="OUT")], [Decimal("45.10")])
+        self.assertEqual(list(archived_rows(Payment, start=date(2020, 2, 1))), [])
+
+        # Rebuilds read the archive, so nothing the rollups or cash book counted is lost
+        self.assertEqual(balance_as_of(date(2020, 2, 3)), balance)
+        rollups.rebuild()
+        self.assertEqual(rollups.totals_by_key("PAYMENT")["OUT"], (Decimal("45.10"), 1))
+        call_command("rebuild_ledger_entries", stdout=StringIO())
+        self.assertEqual(balance_as_of(date(2020, 2, 3)), balance)
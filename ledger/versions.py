@@ -0,0 +1,24 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import DataVersion
+
+
+def bump_data_version(model):
+    """Record that ``model``'s table changed."""
+    label = model._meta.label_lower
+    row = DataVersion.objects.filter(label=label)
+    if row.update(version=F("version") + 1):
+        return
+    try:
+        with transaction.atomic():
+            DataVersion.objects.create(label=label, version=1)
+    except IntegrityError:
+        row.update(version=F("version") + 1)
+
+
+def data_versions(models):
+    """[version, ...] for ``models`` in one query; 0 for a model never written since tracking began."""
+    labels = [m._meta.label_lower for m in models]
+    found = dict(DataVersion.objects.filter(label__in=labels).values_list("label", "version"))
+    return [found.get(label, 0) for label in labels]
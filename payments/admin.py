@@ -1,3 +1,17 @@
+from django import forms
 from django.contrib import admin
+
+from ledger.admin import OpenPeriodAdminMixin
+from ledger.forms import OpenPeriodFormMixin
 from .models import Payment
-admin.site.register(Payment)
+
+
+class PaymentAdminForm(OpenPeriodFormMixin, forms.ModelForm):
+    class Meta:
+        model = Payment
+        fields = "__all__"
+
+
+@admin.register(Payment)
+class PaymentAdmin(OpenPeriodAdminMixin, admin.ModelAdmin):
+    form = PaymentAdminForm
@@ -1,6 +1,7 @@
 from django import forms
+from ledger.forms import OpenPeriodFormMixin
 from .models import Payment
-class PaymentForm(forms.ModelForm):
+class PaymentForm(OpenPeriodFormMixin, forms.ModelForm):
     class Meta:
         model = Payment
         fields = ['date','description','amount','type']
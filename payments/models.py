@@ -1,10 +1,21 @@
 from django.db import models
 
+from ledger.bulk import BulkSignalQuerySet
+
+
 class Payment(models.Model):
     TYPE_CHOICES = [('IN','Pay-in'), ('OUT','Pay-out')]
     date = models.DateField()
     description = models.CharField(max_length=255)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     type = models.CharField(max_length=3, choices=TYPE_CHOICES, default='IN')
-    class Meta: ordering = ['-date','-id']
+    updated_at = models.DateTimeField(auto_now=True)
+    objects = BulkSignalQuerySet.as_manager()
+    class Meta:
+        ordering = ['-date','-id']
+        indexes = [
+            models.Index(fields=['-date', '-id'], name='payment_date_id_idx'),
+            models.Index(fields=['type', '-date', '-id'], name='payment_type_date_id_idx'),
+            models.Index(fields=['updated_at'], name='payment_updated_idx'),
+        ]
     def __str__(self): return f"{self.date} {self.get_type_display()} £{self.amount}"
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Payment
+
+# SELECTs per payment-list page with the cache off: the last period close,
+# one grouped rollup aggregate for the cards and the keyset page (no COUNT).
+# A window with a start date has nothing carried to read, so it skips the first.
+LIST_QUERY_BUDGET = 3
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+class PaymentListQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.now().date()
+        Payment.objects.bulk_create(
+            Payment(
+                date=today - timedelta(days=i // 3),
+                description=f"payment {i}",
+                amount=Decimal("10.00") + i,
+                type="IN" if i % 2 else "OUT",
+            )
+            for i in range(120)
+        )
+        cls.start = (today - timedelta(days=90)).isoformat()
+        cls.end = today.isoformat()
+
+    def get_list(self, params, queries=LIST_QUERY_BUDGET):
+        with self.assertNumQueries(queries):
+            response = self.client.get(reverse("payments:list"), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_first_page(self):
+        response = self.get_list({})
+        self.assertEqual(response.context["count_all"], 120)
+        self.assertEqual(len(response.context["items"]), 50)
+
+    def test_date_window(self):
+        response = self.get_list({"start": self.start, "end": self.end}, queries=LIST_QUERY_BUDGET - 1)
+        self.assertEqual(response.context["count_all"], 120)
+
+    def test_tab(self):
+        response = self.get_list({"tab": "out"})
+        self.assertEqual(response.context["count_out"], 60)
+        self.assertTrue(all(p.type == "OUT" for p in response.context["items"]))
+
+    def test_cursor_page(self):
+        first = self.get_list({})
+        cursor = first.context["page_obj"].next_cursor
+        response = self.get_list({"cursor": cursor})
+        self.assertEqual(len(response.context["items"]), 50)
+        self.assertFalse(set(response.context["items"]) & set(first.context["items"]))
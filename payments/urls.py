@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import PaymentList, PaymentCreate, payment_delete
+from .views import PaymentList, PaymentCreate, payment_delete, payment_export
 app_name = 'payments'
 urlpatterns = [ 
                     path("", PaymentList.as_view(), name="list"),
                     path("new/", PaymentCreate.as_view(), name="create"),
                     path("<int:pk>/delete/", payment_delete, name="delete"),
+                    path("export/<str:fmt>/", payment_export, name="export"),
                
                ]
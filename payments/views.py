@@ -6,64 +6,80 @@ from .forms import PaymentForm
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.contrib import messages
+from django.utils.decorators import method_decorator
 from django.utils.http import url_has_allowed_host_and_scheme
 
 # payments/views.py
 from django.views.generic import ListView
 from django.db.models import Sum
 from datetime import datetime
+from ledger.archive import archived_export_rows
+from ledger.cache import cached_result
+from ledger.exports import export_response
+from ledger.models import DailyLedgerRollup
+from ledger.pagination import KeysetPaginator
+from ledger.periods import redirect_on_closed_period
+from ledger.rollups import totals_by_key
+
+
+def parse_date(s):
+    try:
+        return datetime.strptime(s, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_filters(params):
+    """(start, end, tab) from the list's ?start=&end=&tab= query string."""
+    start = parse_date(params.get('start'))
+    end = parse_date(params.get('end'))
+    if start and end and start > end:
+        start, end = end, start  # swap if user reversed
+    return start, end, (params.get('tab') or 'all').lower()
+
+
+def filter_payments(qs, start, end, tab):
+    # Apply date window
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+    # Tab filter
+    if tab == 'in':
+        qs = qs.filter(type='IN')
+    elif tab == 'out':
+        qs = qs.filter(type='OUT')
+    return qs
+
 
 class PaymentList(ListView):
     model = Payment
     template_name = 'payments/list.html'
     context_object_name = 'items'
-    paginate_by = 50  # optional
-
-    def _parse_date(self, s):
-        try:
-            return datetime.strptime(s, '%Y-%m-%d').date()
-        except (TypeError, ValueError):
-            return None
+    paginate_by = 50  # keyset pages on (date, id), see paginate_queryset
 
     def get_queryset(self):
-        tab = self.request.GET.get('tab', 'all').lower()
         start_str = self.request.GET.get('start')
         end_str = self.request.GET.get('end')
-
-        start = self._parse_date(start_str)
-        end = self._parse_date(end_str)
-        if start and end and start > end:
-            start, end = end, start  # swap if user reversed
-
-        base_qs = super().get_queryset().order_by('-date', '-id')
-
-        # Apply date window
-        if start:
-            base_qs = base_qs.filter(date__gte=start)
-        if end:
-            base_qs = base_qs.filter(date__lte=end)
-
-        # Counts within the date window
-        self._count_all = base_qs.count()
-        self._count_in = base_qs.filter(type='IN').count()
-        self._count_out = base_qs.filter(type='OUT').count()
-
-        # Totals within the date window (cards)
-        payin = base_qs.filter(type='IN').aggregate(total=Sum('amount'))['total'] or 0
-        payout = base_qs.filter(type='OUT').aggregate(total=Sum('amount'))['total'] or 0
+        start, end, tab = parse_filters(self.request.GET)
+
+        qs = filter_payments(super().get_queryset().order_by('-date', '-id'), start, end, tab)
+
+        # Counts and totals within the date window (cards), from the daily rollups
+        # and cached until a Payment is written
+        rolled = cached_result(
+            'payments:list', [Payment], (start, end),
+            lambda: totals_by_key(DailyLedgerRollup.Source.PAYMENT, start, end),
+        )
+        payin, self._count_in = rolled.get('IN', (0, 0))
+        payout, self._count_out = rolled.get('OUT', (0, 0))
+        self._count_all = self._count_in + self._count_out
         self._total_payin = payin
         self._total_payout = payout
         self._balance = payin - payout
 
-        # Tab filter
-        qs = base_qs
-        if tab == 'in':
-            qs = qs.filter(type='IN')
-        elif tab == 'out':
-            qs = qs.filter(type='OUT')
-
         self._active_tab = tab
-        self._visible_total = qs.aggregate(total=Sum('amount'))['total'] or 0
+        self._visible_total = {'in': payin, 'out': payout}.get(tab, payin + payout)
 
         # Keep the raw strings to prefill the form + preserve in links
         self._start_str = start_str or ''
@@ -71,9 +87,19 @@ class PaymentList(ListView):
 
         return qs
 
+    def paginate_queryset(self, queryset, page_size):
+        # Seek on (date, id) with an opaque ?cursor= instead of OFFSET, so deep
+        # pages cost the same as the first one.
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.page(self.request.GET.get('cursor'))
+        return paginator, page, page.object_list, page.has_other_pages()
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
+        page_params = self.request.GET.copy()
+        page_params.pop('cursor', None)
         ctx.update({
+            'page_query': page_params.urlencode(),
             'active_tab': self._active_tab,
             'visible_total': self._visible_total,
             'count_all': self._count_all,
@@ -87,12 +113,32 @@ class PaymentList(ListView):
         })
         return ctx
 
+# --- CSV / XLSX export (same ?start=&end=&tab= filters as the list) ---
+EXPORT_COLUMNS = [
+    ('Date', 'date'),
+    ('Type', 'type'),
+    ('Amount', 'amount'),
+    ('Description', 'description'),
+]
+
+
+def payment_export(request, fmt):
+    start, end, tab = parse_filters(request.GET)
+    qs = filter_payments(Payment.objects.order_by('-date', '-id'), start, end, tab)
+    # Archived payments are older than every live one, so they follow in order
+    match = {'type': tab.upper()} if tab in ('in', 'out') else {}
+    archived = archived_export_rows(Payment, EXPORT_COLUMNS, start, end, **match)
+    return export_response(request, fmt, qs, EXPORT_COLUMNS, 'payments', more_rows=archived)
+
+
+@method_decorator(redirect_on_closed_period, name='dispatch')
 class PaymentCreate(CreateView):
     model = Payment
     form_class = PaymentForm
     success_url = reverse_lazy('payments:list')
     template_name = 'payments/create.html'
 
+@redirect_on_closed_period
 def payment_delete(request, pk):
     payment = get_object_or_404(Payment, pk=pk)
 
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import ReportJob
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "status", "created_at", "finished_at", "requested_by", "attempts")
+    list_filter = ("kind", "status")
+    readonly_fields = ("id", "fingerprint", "created_at", "started_at", "finished_at")
+    ordering = ("-created_at",)
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import traceback
+from datetime import date, datetime, timedelta
+
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from employees.models import (
+    AdvancePayment,
+    ContractualEmployee,
+    FixedEmployee,
+    FixedSalaryPayment,
+    FixedWorkRecord,
+    SalaryPayment,
+    WorkRecord,
+)
+from employees.reports import employee_report_context, fixed_payslip_context, fixed_report_context, payslip_context
+from expenses.models import Expense
+from expenses.reports import expense_report_context
+from ledger.versions import data_versions
+from .models import ReportJob
+from .rendering import render_pdf
+
+Kind = ReportJob.Kind
+Status = ReportJob.Status
+
+CONTRACTUAL_TABLES = [ContractualEmployee, WorkRecord, SalaryPayment, AdvancePayment]
+FIXED_TABLES = [FixedEmployee, FixedSalaryPayment, FixedWorkRecord]
+
+
+def _day(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+# --- builders: params -> (template, context); run inside the worker ---
+def _expense_report(params):
+    context = expense_report_context(params["start_date"], params["end_date"], params.get("category") or None)
+    return "expenses/report_pdf.html", context
+
+
+def _payslip(params):
+    employee = ContractualEmployee.objects.with_totals().get(pk=params["employee_id"])
+    return "employees/payslip_pdf.html", payslip_context(employee, _day(params["issued"]))
+
+
+def _employee_report(params):
+    employee = ContractualEmployee.objects.with_totals().get(pk=params["employee_id"])
+    context = employee_report_context(employee, _day(params.get("start_date")), _day(params.get("end_date")))
+    return "employees/employee_report_pdf.html", context
+
+
+def _fixed_payslip(params):
+    employee = FixedEmployee.objects.get(pk=params["employee_id"])
+    context = fixed_payslip_context(employee, params.get("start_date"), params.get("end_date"))
+    return "employees/fixed_employee_payslip_pdf.html", context
+
+
+def _fixed_report(params):
+    employee = FixedEmployee.objects.get(pk=params["employee_id"])
+    context = fixed_report_context(employee, params.get("start_date"), params.get("end_date"))
+    return "employees/fixed_employee_report_pdf.html", context
+
+
+# kind -> (tables the report reads, builder, download filename)
+KINDS = {
+    Kind.EXPENSE_REPORT: ([Expense], _expense_report, "expenses_report.pdf"),
+    Kind.PAYSLIP: (CONTRACTUAL_TABLES, _payslip, "payslip.pdf"),
+    Kind.EMPLOYEE_REPORT: (CONTRACTUAL_TABLES, _employee_report, "employee_report.pdf"),
+    Kind.FIXED_PAYSLIP: (FIXED_TABLES, _fixed_payslip, "fixed_payslip.pdf"),
+    Kind.FIXED_REPORT: (FIXED_TABLES, _fixed_report, "fixed_report.pdf"),
+}
+
+
+def clean_params(kind, data):
+    """
+    The parameters a job of ``kind`` needs, validated from request data.
+    Raises ValueError with a user-facing message.
+    """
+    if kind not in KINDS:
+        raise ValueError("Unknown report type.")
+
+    def day(name):
+        value = (data.get(name) or "").strip()
+        try:
+            return _day(value) and value
+        except ValueError:
+            raise ValueError(f"Invalid {name.replace('_', ' ')}: {value}") from None
+
+    start_date, end_date = day("start_date"), day("end_date")
+    if not (start_date and end_date):
+        start_date = end_date = ""
+
+    if kind == Kind.EXPENSE_REPORT:
+        category = (data.get("category") or "").upper()
+        if not start_date:
+            raise ValueError("Pick a start and end date for the expense report.")
+        if category and category not in Expense.Category.values:
+            raise ValueError(f"Unknown category: {category}")
+        return {"start_date": start_date, "end_date": end_date, "category": category}
+
+    employee_model = FixedEmployee if kind in (Kind.FIXED_PAYSLIP, Kind.FIXED_REPORT) else ContractualEmployee
+    try:
+        employee_id = int(data.get("employee_id"))
+    except (TypeError, ValueError):
+        raise ValueError("Missing employee.") from None
+    if not employee_model.objects.filter(pk=employee_id).exists():
+        raise ValueError("Employee not found.")
+
+    if kind == Kind.PAYSLIP:
+        # The payslip prints the issue date, so a new day means a new document.
+        return {"employee_id": employee_id, "issued": date.today().isoformat()}
+    return {"employee_id": employee_id, "start_date": start_date, "end_date": end_date}
+
+
+def fingerprint(kind, params):
+    tables, _, _ = KINDS[kind]
+    raw = json.dumps([kind, params, data_versions(tables)], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def enqueue(kind, params, user=None):
+    """
+    (job, created). An identical live job over the same data version is
+    returned instead of queueing the work again.
+    """
+    fp = fingerprint(kind, params)
+    live = ReportJob.objects.exclude(status=Status.FAILED)
+    existing = live.filter(fingerprint=fp).first()
+    if existing is not None:
+        return existing, False
+    try:
+        with transaction.atomic():
+            job = ReportJob.objects.create(
+                kind=kind, params=params, fingerprint=fp,
+                requested_by=user if user is not None and user.is_authenticated else None,
+            )
+        return job, True
+    except IntegrityError:
+        # Someone queued the same report between our lookup and insert.
+        return live.get(fingerprint=fp), False
+
+
+def claim_jobs(limit):
+    """Mark up to ``limit`` of the oldest queued jobs RUNNING; safe with several workers."""
+    claimed = []
+    candidates = (
+        ReportJob.objects.filter(status=Status.QUEUED)
+        .order_by("created_at")
+        .values_list("pk", flat=True)[: limit * 2]
+    )
+    for pk in candidates:
+        won = ReportJob.objects.filter(pk=pk, status=Status.QUEUED).update(
+            status=Status.RUNNING, started_at=timezone.now(), attempts=F("attempts") + 1
+        )
+        if won:
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def requeue_stale(older_than):
+    """Put RUNNING jobs whose worker died (started more than ``older_than`` ago) back in the queue."""
+    cutoff = timezone.now() - timedelta(seconds=older_than)
+    return ReportJob.objects.filter(status=Status.RUNNING, started_at__lt=cutoff).update(status=Status.QUEUED)
+
+
+def mark_failed(pk, error):
+    ReportJob.objects.filter(pk=pk).update(status=Status.FAILED, error=error, finished_at=timezone.now())
+
+
+def run_job(pk):
+    """Render one claimed job and store its PDF. Returns the final status."""
+    job = ReportJob.objects.get(pk=pk)
+    _, build, _ = KINDS[job.kind]
+    try:
+        template, context = build(job.params)
+        pdf = render_pdf(template, context)
+    except Exception:
+        mark_failed(pk, traceback.format_exc())
+        return Status.FAILED
+
+    job.file.save(f"{job.pk}.pdf", ContentFile(pdf), save=False)
+    job.status = Status.DONE
+    job.error = ""
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "status", "error", "finished_at"])
+    return job.status
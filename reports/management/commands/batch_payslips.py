@@ -0,0 +1,65 @@
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reports.payslips import payslip_tasks, render_payslips, stream_payslip_zip
+
+
+class Command(BaseCommand):
+    help = (
+        "Render PDF payslips for every contractual and fixed employee into one ZIP, "
+        "across a pool of worker processes. --benchmark compares payslips/s per worker count."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("out", nargs="?", help="ZIP file to write (not needed with --benchmark).")
+        parser.add_argument("--start-date", help="Period start, YYYY-MM-DD (fixed employees' payments).")
+        parser.add_argument("--end-date", help="Period end, YYYY-MM-DD.")
+        parser.add_argument(
+            "--processes", type=int, default=settings.PAYSLIP_BATCH_PROCESSES,
+            help="Worker processes (default PAYSLIP_BATCH_PROCESSES); 1 renders in this process.",
+        )
+        parser.add_argument(
+            "--benchmark", metavar="COUNTS",
+            help="Comma-separated worker counts, e.g. 1,2,4: render everything once per count and report payslips/s.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            start, end = (
+                datetime.strptime(options[name], "%Y-%m-%d").date() if options[name] else None
+                for name in ("start_date", "end_date")
+            )
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {exc}") from None
+
+        started = time.perf_counter()
+        tasks = payslip_tasks(start, end)
+        self.stdout.write(f"Loaded {len(tasks)} employee(s) in {time.perf_counter() - started:.2f}s")
+
+        if options["benchmark"]:
+            try:
+                counts = [int(c) for c in options["benchmark"].split(",")]
+            except ValueError:
+                raise CommandError("--benchmark takes worker counts like 1,2,4") from None
+            self.stdout.write(f"{'workers':>8} {'payslips':>9} {'seconds':>8} {'payslips/s':>11}")
+            for count in counts:
+                started = time.perf_counter()
+                rendered = sum(1 for _ in render_payslips(tasks, count))
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{count:>8} {rendered:>9} {elapsed:>8.2f} {rendered / elapsed:>11.1f}")
+            return
+
+        if not options["out"]:
+            raise CommandError("Give an output file (or --benchmark).")
+        started = time.perf_counter()
+        with open(options["out"], "wb") as out:
+            for chunk in stream_payslip_zip(tasks, options["processes"]):
+                out.write(chunk)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(tasks)} payslip(s) to {options['out']} in {elapsed:.1f}s "
+            f"({len(tasks) / elapsed if elapsed else 0:.1f} payslips/s, {options['processes']} process(es))"
+        ))
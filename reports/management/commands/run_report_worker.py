@@ -0,0 +1,57 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from reports import worker
+from reports.jobs import claim_jobs, mark_failed, requeue_stale
+
+
+class Command(BaseCommand):
+    help = "Render queued report jobs (PDFs) in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2, help="Worker processes (default 2).")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between queue polls.")
+        parser.add_argument(
+            "--stale-after", type=int, default=600,
+            help="Requeue RUNNING jobs older than this many seconds on start (a worker died).",
+        )
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        processes = max(1, options["processes"])
+        poll = options["poll_interval"]
+
+        requeued = requeue_stale(options["stale_after"])
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s).")
+
+        # spawn: children open their own DB connections instead of sharing ours.
+        context = multiprocessing.get_context("spawn")
+        running = {}
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=worker.setup) as pool:
+            while True:
+                close_old_connections()
+                free = processes - len(running)
+                if free:
+                    for pk in claim_jobs(free):
+                        running[pool.submit(worker.run, pk)] = pk
+
+                if not running:
+                    if options["once"]:
+                        break
+                    time.sleep(poll)
+                    continue
+
+                done, _ = wait(running, timeout=poll, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pk = running.pop(future)
+                    try:
+                        status = future.result()
+                    except Exception as exc:  # the child crashed before recording anything
+                        mark_failed(pk, repr(exc))
+                        status = "FAILED"
+                    self.stdout.write(f"{pk}: {status}")
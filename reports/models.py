@@ -0,0 +1,63 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+
+class ReportJob(models.Model):
+    """
+    A PDF report queued for the background worker (``run_report_worker``).
+
+    ``fingerprint`` hashes the kind, its parameters and the data versions of
+    the tables it reads, so asking twice for the same report over unchanged
+    data returns the existing job and its stored file.
+    """
+
+    class Kind(models.TextChoices):
+        EXPENSE_REPORT = "EXPENSE_REPORT", "Expense report"
+        PAYSLIP = "PAYSLIP", "Payslip"
+        EMPLOYEE_REPORT = "EMPLOYEE_REPORT", "Employee report"
+        FIXED_PAYSLIP = "FIXED_PAYSLIP", "Fixed employee payslip"
+        FIXED_REPORT = "FIXED_REPORT", "Fixed employee report"
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    params = models.JSONField(default=dict, blank=True)
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    file = models.FileField(upload_to="reports/%Y/%m/", blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="report_jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            # One live (queued/running/done) job per fingerprint; failed ones may be retried.
+            models.UniqueConstraint(
+                fields=["fingerprint"], condition=~Q(status="FAILED"), name="report_job_live_fingerprint"
+            ),
+        ]
+        indexes = [
+            # Worker polling for the oldest queued job
+            models.Index(fields=["status", "created_at"], name="report_job_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.DONE, self.Status.FAILED)
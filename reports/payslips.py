@@ -0,0 +1,90 @@
+import multiprocessing
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal
+
+from django.utils.text import slugify
+
+from employees.models import ContractualEmployee, FixedEmployee, FixedSalaryPayment
+from ledger.exports import ZipSink
+from . import worker
+
+PAYSLIPS_PER_TASK = 8  # payslips a worker renders per round trip
+
+
+def payslip_tasks(start_date=None, end_date=None, today=None):
+    """
+    (archive name, template, context) for every contractual and fixed
+    employee. The contexts are the ones the single payslip pages use:
+    contractual payslips show the running totals as of ``today``, and fixed
+    payslips list the payments between start_date and end_date. Three
+    queries load everything, whatever the number of employees.
+    """
+    today = today or date.today()
+    tasks = []
+    for employee in ContractualEmployee.objects.with_totals().order_by("name", "id"):
+        tasks.append((
+            f"contractual/{employee.pk}-{slugify(employee.name) or 'employee'}.pdf",
+            "employees/payslip_pdf.html",
+            {"employee": employee, "today": today},
+        ))
+
+    payments = FixedSalaryPayment.objects.order_by("employee_id", "id")
+    if start_date and end_date:
+        payments = payments.filter(date__range=[start_date, end_date])
+    by_employee = defaultdict(list)
+    for payment in payments:
+        by_employee[payment.employee_id].append(payment)
+
+    for employee in FixedEmployee.objects.order_by("name", "id"):
+        rows = by_employee.get(employee.pk, [])
+        total_paid = sum((p.amount for p in rows), Decimal("0.00"))
+        tasks.append((
+            f"fixed/{employee.pk}-{slugify(employee.name) or 'employee'}.pdf",
+            "employees/fixed_employee_payslip_pdf.html",
+            {
+                "employee": employee,
+                "payments": rows,
+                "total_paid": total_paid,
+                "total_salary": employee.monthly_salary,
+                "balance": employee.monthly_salary - total_paid,
+                "start_date": start_date,
+                "end_date": end_date,
+            },
+        ))
+    return tasks
+
+
+def render_payslips(tasks, processes=1):
+    """
+    Yield (archive name, PDF bytes) in task order. With more than one process
+    the rendering is spread over a spawn ProcessPoolExecutor, a few payslips
+    per task; the database is not touched once the tasks are built.
+    """
+    chunks = [tasks[i:i + PAYSLIPS_PER_TASK] for i in range(0, len(tasks), PAYSLIPS_PER_TASK)]
+    if processes <= 1:
+        for chunk in chunks:
+            yield from worker.render_payslips(chunk)
+        return
+
+    pool = ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn"), initializer=worker.setup
+    )
+    try:
+        for rendered in pool.map(worker.render_payslips, chunks):
+            yield from rendered
+    finally:
+        # A closed download cancels whatever has not started yet.
+        pool.shutdown(cancel_futures=True)
+
+
+def stream_payslip_zip(tasks, processes=1):
+    """The payslips as a ZIP, yielded as each one is added (PDFs are stored, not recompressed)."""
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, pdf in render_payslips(tasks, processes):
+            archive.writestr(name, pdf)
+            yield sink.drain()
+    yield sink.drain()
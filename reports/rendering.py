@@ -0,0 +1,14 @@
+import io
+
+from django.template.loader import get_template
+from xhtml2pdf import pisa
+
+
+def render_pdf(template_name, context):
+    """Render an HTML template to PDF bytes with xhtml2pdf."""
+    html = get_template(template_name).render(context)
+    buffer = io.BytesIO()
+    result = pisa.CreatePDF(html, dest=buffer)
+    if result.err:
+        raise ValueError(f"xhtml2pdf could not render {template_name} ({result.err} errors)")
+    return buffer.getvalue()
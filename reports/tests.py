@@ -0,0 +1,45 @@
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from expenses.models import Expense
+from .jobs import run_job
+from .models import ReportJob
+
+
+class ExpenseReportQueueTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("clerk", password="x")
+        Expense.objects.create(date=date(2026, 3, 2), category="MATERIAL", description="thread", amount=Decimal("12.00"))
+
+    def test_form_queues_the_report_instead_of_rendering_it(self):
+        self.client.force_login(self.user)
+        form = self.client.get(reverse("expenses:report"))
+        self.assertContains(form, f'action="{reverse("reports:queue")}"')
+
+        response = self.client.post(reverse("reports:queue"), {
+            "kind": "EXPENSE_REPORT", "start_date": "2026-03-01", "end_date": "2026-03-31", "category": "",
+        })
+        job = ReportJob.objects.get()
+        self.assertRedirects(response, reverse("reports:job_detail", args=[job.pk]))
+        self.assertEqual((job.status, job.requested_by, bool(job.file)), (ReportJob.Status.QUEUED, self.user, False))
+
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            self.assertEqual(run_job(job.pk), ReportJob.Status.DONE)
+            download = self.client.get(reverse("reports:job_download", args=[job.pk]))
+            self.assertEqual(download["Content-Type"], "application/pdf")
+            self.assertTrue(b"".join(download.streaming_content).startswith(b"%PDF"))
+            download.close()
+
+    def test_job_pages_need_a_signed_in_user(self):
+        job = ReportJob.objects.create(kind=ReportJob.Kind.EXPENSE_REPORT, params={}, fingerprint="x")
+        for name in ("job_detail", "job_status", "job_download"):
+            response = self.client.get(reverse(f"reports:{name}", args=[job.pk]))
+            self.assertEqual(response.status_code, 302, name)
+            self.assertTrue(response["Location"].startswith("/accounts/login/"), name)
+        response = self.client.post(reverse("reports:queue"), {"kind": "EXPENSE_REPORT"})
+        self.assertTrue(response["Location"].startswith("/accounts/login/"))
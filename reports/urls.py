@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = "reports"
+
+urlpatterns = [
+    path("queue/", views.queue_report, name="queue"),
+    path("jobs/<uuid:pk>/", views.job_detail, name="job_detail"),
+    path("jobs/<uuid:pk>/status/", views.job_status, name="job_status"),
+    path("jobs/<uuid:pk>/download/", views.job_download, name="job_download"),
+    path("payslips/", views.payslip_batch, name="payslip_batch"),
+]
@@ -0,0 +1,87 @@
+from datetime import date
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+
+from employees.reports import parse_date_range
+from .jobs import KINDS, clean_params, enqueue
+from .models import ReportJob
+from .payslips import payslip_tasks, stream_payslip_zip
+
+
+# --- Queue a report (POSTed from the report/payslip pages) ---
+# Reports hold payroll data, so every job view needs a signed-in user. An
+# identical report is shared by everyone who asks for it (see enqueue).
+@login_required(login_url="/accounts/login/")
+@require_POST
+def queue_report(request):
+    kind = request.POST.get("kind")
+    try:
+        params = clean_params(kind, request.POST)
+    except ValueError as exc:
+        messages.error(request, str(exc))
+        back = request.POST.get("return") or request.META.get("HTTP_REFERER")
+        if back and url_has_allowed_host_and_scheme(back, allowed_hosts={request.get_host()}):
+            return redirect(back)
+        return redirect("dashboard:home")
+
+    job, created = enqueue(kind, params, request.user)
+    if created:
+        messages.success(request, "Report queued. This page updates when it is ready.")
+    elif job.status == ReportJob.Status.DONE:
+        messages.info(request, "Nothing changed since this report was generated; here it is.")
+    return redirect("reports:job_detail", pk=job.pk)
+
+
+@login_required(login_url="/accounts/login/")
+def job_detail(request, pk):
+    job = get_object_or_404(ReportJob, pk=pk)
+    return render(request, "reports/job_detail.html", {"job": job})
+
+
+@login_required(login_url="/accounts/login/")
+def job_status(request, pk):
+    """Polled by the job page until the report is finished."""
+    job = get_object_or_404(ReportJob, pk=pk)
+    return JsonResponse({
+        "id": str(job.pk),
+        "kind": job.kind,
+        "status": job.status,
+        "finished": job.is_finished,
+        "download_url": reverse("reports:job_download", args=[job.pk]) if job.status == ReportJob.Status.DONE else None,
+    })
+
+
+@login_required(login_url="/accounts/login/")
+def job_download(request, pk):
+    job = get_object_or_404(ReportJob, pk=pk, status=ReportJob.Status.DONE)
+    if not job.file or not job.file.storage.exists(job.file.name):
+        raise Http404("The report file is no longer available.")
+    _, _, filename = KINDS[job.kind]
+    return FileResponse(job.file.open("rb"), content_type="application/pdf", as_attachment=True, filename=filename)
+
+
+# --- Every employee's payslip in one ZIP ---
+@staff_member_required
+def payslip_batch(request):
+    start_date = request.GET.get("start_date", "")
+    end_date = request.GET.get("end_date", "")
+    if not request.GET.get("download"):
+        return render(request, "reports/payslip_batch.html", {"start_date": start_date, "end_date": end_date})
+
+    window = parse_date_range(start_date, end_date) or (None, None)
+    tasks = payslip_tasks(*window)
+    # Streamed as each PDF is rendered, so the first bytes go out long before the last payslip.
+    response = StreamingHttpResponse(
+        stream_payslip_zip(tasks, settings.PAYSLIP_BATCH_PROCESSES), content_type="application/zip"
+    )
+    response["Content-Disposition"] = f'attachment; filename="payslips-{date.today():%Y-%m-%d}.zip"'
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,22 @@
+# Entry points for the report worker's child processes. Kept free of
+# model imports at module level: with the "spawn" start method the child
+# unpickles these functions before Django is set up.
+
+
+def setup():
+    import django
+
+    django.setup()
+
+
+def run(pk):
+    from .jobs import run_job
+
+    return run_job(pk)
+
+
+def render_payslips(tasks):
+    """[(archive name, PDF bytes)] for (name, template, context) tasks; see reports.payslips."""
+    from .rendering import render_pdf
+
+    return [(name, render_pdf(template, context)) for name, template, context in tasks]
@@ -0,0 +1,15 @@
+from .index import matching_pks
+
+
+class IndexedSearchMixin:
+    """
+    ModelAdmin search on ``description`` through the full-text index instead
+    of a ``LIKE '%...%'`` scan: every word must appear (stemmed), in any
+    order, and ``word*`` matches the start of a word.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        pks = matching_pks(self.model, search_term)
+        if pks is None:
+            return queryset, False
+        return queryset.filter(pk__in=pks), False
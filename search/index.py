@@ -0,0 +1,121 @@
+import re
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from employees.models import FixedWorkRecord, SalaryPayment, WorkRecord
+from expenses.models import Expense
+from payments.models import Payment
+
+# Every indexed row is keyed by ``id * SLOTS + code``, so one index (and one
+# ranking) covers all the tables. The triggers in migration 0001 use the same
+# codes; never renumber them.
+SLOTS = 8
+SOURCES = {
+    1: ("expense", Expense),
+    2: ("payment", Payment),
+    3: ("work", WorkRecord),
+    4: ("salary", SalaryPayment),
+    5: ("fixed_work", FixedWorkRecord),
+}
+CODES = {model: code for code, (_, model) in SOURCES.items()}
+
+MAX_TERMS = 8
+TERM = re.compile(r"\w+\*?")
+
+
+def terms(query):
+    """The words of a search box query; a trailing * makes a word a prefix."""
+    return TERM.findall(query or "")[:MAX_TERMS]
+
+
+def _match(words):
+    """
+    The backend's query for rows containing every word (stemmed, so
+    "repairs" finds "repair" and "repairing"). Words are \\w+ with an optional
+    trailing *, so nothing the user types is read as query syntax.
+    """
+    if connection.vendor == "postgresql":
+        return " & ".join(f"{w[:-1]}:*" if w.endswith("*") else w for w in words)
+    return " ".join(f'"{w[:-1]}"*' if w.endswith("*") else f'"{w}"' for w in words)
+
+
+def _ranked_sql():
+    # Every match is ranked (bm25 on SQLite, where a lower rank is better):
+    # the index finds them and the database keeps only the page's top rows.
+    if connection.vendor == "postgresql":
+        return (
+            "SELECT id FROM search_index, to_tsquery('english', %s) query WHERE document @@ query"
+            " ORDER BY ts_rank_cd(document, query) DESC, id DESC LIMIT %s OFFSET %s"
+        )
+    return "SELECT rowid FROM search_index WHERE search_index MATCH %s ORDER BY rank, rowid DESC LIMIT %s OFFSET %s"
+
+
+def search(query, offset=0, limit=25):
+    """
+    The best ``limit`` matches after ``offset`` across every indexed table, as
+    (source name, object) pairs in rank order, newest first among equal
+    ranks. One index query plus one query per source that has hits on the page.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(_ranked_sql(), [_match(words), limit, offset])
+        keys = [row[0] for row in cursor.fetchall()]
+
+    wanted = defaultdict(list)
+    for key in keys:
+        wanted[key % SLOTS].append(key // SLOTS)
+    found = {}
+    for code, ids in wanted.items():
+        model = SOURCES[code][1]
+        qs = model.objects.all()
+        if model is not Expense and model is not Payment:
+            qs = qs.select_related("employee")
+        found[code] = qs.in_bulk(ids)
+
+    # A row deleted since the index query just drops out of the page.
+    return [
+        (SOURCES[key % SLOTS][0], found[key % SLOTS][key // SLOTS])
+        for key in keys
+        if key // SLOTS in found[key % SLOTS]
+    ]
+
+
+def matching_pks(model, query):
+    """
+    A subquery of ``model`` pks whose description matches ``query``, for
+    ``filter(pk__in=...)``. None when the query has no words.
+    """
+    words = terms(query)
+    if not words:
+        return None
+    if connection.vendor == "postgresql":
+        sql = (
+            "SELECT id / %s FROM search_index WHERE document @@ to_tsquery('english', %s) "
+            "AND id %% %s = %s"
+        )
+    else:
+        sql = "SELECT rowid / %s FROM search_index WHERE search_index MATCH %s AND rowid %% %s = %s"
+    return RawSQL(sql, [SLOTS, _match(words), SLOTS, CODES[model]])
+
+
+def rebuild():
+    """Re-index every description from scratch; returns the number of rows indexed."""
+    key_column = "id" if connection.vendor == "postgresql" else "rowid"
+    indexed = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("DELETE FROM search_index")
+        for code, (_, model) in SOURCES.items():
+            cursor.execute(
+                f"INSERT INTO search_index ({key_column}, body) "
+                f"SELECT id * {SLOTS} + {code}, description FROM {model._meta.db_table} "
+                f"WHERE description IS NOT NULL AND description <> ''"
+            )
+            indexed += cursor.rowcount
+        if connection.vendor == "sqlite":
+            # Merge the b-tree segments the bulk insert left behind.
+            cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+    return indexed
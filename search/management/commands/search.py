@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from search.index import search
+
+
+class Command(BaseCommand):
+    help = "Run a /search/ query from the shell and print the ranked hits and the time taken."
+
+    def add_arguments(self, parser):
+        parser.add_argument("query", nargs="+")
+        parser.add_argument("--limit", type=int, default=25)
+        parser.add_argument("--offset", type=int, default=0)
+
+    def handle(self, *args, **options):
+        query = " ".join(options["query"])
+        started = time.perf_counter()
+        hits = search(query, offset=options["offset"], limit=options["limit"])
+        elapsed = time.perf_counter() - started
+        for source, obj in hits:
+            self.stdout.write(f"{source:<11} {obj.pk:>8}  {obj.date}  {obj.description}")
+        self.stdout.write(f"{len(hits)} hit(s) in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,103 @@
+from django.db import migrations
+
+# (table, code): rows are indexed as id * 8 + code; see search.index.SOURCES.
+TABLES = [
+    ("expenses_expense", 1),
+    ("payments_payment", 2),
+    ("employees_workrecord", 3),
+    ("employees_salarypayment", 4),
+    ("employees_fixedworkrecord", 5),
+]
+
+SQLITE_TRIGGERS = [
+    """CREATE TRIGGER search_index_{code}_insert AFTER INSERT ON {table}
+    WHEN new.description IS NOT NULL AND new.description <> '' BEGIN
+        INSERT INTO search_index (rowid, body) VALUES (new.id * 8 + {code}, new.description);
+    END""",
+    """CREATE TRIGGER search_index_{code}_update AFTER UPDATE OF description ON {table} BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 8 + {code};
+        INSERT INTO search_index (rowid, body)
+        SELECT new.id * 8 + {code}, new.description WHERE new.description IS NOT NULL AND new.description <> '';
+    END""",
+    """CREATE TRIGGER search_index_{code}_delete AFTER DELETE ON {table} BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 8 + {code};
+    END""",
+]
+
+POSTGRES_FUNCTION = """
+CREATE FUNCTION search_index_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    code integer := TG_ARGV[0]::integer;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM search_index WHERE id = OLD.id * 8 + code;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND coalesce(NEW.description, '') <> '' THEN
+        INSERT INTO search_index (id, body) VALUES (NEW.id * 8 + code, NEW.description);
+    END IF;
+    RETURN NULL;
+END
+$$;
+"""
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5(body, tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        for table, code in TABLES:
+            for trigger in SQLITE_TRIGGERS:
+                schema_editor.execute(trigger.format(table=table, code=code))
+        key_column = "rowid"
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE search_index ("
+            " id bigint PRIMARY KEY,"
+            " body text NOT NULL,"
+            " document tsvector GENERATED ALWAYS AS (to_tsvector('english', body)) STORED)"
+        )
+        schema_editor.execute("CREATE INDEX search_index_document_idx ON search_index USING GIN (document)")
+        schema_editor.execute(POSTGRES_FUNCTION)
+        for table, code in TABLES:
+            schema_editor.execute(
+                f"CREATE TRIGGER search_index_sync AFTER INSERT OR DELETE OR UPDATE OF description ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION search_index_sync({code})"
+            )
+        key_column = "id"
+    else:
+        raise RuntimeError(f"The search index needs SQLite (FTS5) or PostgreSQL, not {vendor}.")
+
+    for table, code in TABLES:
+        schema_editor.execute(
+            f"INSERT INTO search_index ({key_column}, body) SELECT id * 8 + {code}, description FROM {table} "
+            f"WHERE description IS NOT NULL AND description <> ''"
+        )
+    if vendor == "sqlite":
+        schema_editor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for table, _ in TABLES:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS search_index_sync ON {table}")
+        schema_editor.execute("DROP FUNCTION IF EXISTS search_index_sync()")
+    else:
+        for table, code in TABLES:
+            for event in ("insert", "update", "delete"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS search_index_{code}_{event}")
+    schema_editor.execute("DROP TABLE IF EXISTS search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0003_hot_path_indexes"),
+        ("payments", "0002_hot_path_indexes"),
+        ("employees", "0022_payroll_run"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,43 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from employees.models import ContractualEmployee, WorkRecord
+from expenses.models import Expense
+from payments.models import Payment
+from .index import search
+
+
+class SearchIndexTests(TestCase):
+    def found(self, query):
+        return [(source, obj.pk) for source, obj in search(query)]
+
+    def test_triggers_keep_the_index_in_step(self):
+        payment = Payment.objects.create(date=date(2024, 4, 1), description="Zipper repairs", amount=Decimal("9.00"))
+        expense = Expense.objects.create(date=date(2024, 4, 2), category="MATERIAL", description="zipper tape", amount=Decimal("3.00"))
+        worker = ContractualEmployee.objects.create(name="Ali")
+        work = WorkRecord.objects.create(employee=worker, date=date(2024, 4, 3), description="hemming", quantity=1, item_price=Decimal("1.00"))
+        self.assertCountEqual(self.found("zipper"), [("payment", payment.pk), ("expense", expense.pk)])
+        self.assertEqual(self.found("repair"), [("payment", payment.pk)])  # stemmed
+        self.assertEqual(self.found("hem*"), [("work", work.pk)])
+
+        payment.description = "Button repairs"
+        payment.save()
+        self.assertEqual(self.found("zipper"), [("expense", expense.pk)])
+        self.assertEqual(self.found("button"), [("payment", payment.pk)])
+
+        expense.description = ""
+        expense.save()
+        work.delete()
+        self.assertEqual(self.found("zipper"), [])
+        self.assertEqual(self.found("hemming"), [])
+
+    def test_the_best_match_ranks_first_however_old(self):
+        best = Payment.objects.create(date=date(2019, 1, 1), description="zipper zipper", amount=Decimal("1.00"))
+        Payment.objects.bulk_create(
+            Payment(date=date(2024, 1, 1), description=f"zipper for the blue coat lining {i}", amount=Decimal("1.00"))
+            for i in range(1000)
+        )
+        self.assertEqual(self.found("zipper")[0], ("payment", best.pk))
+        self.assertEqual(len(search("zipper", offset=990, limit=25)), 11)
@@ -0,0 +1,54 @@
+from django.shortcuts import render
+from django.urls import reverse
+
+from . import index
+
+RESULTS_PER_PAGE = 25
+
+LABELS = {
+    "expense": "🧾 Expense",
+    "payment": "💳 Payment",
+    "work": "🛠 Work",
+    "salary": "💰 Salary",
+    "fixed_work": "⏱ Overtime",
+}
+
+
+def _result(source, obj):
+    if source == "expense":
+        amount, who, url = obj.amount, obj.get_category_display(), reverse("expenses:list")
+    elif source == "payment":
+        amount, who, url = obj.amount, obj.get_type_display(), reverse("payments:list")
+    elif source == "fixed_work":
+        amount, who = obj.amount, obj.employee.name
+        url = reverse("employees:fixed_employee_report", args=[obj.employee_id])
+    else:
+        amount = obj.total if source == "work" else obj.amount
+        who, url = obj.employee.name, reverse("employees:report", args=[obj.employee_id])
+    return {
+        "label": LABELS[source],
+        "date": obj.date,
+        "description": obj.description,
+        "amount": amount,
+        "who": who,
+        "url": url,
+    }
+
+
+def search(request):
+    query = request.GET.get("q", "").strip()
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    # One extra row says whether there is a next page without counting every match.
+    hits = index.search(query, offset=(page - 1) * RESULTS_PER_PAGE, limit=RESULTS_PER_PAGE + 1)
+    return render(request, "search/results.html", {
+        "query": query,
+        "results": [_result(source, obj) for source, obj in hits[:RESULTS_PER_PAGE]],
+        "page": page,
+        "has_next": len(hits) > RESULTS_PER_PAGE,
+        "previous_page": page - 1,
+        "next_page": page + 1,
+    })
@@ -13,7 +13,7 @@ ALLOWED_HOSTS = [h.strip() for h in os.getenv('DJANGO_ALLOWED_HOSTS','').split('
 INSTALLED_APPS = [
     'django.contrib.admin','django.contrib.auth','django.contrib.contenttypes',
     'django.contrib.sessions','django.contrib.messages','django.contrib.staticfiles',
-    'accounts','dashboard','payments','expenses','employees',
+    'accounts','dashboard','payments','expenses','employees','ledger','reports','search',
 ]
 
 MIDDLEWARE = [
@@ -50,6 +50,14 @@ else:
     DATABASES = {'default': {'ENGINE': 'django.db.backends.postgresql','NAME': parsed.path[1:],
                              'USER': parsed.username,'PASSWORD': parsed.password,'HOST': parsed.hostname,'PORT': parsed.port or '5432'}}
 
+# Dashboard / list totals cache (ledger.cache). Local memory by default; set
+# DJANGO_CACHE_DIR to share it between worker processes via the filesystem.
+cache_dir = os.getenv('DJANGO_CACHE_DIR')
+if cache_dir:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'winside'}}
+
 LANGUAGE_CODE = 'en-gb'
 TIME_ZONE = 'Europe/London'
 
@@ -60,6 +68,18 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'static_root'
 
+# Generated report PDFs (reports app); served through a view, not MEDIA_URL.
+MEDIA_ROOT = os.getenv('DJANGO_MEDIA_ROOT', BASE_DIR / 'media')
+
+# Worker processes rendering the all-employees payslip ZIP (reports app).
+PAYSLIP_BATCH_PROCESSES = int(os.getenv('DJANGO_PAYSLIP_PROCESSES', '2'))
+
+# Monthly partition files of archived rows (`manage.py archive_ledger`).
+LEDGER_ARCHIVE_DIR = os.getenv('DJANGO_LEDGER_ARCHIVE_DIR', BASE_DIR / 'archive')
+
+# Memory-mapped NumPy column snapshot of the ledgers (dashboard analytics).
+LEDGER_ANALYTICS_DIR = os.getenv('DJANGO_LEDGER_ANALYTICS_DIR', BASE_DIR / 'analytics')
+
 LOGIN_REDIRECT_URL = 'dashboard:home'
 LOGOUT_REDIRECT_URL = 'login'
 
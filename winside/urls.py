@@ -12,5 +12,7 @@ urlpatterns = [
     path('payments/', include(('payments.urls', 'payments'), namespace='payments')),
     path('expenses/', include(('expenses.urls', 'expenses'), namespace='expenses')),
     path('employees/', include(('employees.urls', 'employees'), namespace='employees')),
+    path('reports/', include(('reports.urls', 'reports'), namespace='reports')),
+    path('search/', include(('search.urls', 'search'), namespace='search')),
     path('', include(('dashboard.urls', 'dashboard'), namespace='dashboard')),
 ]